@@ -0,0 +1,122 @@
+"""
+Run the FileFlowCLI benchmarks.
+
+Usage:
+    python -m benchmarks [--shapes mixed,tiny] [--scale 1.0] [--output results.json]
+                         [--thresholds benchmarks/thresholds.json] [--baseline old.json]
+
+Exits with status 1 if a result breaks a threshold or regressed against
+the baseline.
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+from .harness import check_regressions, environment, write_results
+from .suites import BENCHMARKS, ShapeBenchmarks
+from .tree_generator import SHAPES
+
+
+DEFAULT_THRESHOLDS = Path(__file__).with_name("thresholds.json")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line arguments.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="FileFlowCLI benchmarks")
+    parser.add_argument("--shapes", default=",".join(SHAPES), help="Comma-separated tree shapes")
+    parser.add_argument("--benchmarks", default=",".join(BENCHMARKS), help="Comma-separated benchmarks")
+    parser.add_argument("--scale", type=float, default=1.0, help="Tree size multiplier (default: 1.0)")
+    parser.add_argument("--seed", type=int, default=0, help="Tree generator seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark (default: 3)")
+    parser.add_argument("--no-cold", action="store_true", help="Skip cold-cache runs")
+    parser.add_argument("--workdir", type=Path, help="Keep generated trees here between runs")
+    parser.add_argument("--output", type=Path, help="Write results JSON to this file")
+    parser.add_argument(
+        "--thresholds",
+        type=Path,
+        help=f"Threshold file (default: {DEFAULT_THRESHOLDS.name} at scale 1.0, none otherwise)"
+    )
+    parser.add_argument("--baseline", type=Path, help="Results of an earlier run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs baseline (default: 0.2)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    """
+    Run the benchmarks and check for regressions.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    
+    Returns:
+        Exit status (0 on success, 1 on regression)
+    """
+    args = parse_args(argv)
+    shapes = [shape for shape in args.shapes.split(",") if shape]
+    names = [name for name in args.benchmarks.split(",") if name]
+    for shape in shapes:
+        if shape not in SHAPES:
+            print(f"Unknown shape: {shape} (choose from {', '.join(SHAPES)})", file=sys.stderr)
+            return 2
+    for name in names:
+        if name not in BENCHMARKS:
+            print(f"Unknown benchmark: {name} (choose from {', '.join(BENCHMARKS)})", file=sys.stderr)
+            return 2
+    
+    # Thresholds are calibrated for full-size trees
+    thresholds_path = args.thresholds
+    if thresholds_path is None and args.scale == 1.0:
+        thresholds_path = DEFAULT_THRESHOLDS
+    thresholds = json.loads(thresholds_path.read_text(encoding="utf-8")) if thresholds_path else None
+    baseline = json.loads(args.baseline.read_text(encoding="utf-8")) if args.baseline else None
+    
+    temp_dir = None
+    workdir = args.workdir
+    if workdir is None:
+        temp_dir = tempfile.TemporaryDirectory(prefix="fileflow-bench-")
+        workdir = Path(temp_dir.name)
+    
+    results = {
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "parameters": {"scale": args.scale, "seed": args.seed, "repeat": args.repeat},
+        "trees": {},
+        "results": {}
+    }
+    try:
+        for shape in shapes:
+            print(f"[{shape}] generating tree...", file=sys.stderr)
+            suite = ShapeBenchmarks(workdir, shape, args.scale, args.seed, args.repeat)
+            results["trees"][shape] = suite.manifest
+            print(f"[{shape}] {suite.manifest['file_count']} files, running benchmarks...", file=sys.stderr)
+            for key, summary in suite.run(names, cold=not args.no_cold).items():
+                results["results"][key] = summary
+                rate = f"  {summary['items_per_second']:10.0f} items/s" if "items_per_second" in summary else ""
+                print(f"{key:<40} {summary['median_seconds'] * 1000:10.1f} ms{rate}")
+    finally:
+        if temp_dir is not None:
+            temp_dir.cleanup()
+    
+    if args.output:
+        write_results(results, args.output)
+    
+    failures = check_regressions(results, thresholds, baseline, args.tolerance)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""Timing, cache control and regression checks for benchmarks."""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, List, Iterable
+
+
+def drop_caches(paths: Iterable[Path]) -> Optional[str]:
+    """
+    Evict files from the page cache before a cold-cache run.
+    
+    As root on Linux the kernel caches (pages, dentries and inodes) are
+    dropped; otherwise each file's pages are evicted with posix_fadvise,
+    which leaves directory metadata cached.
+    
+    Args:
+        paths: Files to evict
+    
+    Returns:
+        Method used ("drop_caches" or "fadvise"), or None if the platform
+        offers neither
+    """
+    if sys.platform.startswith("linux") and os.geteuid() == 0:
+        try:
+            os.sync()
+            with open("/proc/sys/vm/drop_caches", "w") as f:
+                f.write("3\n")
+            return "drop_caches"
+        except OSError:
+            pass
+    
+    if not hasattr(os, "posix_fadvise"):
+        return None
+    
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    return "fadvise"
+
+
+def measure(
+    run: Callable[[], Any],
+    repeat: int = 3,
+    setup: Optional[Callable[[], Any]] = None
+) -> List[float]:
+    """
+    Time a function several times.
+    
+    Args:
+        run: Function to time
+        repeat: Number of timed runs
+        setup: Untimed function called before each run (e.g. to reset state
+            or drop caches)
+    
+    Returns:
+        Seconds per run
+    """
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def summarize(timings: List[float], items: int = 0) -> Dict[str, Any]:
+    """
+    Summarize run timings.
+    
+    Args:
+        timings: Seconds per run
+        items: Items processed per run, for a throughput figure
+    
+    Returns:
+        Dictionary with runs, min, median and max seconds (and
+        items_per_second of the median run if items is set)
+    """
+    summary: Dict[str, Any] = {
+        "runs": len(timings),
+        "min_seconds": min(timings),
+        "median_seconds": statistics.median(timings),
+        "max_seconds": max(timings),
+    }
+    if items:
+        summary["items"] = items
+        summary["items_per_second"] = items / summary["median_seconds"] if summary["median_seconds"] > 0 else 0.0
+    return summary
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the machine a run was measured on.
+    
+    Returns:
+        Dictionary with python, platform, machine and cpu_count
+    """
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(results: Dict[str, Any], file_path: Path) -> None:
+    """
+    Write benchmark results as JSON.
+    
+    Args:
+        results: Results dictionary
+        file_path: Destination file
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+
+
+def check_regressions(
+    results: Dict[str, Any],
+    thresholds: Optional[Dict[str, Any]] = None,
+    baseline: Optional[Dict[str, Any]] = None,
+    tolerance: float = 0.2,
+    min_delta: float = 0.005
+) -> List[str]:
+    """
+    Compare results with absolute thresholds and a baseline run.
+    
+    Results are keyed "benchmark/shape/cache". Thresholds map a full
+    key, "benchmark/shape" or "benchmark/*" to limits: max_seconds on
+    the median time and min_items_per_second on throughput. The baseline check fails a benchmark whose median is
+    more than tolerance (and at least min_delta seconds) slower than in
+    the baseline results, so timer noise on tiny runs does not fail.
+    
+    Args:
+        results: Results of this run (as written by write_results)
+        thresholds: Threshold dictionary (optional)
+        baseline: Results of an earlier run (optional)
+        tolerance: Allowed slowdown against the baseline (default: 20%)
+        min_delta: Slowdowns below this many seconds never fail (default: 5ms)
+    
+    Returns:
+        List of failure messages (empty if nothing regressed)
+    """
+    failures = []
+    baseline_results = (baseline or {}).get("results", {})
+    
+    for key, summary in results.get("results", {}).items():
+        limits = _limits_for(key, thresholds or {})
+        median = summary["median_seconds"]
+        
+        max_seconds = limits.get("max_seconds")
+        if max_seconds is not None and median > max_seconds:
+            failures.append(f"{key}: median {median:.3f}s exceeds threshold {max_seconds:.3f}s")
+        
+        min_rate = limits.get("min_items_per_second")
+        rate = summary.get("items_per_second")
+        if min_rate is not None and rate is not None and rate < min_rate:
+            failures.append(f"{key}: {rate:.0f} items/s is below threshold {min_rate:.0f} items/s")
+        
+        previous = baseline_results.get(key)
+        if (
+            previous
+            and median > previous["median_seconds"] * (1 + tolerance)
+            and median - previous["median_seconds"] >= min_delta
+        ):
+            failures.append(
+                f"{key}: median {median:.3f}s is {median / previous['median_seconds'] - 1:.0%} "
+                f"slower than baseline {previous['median_seconds']:.3f}s"
+            )
+    
+    return failures
+
+
+def _limits_for(key: str, thresholds: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Find the most specific thresholds for a result.
+    
+    Args:
+        key: Result key ("benchmark/shape/cache")
+        thresholds: Threshold dictionary
+    
+    Returns:
+        Limits dictionary (empty if none apply)
+    """
+    parts = key.split("/")
+    for candidate in (key, "/".join(parts[:2]), f"{parts[0]}/*"):
+        if candidate in thresholds:
+            return thresholds[candidate]
+    return {}
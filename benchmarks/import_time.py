@@ -0,0 +1,127 @@
+"""
+Measure module import time with `python -X importtime`.
+
+Usage:
+    python -m benchmarks.import_time [--modules fileflow_cli.tui.app,...] [--output imports.json]
+
+Each import runs in a fresh interpreter. Targets are read from
+thresholds.json ("import_time/<module>" keys); the run exits with status 1
+if a module takes longer than its target.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from .harness import check_regressions, environment, summarize, write_results
+
+
+# Entry points whose startup cost matters
+MODULES = (
+    "fileflow_cli.main",
+    "fileflow_cli.cli",
+    "fileflow_cli.tui.app",
+)
+
+DEFAULT_THRESHOLDS = Path(__file__).with_name("thresholds.json")
+
+
+def import_time(module: str) -> Tuple[Optional[float], List[Tuple[str, float]]]:
+    """
+    Import a module in a fresh interpreter and read -X importtime output.
+    
+    Args:
+        module: Module name
+    
+    Returns:
+        Cumulative import seconds of the module (None if it failed to
+        import) and the slowest modules it pulled in as (name, self seconds)
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if completed.returncode != 0:
+        return None, []
+    
+    cumulative = None
+    slowest = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        fields = line[len("import time:"):].split("|")
+        try:
+            self_us, cumulative_us = int(fields[0]), int(fields[1])
+        except ValueError:
+            continue  # Column header
+        name = fields[2].strip()
+        slowest.append((name, self_us / 1e6))
+        if name == module:
+            cumulative = cumulative_us / 1e6
+    
+    slowest.sort(key=lambda item: item[1], reverse=True)
+    return cumulative, slowest[:10]
+
+
+def main(argv=None) -> int:
+    """
+    Measure import times and check them against their targets.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    
+    Returns:
+        Exit status (0 on success, 1 if a module failed to import or a
+        target was missed)
+    """
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.import_time")
+    parser.add_argument("--modules", default=",".join(MODULES), help="Comma-separated modules")
+    parser.add_argument("--repeat", type=int, default=5, help="Imports per module (default: 5)")
+    parser.add_argument("--output", type=Path, help="Write results JSON to this file")
+    parser.add_argument("--thresholds", type=Path, default=DEFAULT_THRESHOLDS, help="Threshold file")
+    args = parser.parse_args(argv)
+    
+    results: Dict[str, Any] = {
+        "created_at": datetime.now().isoformat(),
+        "environment": environment(),
+        "parameters": {"repeat": args.repeat},
+        "results": {}
+    }
+    import_failures: List[str] = []
+    for module in [module for module in args.modules.split(",") if module]:
+        timings = []
+        slowest: List[Tuple[str, float]] = []
+        for _ in range(args.repeat):
+            seconds, slowest = import_time(module)
+            if seconds is None:
+                break
+            timings.append(seconds)
+        if not timings:
+            print(f"{module:<40} import failed (missing dependencies?)", file=sys.stderr)
+            import_failures.append(f"{module}: import failed")
+            continue
+        
+        summary = summarize(timings)
+        summary["cache"] = "warm"
+        summary["slowest_imports"] = [{"module": name, "seconds": seconds} for name, seconds in slowest]
+        results["results"][f"import_time/{module}/warm"] = summary
+        print(f"{module:<40} {summary['median_seconds'] * 1000:8.1f} ms")
+    
+    if args.output:
+        write_results(results, args.output)
+    
+    thresholds = json.loads(args.thresholds.read_text(encoding="utf-8")) if args.thresholds else None
+    # A module that no longer imports is the worst regression of all
+    failures = import_failures + check_regressions(results, thresholds)
+    for failure in failures:
+        print(f"REGRESSION {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""Benchmarks of the indexing and storage hot paths."""
+
+from pathlib import Path
+from typing import Callable, Dict, Any, Optional, List
+
+from fileflow_cli.core.indexer import FileIndexer
+from fileflow_cli.storage.checkpoint_manager import CheckpointManager
+from fileflow_cli.storage.index_storage import IndexStorage
+from fileflow_cli.utils.config import init_config
+
+from .harness import drop_caches, measure, summarize
+from .tree_generator import generate_tree, list_files
+
+
+# Benchmarks in run order; cold-cache runs only apply to those that read the tree
+BENCHMARKS = (
+    "collect_files",
+    "index_directory",
+    "checkpoint_save",
+    "checkpoint_load",
+    "index_save",
+    "index_load",
+    "resume",
+)
+COLD_BENCHMARKS = ("collect_files", "index_directory", "resume")
+
+# Batches completed before a run is interrupted for the resume benchmark
+RESUME_AFTER_BATCHES = 2
+
+
+class ShapeBenchmarks:
+    """Runs the benchmarks against one synthetic tree."""
+    
+    def __init__(self, workdir: Path, shape: str, scale: float = 1.0, seed: int = 0, repeat: int = 3):
+        """
+        Generate (or reuse) the tree and prepare a config directory for it.
+        
+        Args:
+            workdir: Directory holding trees and benchmark state
+            shape: Tree shape name
+            scale: Tree size multiplier
+            seed: Tree generator seed
+            repeat: Timed runs per benchmark
+        """
+        self.shape = shape
+        self.repeat = repeat
+        self.base_dir = Path(workdir).resolve() / f"{shape}-{scale:g}-{seed}"
+        self.tree = self.base_dir / "tree"
+        self.manifest = generate_tree(self.tree, shape, scale, seed)
+        self.files = [path for path, _ in list_files(self.tree)]
+        
+        # The config directory lives next to the tree, never inside it
+        self.config_dir = self.base_dir / ".fileflow_cli"
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        init_config(self.base_dir)
+        
+        self._records: Optional[List[Dict[str, Any]]] = None
+    
+    def run(self, names: Optional[List[str]] = None, cold: bool = True) -> Dict[str, Any]:
+        """
+        Run benchmarks against the tree.
+        
+        Args:
+            names: Benchmarks to run (default: all)
+            cold: Also measure cold-cache runs where they apply
+        
+        Returns:
+            Summaries keyed "benchmark/shape/cache"
+        """
+        results = {}
+        for name in names or BENCHMARKS:
+            harness = getattr(self, f"bench_{name}")
+            caches = ("warm", "cold") if cold and name in COLD_BENCHMARKS else ("warm",)
+            for cache in caches:
+                summary = harness(cache == "cold")
+                summary["cache"] = cache
+                results[f"{name}/{self.shape}/{cache}"] = summary
+        return results
+    
+    def bench_collect_files(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time the directory scan.
+        
+        Args:
+            cold: Drop caches before each run
+        
+        Returns:
+            Timing summary
+        """
+        indexer = FileIndexer(self.config_dir)
+        return self._measure(lambda: indexer._collect_files(self.tree), cold, len(self.files))
+    
+    def bench_index_directory(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time a complete fresh indexing run.
+        
+        Args:
+            cold: Drop caches before each run
+        
+        Returns:
+            Timing summary
+        """
+        def run() -> None:
+            for _ in FileIndexer(self.config_dir).index_directory(self.tree):
+                pass
+        
+        return self._measure(run, cold, len(self.files), reset=self._reset_state)
+    
+    def bench_checkpoint_save(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time saving a checkpoint that covers every file of the tree.
+        
+        Each run starts a new checkpoint, so every file goes into the
+        saved segment (later saves of a run only append new files).
+        
+        Args:
+            cold: Unused (checkpoints are written from memory)
+        
+        Returns:
+            Timing summary
+        """
+        manager = CheckpointManager(self.config_dir)
+        progress_data = self._progress_data()
+        summary = self._measure(
+            lambda: manager.save_checkpoint(progress_data), False, len(self.files), reset=manager.begin
+        )
+        manager.clear_checkpoint()
+        return summary
+    
+    def bench_checkpoint_load(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time loading and validating a checkpoint that covers every file.
+        
+        A new manager loads it each time, so every segment is verified.
+        
+        Args:
+            cold: Unused (the checkpoint was just written)
+        
+        Returns:
+            Timing summary
+        """
+        manager = CheckpointManager(self.config_dir)
+        manager.save_checkpoint(self._progress_data())
+        summary = self._measure(
+            lambda: CheckpointManager(self.config_dir).load_checkpoint(), False, len(self.files)
+        )
+        manager.clear_checkpoint()
+        return summary
+    
+    def bench_index_save(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time saving the index (JSON, previews, record table, search index).
+        
+        Args:
+            cold: Unused (records are saved from memory)
+        
+        Returns:
+            Timing summary
+        """
+        storage = IndexStorage(self.config_dir)
+        records = self._index_records()
+        return self._measure(lambda: storage.save_index(records), False, len(records))
+    
+    def bench_index_load(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time loading the full index.
+        
+        Args:
+            cold: Unused (the index was just written)
+        
+        Returns:
+            Timing summary
+        """
+        storage = IndexStorage(self.config_dir)
+        records = self._index_records()
+        storage.save_index(records)
+        return self._measure(storage.load_index, False, len(records))
+    
+    def bench_resume(self, cold: bool) -> Dict[str, Any]:
+        """
+        Time from resuming an interrupted run to its first progress update.
+        
+        Before each timed run, a fresh run is interrupted after
+        RESUME_AFTER_BATCHES batches, leaving a checkpoint behind.
+        
+        Args:
+            cold: Drop caches before each run
+        
+        Returns:
+            Timing summary
+        """
+        def interrupt() -> None:
+            self._reset_state()
+            run = FileIndexer(self.config_dir).index_directory(self.tree)
+            for batch, _ in enumerate(run, 1):
+                if batch >= RESUME_AFTER_BATCHES:
+                    break
+            run.close()
+        
+        def resume() -> None:
+            run = FileIndexer(self.config_dir).resume_indexing(self.tree)
+            next(run, None)
+            run.close()
+        
+        summary = self._measure(resume, cold, 0, reset=interrupt)
+        self._reset_state()
+        return summary
+    
+    def _measure(
+        self,
+        run: Callable[[], Any],
+        cold: bool,
+        items: int,
+        reset: Optional[Callable[[], Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        Time a benchmark, after one untimed warm-up run if the cache is warm.
+        
+        Args:
+            run: Function to time
+            cold: Drop caches before each run
+            items: Items processed per run
+            reset: Untimed state reset before each run (optional)
+        
+        Returns:
+            Timing summary with the cache control method used
+        """
+        method = None
+        
+        def setup() -> None:
+            nonlocal method
+            if reset is not None:
+                reset()
+            if cold:
+                method = drop_caches(self.files)
+        
+        if not cold:
+            setup()
+            run()
+        
+        summary = summarize(measure(run, self.repeat, setup), items)
+        if cold:
+            summary["cold_method"] = method
+        return summary
+    
+    def _reset_state(self) -> None:
+        """Delete the index, staging file and checkpoint of earlier runs."""
+        storage = IndexStorage(self.config_dir)
+        storage.clear_staged()
+        CheckpointManager(self.config_dir).clear_checkpoint()
+        for file_path in (
+            storage.index_file,
+            storage.previews_file,
+            storage.search_index_file,
+            storage.records_file,
+        ):
+            if file_path.exists():
+                file_path.unlink()
+    
+    def _progress_data(self) -> Dict[str, Any]:
+        """
+        Build checkpoint progress data for every file of the tree.
+        
+        Returns:
+            Progress data dictionary
+        """
+        paths = [str(path.relative_to(self.tree)) for path in self.files]
+        return {
+            "total_files": len(paths),
+            "processed_files": len(paths),
+            "processed_paths": paths,
+            "file_hashes": {path: f"{number:064x}" for number, path in enumerate(paths)},
+            "current_batch": 1,
+            "total_batches": 1,
+            "status": "in_progress"
+        }
+    
+    def _index_records(self) -> List[Dict[str, Any]]:
+        """
+        Get the records of an indexed tree, with previews inline as the
+        indexer produces them (indexes the tree on first use).
+        
+        Returns:
+            List of file metadata dictionaries
+        """
+        if self._records is None:
+            storage = IndexStorage(self.config_dir)
+            if not storage.index_exists():
+                for _ in FileIndexer(self.config_dir).index_directory(self.tree):
+                    pass
+            
+            records = []
+            for record in storage.load_index()["files"]:
+                preview = storage.load_preview(record)
+                record = {
+                    key: value for key, value in record.items()
+                    if key not in ("preview_offset", "preview_length")
+                }
+                if preview is not None:
+                    record["preview"] = preview
+                records.append(record)
+            self._records = records
+        return self._records
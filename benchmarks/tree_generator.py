@@ -0,0 +1,213 @@
+"""Deterministic synthetic directory trees for benchmarks."""
+
+import json
+import os
+import random
+import shutil
+from pathlib import Path
+from typing import Dict, Any, List, Tuple
+
+
+# File extensions and whether their content is text
+EXTENSIONS = (
+    (".txt", True), (".md", True), (".py", True), (".json", True), (".csv", True),
+    (".jpg", False), (".png", False), (".pdf", False), (".zip", False), (".bin", False),
+)
+
+WORDS = (
+    "file", "flow", "index", "report", "draft", "photo", "invoice", "backup",
+    "project", "notes", "data", "final", "old", "new", "copy", "2024", "2025",
+)
+
+# Fixed base time for modification dates (2024-01-01 UTC)
+BASE_MTIME = 1704067200
+
+# Depth of the directory chains in "deep" trees
+DEEP_LEVELS = 128
+
+# Tree shapes at scale 1.0. Each entry lists file groups as
+# (directory layout, file count, (min size, max size)).
+SHAPES: Dict[str, Dict[str, Any]] = {
+    "deep": {
+        "description": "Narrow chains of deeply nested directories",
+        "groups": [("deep", 2000, (512, 16 * 1024))],
+    },
+    "wide": {
+        "description": "Thousands of sibling directories one level down",
+        "groups": [("wide", 5000, (512, 16 * 1024))],
+    },
+    "tiny": {
+        "description": "Many tiny files in a few directories",
+        "groups": [("flat", 20000, (0, 256))],
+    },
+    "huge": {
+        "description": "A few large files",
+        "groups": [("flat", 6, (32 * 1024 * 1024, 32 * 1024 * 1024))],
+    },
+    "mixed": {
+        "description": "A realistic mix of all of the above",
+        "groups": [
+            ("balanced", 9000, (256, 64 * 1024)),
+            ("deep", 500, (512, 16 * 1024)),
+            ("flat", 2000, (0, 256)),
+            ("flat", 3, (8 * 1024 * 1024, 8 * 1024 * 1024)),
+        ],
+    },
+}
+
+
+def _directory_for(layout: str, group: int, number: int, rng: random.Random) -> Path:
+    """
+    Choose the directory of a file.
+    
+    Args:
+        layout: "deep", "wide", "flat" or "balanced"
+        group: Group number (keeps groups apart)
+        number: File number within the group
+        rng: Random generator
+    
+    Returns:
+        Directory path relative to the tree root
+    """
+    base = Path(f"g{group}_{layout}")
+    if layout == "deep":
+        # Two files per level of chains DEEP_LEVELS directories deep
+        chain, depth = divmod(number // 2, DEEP_LEVELS)
+        return base.joinpath(f"chain{chain:03d}", *[f"level{level:03d}" for level in range(depth)])
+    if layout == "wide":
+        return base / f"dir{number // 2:05d}"
+    if layout == "flat":
+        return base / f"dir{number // 1000:03d}"
+    # Balanced: 3 levels with a fan-out of 10
+    return base / f"a{rng.randrange(10)}" / f"b{rng.randrange(10)}" / f"c{rng.randrange(10)}"
+
+
+def _write_content(file_path: Path, size: int, is_text: bool, rng: random.Random, pool: bytes) -> None:
+    """
+    Write deterministic file content.
+    
+    Args:
+        file_path: File to create
+        size: Size in bytes
+        is_text: Write words instead of binary data
+        rng: Random generator
+        pool: Random bytes to draw binary content from
+    """
+    with open(file_path, "wb") as f:
+        if is_text:
+            line = " ".join(rng.choice(WORDS) for _ in range(12)).encode("ascii") + b"\n"
+            f.write((line * (size // len(line) + 1))[:size])
+            return
+        
+        remaining = size
+        while remaining > 0:
+            start = rng.randrange(len(pool) // 2)
+            chunk = pool[start:start + min(remaining, len(pool) // 2)]
+            f.write(chunk)
+            remaining -= len(chunk)
+
+
+def generate_tree(root: Path, shape: str, scale: float = 1.0, seed: int = 0) -> Dict[str, Any]:
+    """
+    Create a synthetic directory tree.
+    
+    The same shape, scale and seed always produce the same paths, sizes,
+    contents and modification dates. A manifest next to the root (so it
+    is not part of the tree) records the parameters; a matching existing
+    tree is reused instead of rebuilt.
+    
+    Args:
+        root: Directory to create the tree in (replaced if it differs)
+        shape: Shape name (see SHAPES)
+        scale: Multiplier for file counts (large-file shapes scale sizes)
+        seed: Random seed
+    
+    Returns:
+        Manifest with shape, scale, seed, file_count and total_bytes
+    """
+    if shape not in SHAPES:
+        raise ValueError(f"Unknown tree shape: {shape}")
+    
+    root = Path(root)
+    manifest_path = manifest_path_for(root)
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if root.is_dir() and (manifest.get("shape"), manifest.get("scale"), manifest.get("seed")) == (shape, scale, seed):
+            return manifest
+    except (FileNotFoundError, json.JSONDecodeError):
+        pass
+    
+    if root.exists():
+        shutil.rmtree(root)
+    root.mkdir(parents=True)
+    
+    rng = random.Random(f"{shape}:{seed}")
+    pool = rng.getrandbits(8 * 1024 * 1024).to_bytes(1024 * 1024, "little")
+    
+    file_count = 0
+    total_bytes = 0
+    for group, (layout, count, (min_size, max_size)) in enumerate(SHAPES[shape]["groups"]):
+        if min_size >= 1024 * 1024:
+            # Few large files: scale their size, keep their number
+            min_size, max_size = int(min_size * scale), int(max_size * scale)
+        else:
+            count = max(1, int(count * scale))
+        
+        for number in range(count):
+            directory = root / _directory_for(layout, group, number, rng)
+            directory.mkdir(parents=True, exist_ok=True)
+            
+            extension, is_text = rng.choice(EXTENSIONS)
+            name = f"{rng.choice(WORDS)}_{number:06d}{extension}"
+            size = rng.randint(min_size, max_size)
+            file_path = directory / name
+            _write_content(file_path, size, is_text, rng, pool)
+            
+            mtime = BASE_MTIME + rng.randrange(365 * 24 * 3600)
+            os.utime(file_path, (mtime, mtime))
+            file_count += 1
+            total_bytes += size
+    
+    manifest = {
+        "shape": shape,
+        "scale": scale,
+        "seed": seed,
+        "file_count": file_count,
+        "total_bytes": total_bytes,
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def manifest_path_for(root: Path) -> Path:
+    """
+    Get the manifest file of a tree.
+    
+    Args:
+        root: Tree root
+    
+    Returns:
+        Manifest path (a sibling of the root)
+    """
+    root = Path(root)
+    return root.with_name(f"{root.name}.manifest.json")
+
+
+def list_files(root: Path) -> List[Tuple[Path, int]]:
+    """
+    List the generated files of a tree.
+    
+    Args:
+        root: Tree root
+    
+    Returns:
+        (path, size) pairs, sorted by path
+    """
+    files = []
+    for directory, _, names in os.walk(root):
+        for name in names:
+            file_path = Path(directory) / name
+            files.append((file_path, file_path.stat().st_size))
+    return sorted(files)
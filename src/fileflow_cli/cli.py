@@ -0,0 +1,466 @@
+"""
+Headless command line interface for FileFlowCLI.
+
+Runs indexing and file operations without the TUI, e.g. from cron or
+batch jobs:
+
+    fileflow-cli index PATH       Index PATH from scratch
+    fileflow-cli resume PATH      Continue an interrupted run (or start one)
+    fileflow-cli status PATH      Report index and checkpoint state
+    fileflow-cli diff OLD NEW     Report what changed between two indexes
+    fileflow-cli apply PATH PLAN  Apply a plan of file operations
+    fileflow-cli undo PATH        Roll back the last plan
+
+Progress and results are written to stdout as JSON lines, one event
+per line; diagnostics go to stderr. This module must stay importable
+without Textual or openai, and heavy modules are imported inside the
+commands, so short commands start fast.
+"""
+
+import argparse
+import json
+import signal
+import sys
+import time
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Dict, Any, Optional, TextIO
+
+from .utils.error_handler import IndexLockedError
+
+
+COMMANDS = ("index", "resume", "status", "diff", "apply", "undo")
+
+# Exit codes
+EXIT_OK = 0
+EXIT_ERROR = 1          # Unexpected failure
+EXIT_USAGE = 2          # Bad arguments (argparse)
+EXIT_FILE_ERRORS = 3    # Run completed, but some files could not be indexed (or moved)
+EXIT_NO_INDEX = 4       # status: PATH has no index and no interrupted run; diff: OLD or NEW has no index
+EXIT_LOCKED = 5         # Another process is indexing PATH
+EXIT_INTERRUPTED = 130  # Interrupted; the checkpoint (or operation journal) is kept for resuming
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """
+    Build the argument parser for the headless commands.
+    
+    Returns:
+        Argument parser
+    """
+    parser = argparse.ArgumentParser(
+        prog="fileflow-cli",
+        description="Index directories without the TUI. Events are written to stdout as JSON lines."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    
+    for command, help_text in (
+        ("index", "Index PATH from scratch"),
+        ("resume", "Continue an interrupted run of PATH (starts one if there is none)"),
+    ):
+        command_parser = commands.add_parser(command, help=help_text)
+        command_parser.add_argument("path", type=Path, help="Directory to index")
+        command_parser.add_argument(
+            "--profile",
+            nargs="?",
+            const="sampling",
+            choices=("sampling", "cprofile"),
+            help="Write a CPU and memory profile to .fileflow_cli/profiles/"
+        )
+    
+    status_parser = commands.add_parser("status", help="Report the index and checkpoint state of PATH")
+    status_parser.add_argument("path", type=Path, help="Indexed directory")
+    
+    diff_parser = commands.add_parser("diff", help="Report the files added, removed, modified and moved between two indexes")
+    diff_parser.add_argument("old", type=Path, help="Indexed directory or a copy of its .fileflow_cli directory")
+    diff_parser.add_argument("new", type=Path, help="Indexed directory or a copy of its .fileflow_cli directory")
+    diff_parser.add_argument("--summary-only", action="store_true", help="Write only the summary event")
+    
+    apply_parser = commands.add_parser("apply", help="Apply a plan of file operations to PATH")
+    apply_parser.add_argument("path", type=Path, help="Organized directory")
+    apply_parser.add_argument("plan", type=Path, nargs="?", help="JSON file with a list of operations (or {\"description\", \"operations\"})")
+    apply_parser.add_argument("--resume", action="store_true", help="Continue the interrupted plan instead")
+    
+    undo_parser = commands.add_parser("undo", help="Roll back the last plan applied to PATH")
+    undo_parser.add_argument("path", type=Path, help="Organized directory")
+    return parser
+
+
+def emit(out: TextIO, event: str, **fields: Any) -> None:
+    """
+    Write one JSON-lines event.
+    
+    Args:
+        out: Output stream
+        event: Event name
+        **fields: Event fields
+    """
+    out.write(json.dumps({"event": event, "time": round(time.time(), 3), **fields}, separators=(",", ":")))
+    out.write("\n")
+    out.flush()
+
+
+def run(argv=None) -> int:
+    """
+    Run a headless command.
+    
+    Args:
+        argv: Argument list starting with the command (default: sys.argv[1:])
+    
+    Returns:
+        Exit code
+    """
+    args = build_parser().parse_args(argv)
+    out = sys.stdout
+    
+    # Library code reports problems with print(); keep stdout pure JSON lines
+    with redirect_stdout(sys.stderr):
+        try:
+            if args.command == "status":
+                return _status(args.path, out)
+            if args.command == "diff":
+                return _diff(args.old, args.new, out, summary_only=args.summary_only)
+            if args.command in ("apply", "undo"):
+                return _operations(args, out)
+            return _index(args.path, out, resume=args.command == "resume", profile=args.profile)
+        except KeyboardInterrupt:
+            emit(out, "interrupted", path=str(_command_path(args)))
+            return EXIT_INTERRUPTED
+        except IndexLockedError as e:
+            emit(out, "locked", path=str(_command_path(args)), message=str(e), holder=e.holder)
+            return EXIT_LOCKED
+        except Exception as e:
+            emit(out, "error", path=str(_command_path(args)), error=type(e).__name__, message=str(e))
+            return EXIT_ERROR
+
+
+def _command_path(args: argparse.Namespace) -> Path:
+    """
+    Get the path a command works on, for events.
+    
+    Args:
+        args: Parsed arguments
+    
+    Returns:
+        Directory of the command (NEW for diff)
+    """
+    return args.new if args.command == "diff" else args.path
+
+
+def _init(path: Path) -> Path:
+    """
+    Load the configuration of an indexed directory.
+    
+    Headless commands always use PATH/.fileflow_cli (created if needed),
+    never the .fileflow_cli of a parent directory: its index holds paths
+    relative to the parent.
+    
+    Args:
+        path: Directory (resolved)
+    
+    Returns:
+        Path to its .fileflow_cli directory
+    
+    Raises:
+        NotADirectoryError: If path is not a directory
+    """
+    from .utils.config import init_config, get_config
+    from .utils.error_handler import init_error_handler
+    from .utils.metrics import init_metrics
+    
+    if not path.is_dir():
+        raise NotADirectoryError(f"Not a directory: {path}")
+    
+    config_manager = init_config(path, search_parents=False)
+    # Before any component looks up its metrics
+    init_metrics(get_config("metrics_enabled", False))
+    config_dir = config_manager.get_config_dir()
+    init_error_handler(
+        config_dir / "logs",
+        max_errors=get_config("error_log_size", 200),
+        log_max_bytes=get_config("error_log_max_bytes", 1048576),
+        log_backups=get_config("error_log_backups", 3)
+    )
+    return config_dir
+
+
+def _index(path: Path, out: TextIO, resume: bool, profile: Optional[str]) -> int:
+    """
+    Index a directory, streaming progress events.
+    
+    Args:
+        path: Directory to index
+        out: Output stream
+        resume: Continue from the checkpoint if there is one
+        profile: Profile the run in this mode (optional)
+    
+    Returns:
+        Exit code
+    """
+    path = path.resolve()
+    config_dir = _init(path)
+    
+    from .core.indexer import FileIndexer
+    
+    from .utils.config import get_performance_profile
+    
+    indexer = FileIndexer(config_dir)
+    profile_name, profile_reason = get_performance_profile()
+    
+    # Before touching the checkpoint of a run that may be going on
+    if not indexer.index_lock.acquire("index"):
+        raise IndexLockedError(config_dir, indexer.index_lock.holder())
+    
+    checkpoint = indexer.checkpoint_manager.load_checkpoint() if resume else None
+    if not resume:
+        indexer.checkpoint_manager.clear_checkpoint()
+    
+    emit(
+        out, "start",
+        command="resume" if resume else "index",
+        path=str(path),
+        resumed=checkpoint is not None,
+        processed_files=checkpoint.get("processed_files", 0) if checkpoint else 0,
+        performance_profile=profile_name,
+        performance_profile_reason=profile_reason
+    )
+    
+    profiler = None
+    if profile:
+        from .utils.profiler import RunProfiler
+        profiler = RunProfiler(config_dir, mode=profile)
+        profiler.start()
+    
+    # The first Ctrl-C (or SIGTERM) cancels the run, which saves a final
+    # checkpoint; a second Ctrl-C interrupts at once
+    def cancel(signum, frame) -> None:
+        signal.signal(signal.SIGINT, previous_sigint)
+        indexer.cancel()
+    
+    previous_sigint = signal.signal(signal.SIGINT, cancel)
+    previous_sigterm = signal.signal(signal.SIGTERM, cancel)
+    
+    final: Dict[str, Any] = {}
+    try:
+        for progress in indexer.index_directory(path, checkpoint):
+            final = progress
+            if not progress.get("complete") and not progress.get("cancelled"):
+                emit(out, "progress", **_progress_fields(progress))
+    finally:
+        signal.signal(signal.SIGINT, previous_sigint)
+        signal.signal(signal.SIGTERM, previous_sigterm)
+        if profiler is not None:
+            report_path = profiler.stop(indexer.progress.snapshot()["stage_times"])
+            if report_path is not None:
+                emit(out, "profile", path=str(report_path))
+    
+    if final.get("cancelled"):
+        emit(out, "interrupted", path=str(path), **_progress_fields(final))
+        return EXIT_INTERRUPTED
+    
+    fields = _progress_fields(final)
+    fields["stage_times"] = final.get("stage_times", {})
+    fields["error_groups"] = final.get("error_groups", [])
+    emit(out, "complete", path=str(path), **fields)
+    return EXIT_FILE_ERRORS if final.get("error_count") else EXIT_OK
+
+
+def _progress_fields(progress: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Pick the fields of an indexer progress update that go into events.
+    
+    Args:
+        progress: Progress update dictionary
+    
+    Returns:
+        Event fields
+    """
+    eta = progress.get("eta_seconds")
+    return {
+        "processed_files": progress.get("processed_files", 0),
+        "total_files": progress.get("total_files", 0),
+        "percent": round(progress.get("progress_percent", 0.0), 2),
+        "batch": progress.get("current_batch", 0),
+        "total_batches": progress.get("total_batches", 0),
+        "files_per_second": round(progress.get("files_per_second", 0.0), 1),
+        "bytes_per_second": round(progress.get("bytes_per_second", 0.0)),
+        "eta_seconds": round(eta, 1) if eta is not None else None,
+        "errors": progress.get("error_count", 0),
+        "elapsed_seconds": round(progress.get("elapsed_seconds", 0.0), 3)
+    }
+
+
+def _status(path: Path, out: TextIO) -> int:
+    """
+    Report the index and checkpoint state of a directory.
+    
+    Reads only the index header and the checkpoint, never the full
+    index, and creates nothing: a directory that was never indexed is
+    left as it is.
+    
+    Args:
+        path: Indexed directory
+        out: Output stream
+    
+    Returns:
+        Exit code (EXIT_NO_INDEX if there is neither an index nor a checkpoint)
+    """
+    from .utils.config import find_config_dir
+    
+    path = path.resolve()
+    if not path.is_dir():
+        raise NotADirectoryError(f"Not a directory: {path}")
+    config_dir = find_config_dir(path, search_parents=False)
+    
+    header = checkpoint = lock_holder = None
+    if config_dir is not None:
+        from .storage.checkpoint_manager import CheckpointManager
+        from .storage.index_lock import IndexLock
+        from .storage.index_storage import IndexStorage
+        
+        header = IndexStorage(config_dir).get_index_header()
+        checkpoint = CheckpointManager(config_dir).get_checkpoint_progress()
+        lock_holder = IndexLock(config_dir).holder()
+    
+    emit(
+        out, "status",
+        path=str(path),
+        config_dir=str(config_dir) if config_dir is not None else None,
+        indexed=header is not None,
+        indexed_at=header.get("indexed_at") if header is not None else None,
+        file_count=header.get("file_count", 0) if header is not None else 0,
+        checkpoint=checkpoint,
+        locked_by=lock_holder
+    )
+    
+    if header is None and checkpoint is None:
+        return EXIT_NO_INDEX
+    return EXIT_OK
+
+
+def _index_config_dir(path: Path) -> Optional[Path]:
+    """
+    Find the index of a diff argument without creating anything.
+    
+    Args:
+        path: Indexed directory or a (copied) .fileflow_cli directory
+    
+    Returns:
+        Directory holding index.json, or None if there is no index
+    """
+    from .storage.index_storage import IndexStorage
+    
+    path = path.resolve()
+    for config_dir in (path / ".fileflow_cli", path):
+        if (config_dir / IndexStorage.INDEX_FILENAME).is_file():
+            return config_dir
+    return None
+
+
+def _diff(old: Path, new: Path, out: TextIO, summary_only: bool = False) -> int:
+    """
+    Report what changed between two indexes.
+    
+    Each change is an event named after its kind (modified, moved,
+    added, removed), followed by a "diff" event with the summary. Both
+    indexes are streamed from their record tables.
+    
+    Args:
+        old: Indexed directory (or .fileflow_cli copy) of the old index
+        new: Indexed directory (or .fileflow_cli copy) of the new index
+        out: Output stream
+        summary_only: Write only the summary event
+    
+    Returns:
+        Exit code (EXIT_NO_INDEX if either side has no index)
+    """
+    from .core.index_diff import IndexDiff
+    from .storage.index_storage import IndexStorage
+    
+    storages = {}
+    for side, path in (("old", old), ("new", new)):
+        config_dir = _index_config_dir(path)
+        if config_dir is None:
+            emit(out, "error", path=str(path), error="NoIndex", message=f"No index found for {side}: {path}")
+            return EXIT_NO_INDEX
+        storages[side] = IndexStorage(config_dir)
+    
+    index_diff = IndexDiff()
+    started = time.perf_counter()
+    for change in index_diff.diff(storages["old"].iter_records(), storages["new"].iter_records()):
+        if not summary_only:
+            fields = dict(change)
+            emit(out, fields.pop("change"), **fields)
+    
+    emit(
+        out, "diff",
+        old=str(old.resolve()),
+        new=str(new.resolve()),
+        old_indexed_at=storages["old"].get_indexed_at(),
+        new_indexed_at=storages["new"].get_indexed_at(),
+        elapsed_seconds=round(time.perf_counter() - started, 3),
+        **index_diff.summary
+    )
+    return EXIT_OK
+
+
+def _operations(args: argparse.Namespace, out: TextIO) -> int:
+    """
+    Apply, resume or roll back a plan of file operations.
+    
+    Ctrl-C (or SIGTERM) stops after the operation in progress; the
+    journal keeps the plan for `apply --resume` or `undo`.
+    
+    Args:
+        args: Parsed arguments of the apply or undo command
+        out: Output stream
+    
+    Returns:
+        Exit code
+    """
+    path = args.path.resolve()
+    config_dir = _init(path)
+    
+    from .core.file_operations import FileOperationExecutor
+    from .core.run_control import RunControl
+    from .utils.error_handler import FileOperationError
+    
+    operations = None
+    description = None
+    if args.command == "apply" and not args.resume:
+        if args.plan is None:
+            raise FileOperationError("A plan file is needed (or --resume)")
+        with open(args.plan, "r", encoding="utf-8") as f:
+            plan = json.load(f)
+        operations = plan.get("operations", []) if isinstance(plan, dict) else plan
+        description = plan.get("description") if isinstance(plan, dict) else None
+        description = description or f"Apply {args.plan.name}"
+    
+    control = RunControl()
+    executor = FileOperationExecutor(config_dir, path, control=control)
+    command = "undo" if args.command == "undo" else "resume" if args.resume else "apply"
+    emit(out, "start", command=command, path=str(path), operations=len(operations) if operations is not None else None)
+    
+    def cancel(signum, frame) -> None:
+        signal.signal(signal.SIGINT, previous_sigint)
+        control.cancel()
+    
+    previous_sigint = signal.signal(signal.SIGINT, cancel)
+    previous_sigterm = signal.signal(signal.SIGTERM, cancel)
+    try:
+        if command == "undo":
+            summary = executor.undo()
+        elif command == "resume":
+            summary = executor.resume()
+        else:
+            summary = executor.apply(operations, description)
+    finally:
+        signal.signal(signal.SIGINT, previous_sigint)
+        signal.signal(signal.SIGTERM, previous_sigterm)
+    
+    if summary["cancelled"]:
+        emit(out, "interrupted", path=str(path), **summary)
+        return EXIT_INTERRUPTED
+    
+    emit(out, "complete", path=str(path), **summary)
+    return EXIT_FILE_ERRORS if summary["failed"] else EXIT_OK
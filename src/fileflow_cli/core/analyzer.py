@@ -0,0 +1,281 @@
+"""Surface-level file analysis (magic numbers, MIME types, previews) for FileFlowCLI."""
+
+import codecs
+import mimetypes
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# Default number of head bytes read per file (shared with the quick hash)
+HEAD_SIZE = 8192
+
+# Signature table: (offset, magic bytes, MIME type, magic name)
+SIGNATURES: List[Tuple[int, bytes, str, str]] = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png", "PNG"),
+    (0, b"\xff\xd8\xff", "image/jpeg", "JPEG"),
+    (0, b"GIF87a", "image/gif", "GIF"),
+    (0, b"GIF89a", "image/gif", "GIF"),
+    (0, b"BM", "image/bmp", "BMP"),
+    (0, b"II*\x00", "image/tiff", "TIFF"),
+    (0, b"MM\x00*", "image/tiff", "TIFF"),
+    (0, b"\x00\x00\x01\x00", "image/x-icon", "ICO"),
+    (0, b"8BPS", "image/vnd.adobe.photoshop", "PSD"),
+    (0, b"%PDF-", "application/pdf", "PDF"),
+    (0, b"PK\x03\x04", "application/zip", "ZIP"),
+    (0, b"PK\x05\x06", "application/zip", "ZIP"),
+    (0, b"Rar!\x1a\x07", "application/vnd.rar", "RAR"),
+    (0, b"7z\xbc\xaf\x27\x1c", "application/x-7z-compressed", "7Z"),
+    (0, b"\x1f\x8b", "application/gzip", "GZIP"),
+    (0, b"BZh", "application/x-bzip2", "BZIP2"),
+    (0, b"\xfd7zXZ\x00", "application/x-xz", "XZ"),
+    (0, b"\x28\xb5\x2f\xfd", "application/zstd", "ZSTD"),
+    (0, b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "application/x-ole-storage", "OLE2"),
+    (0, b"{\\rtf", "application/rtf", "RTF"),
+    (0, b"ID3", "audio/mpeg", "MP3"),
+    (0, b"\xff\xfb", "audio/mpeg", "MP3"),
+    (0, b"\xff\xf3", "audio/mpeg", "MP3"),
+    (0, b"fLaC", "audio/flac", "FLAC"),
+    (0, b"OggS", "audio/ogg", "OGG"),
+    (0, b"MThd", "audio/midi", "MIDI"),
+    (0, b"\x1a\x45\xdf\xa3", "video/x-matroska", "MKV"),
+    (0, b"FLV", "video/x-flv", "FLV"),
+    (0, b"\x7fELF", "application/x-executable", "ELF"),
+    (0, b"MZ", "application/x-msdownload", "PE"),
+    (0, b"\xca\xfe\xba\xbe", "application/java-vm", "CLASS"),
+    (0, b"\xcf\xfa\xed\xfe", "application/x-mach-binary", "MACHO"),
+    (0, b"\x00asm", "application/wasm", "WASM"),
+    (0, b"SQLite format 3\x00", "application/vnd.sqlite3", "SQLITE"),
+    (0, b"wOFF", "font/woff", "WOFF"),
+    (0, b"wOF2", "font/woff2", "WOFF2"),
+    (0, b"\x00\x01\x00\x00\x00", "font/ttf", "TTF"),
+    (0, b"OTTO", "font/otf", "OTF"),
+    (0, b"\xef\xbb\xbf", "text/plain", "UTF8_BOM"),
+    (0, b"\xff\xfe", "text/plain", "UTF16LE_BOM"),
+    (0, b"\xfe\xff", "text/plain", "UTF16BE_BOM"),
+    (4, b"ftypqt", "video/quicktime", "MOV"),
+    (4, b"ftypM4A", "audio/mp4", "M4A"),
+    (4, b"ftypheic", "image/heic", "HEIC"),
+    (4, b"ftypavif", "image/avif", "AVIF"),
+    (4, b"ftyp", "video/mp4", "MP4"),
+    (257, b"ustar", "application/x-tar", "TAR"),
+]
+
+# Container formats refined by a second signature further into the header
+RIFF_SUBTYPES: Dict[bytes, Tuple[str, str]] = {
+    b"WAVE": ("audio/wav", "WAV"),
+    b"AVI ": ("video/x-msvideo", "AVI"),
+    b"WEBP": ("image/webp", "WEBP"),
+}
+
+# Short signatures that also occur at the start of ordinary text files
+_WEAK_MAGICS = frozenset({"BMP", "PE", "MP3", "FLV"})
+
+# Bytes that never appear in plain text (NUL and most C0 controls)
+_BINARY_BYTES = bytes(range(0, 7)) + bytes(range(14, 27)) + bytes(range(28, 32))
+
+
+def _compile_signatures(
+    signatures: List[Tuple[int, bytes, str, str]]
+) -> Dict[Tuple[int, int], List[Tuple[bytes, str, str]]]:
+    """
+    Compile signatures into a lookup table keyed by (offset, first byte).
+    
+    Candidates within a bucket are ordered longest-first, so the most
+    specific signature wins.
+    
+    Args:
+        signatures: Signature table
+    
+    Returns:
+        Lookup table
+    """
+    table: Dict[Tuple[int, int], List[Tuple[bytes, str, str]]] = {}
+    for offset, magic_bytes, mime_type, magic in signatures:
+        table.setdefault((offset, magic_bytes[0]), []).append((magic_bytes, mime_type, magic))
+    
+    for candidates in table.values():
+        candidates.sort(key=lambda candidate: len(candidate[0]), reverse=True)
+    
+    return table
+
+
+_SIGNATURE_TABLE = _compile_signatures(SIGNATURES)
+_SIGNATURE_OFFSETS = sorted({offset for offset, _, _, _ in SIGNATURES})
+
+
+class BufferPool:
+    """Per-worker reusable read buffers."""
+    
+    def __init__(self, size: int = HEAD_SIZE):
+        """
+        Initialize buffer pool.
+        
+        Args:
+            size: Buffer size in bytes
+        """
+        self.size = size
+        self._local = threading.local()
+    
+    def acquire(self) -> bytearray:
+        """
+        Get the calling thread's buffer (allocated on first use).
+        
+        Returns:
+            Reusable bytearray of pool size
+        """
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = bytearray(self.size)
+            self._local.buffer = buffer
+        return buffer
+
+
+class FileAnalyzer:
+    """Detects content types and extracts previews from file head bytes."""
+    
+    def sniff(self, head: memoryview, name: str = "") -> Tuple[str, str]:
+        """
+        Detect MIME type and magic name from the first bytes of a file.
+        
+        Args:
+            head: Head bytes of the file (not copied)
+            name: File name, used to refine text MIME types
+        
+        Returns:
+            Tuple of (mime_type, magic)
+        """
+        length = len(head)
+        if length == 0:
+            return "application/x-empty", "EMPTY"
+        
+        for offset in _SIGNATURE_OFFSETS:
+            if offset >= length:
+                break
+            candidates = _SIGNATURE_TABLE.get((offset, head[offset]))
+            if not candidates:
+                continue
+            for magic_bytes, mime_type, magic in candidates:
+                end = offset + len(magic_bytes)
+                if end <= length and head[offset:end] == magic_bytes:
+                    if magic.endswith("_BOM"):
+                        return self._text_mime(name), "text"
+                    if magic in _WEAK_MAGICS and self.is_text(head):
+                        continue
+                    return mime_type, magic
+        
+        if length >= 12 and head[0:4] == b"RIFF":
+            subtype = RIFF_SUBTYPES.get(bytes(head[8:12]))
+            if subtype:
+                return subtype
+        
+        if self.is_text(head):
+            return self._text_mime(name), "text"
+        
+        return "application/octet-stream", "data"
+    
+    def is_text(self, head: memoryview) -> bool:
+        """
+        Check whether head bytes look like text.
+        
+        Args:
+            head: Head bytes of the file
+        
+        Returns:
+            True if no binary control bytes are present
+        """
+        sample = head[:1024].tobytes() if len(head) > 1024 else head.tobytes()
+        return len(sample.translate(None, _BINARY_BYTES)) == len(sample)
+    
+    def _text_mime(self, name: str) -> str:
+        """
+        Get MIME type for a text file.
+        
+        Args:
+            name: File name
+        
+        Returns:
+            MIME type guessed from the name, or text/plain
+        """
+        guessed, _ = mimetypes.guess_type(name, strict=False) if name else (None, None)
+        if guessed and (guessed.startswith("text/") or guessed.endswith(("json", "xml", "javascript"))):
+            return guessed
+        return "text/plain"
+    
+    def extract_preview(
+        self,
+        head: memoryview,
+        size: int,
+        max_bytes: int = 1024,
+        max_lines: int = 20,
+        max_file_size: int = 10 * 1024 * 1024
+    ) -> Optional[Tuple[str, str]]:
+        """
+        Extract a bounded text preview from the file head.
+        
+        The head is cut at the line or byte limit before decoding, so at
+        most max_bytes are ever decoded. UTF-16 text is cut at the byte
+        limit, decoded and then cut at the line limit, as its newlines
+        are two bytes wide.
+        
+        Args:
+            head: Head bytes of the file (not copied)
+            size: File size in bytes
+            max_bytes: Maximum preview size in bytes (default: 1024)
+            max_lines: Maximum number of preview lines (default: 20)
+            max_file_size: No preview for files larger than this (default: 10MB)
+        
+        Returns:
+            Tuple of (preview text, encoding) or None if no preview applies
+        """
+        if size == 0 or size > max_file_size or len(head) == 0:
+            return None
+        
+        sample = head[:max_bytes].tobytes()
+        
+        if sample.startswith((b"\xff\xfe", b"\xfe\xff")):
+            # UTF-16: decode whole code units; the incremental decoder
+            # drops a surrogate pair cut at the end
+            sample = sample[:len(sample) - (len(sample) % 2)]
+            try:
+                text = codecs.getincrementaldecoder("utf-16")().decode(sample, final=False)
+            except UnicodeDecodeError:
+                return None
+            cut = -1
+            for _ in range(max_lines):
+                cut = text.find("\n", cut + 1)
+                if cut == -1:
+                    break
+            if cut != -1:
+                text = text[:cut + 1]
+            return text, "utf-16"
+        
+        # Cut after max_lines newlines
+        cut = -1
+        for _ in range(max_lines):
+            cut = sample.find(b"\n", cut + 1)
+            if cut == -1:
+                break
+        if cut != -1:
+            sample = sample[:cut + 1]
+        
+        if len(sample.translate(None, _BINARY_BYTES)) != len(sample):
+            return None
+        
+        # Fast path: pure ASCII needs no real decoding work
+        if sample.isascii():
+            return sample.decode("ascii"), "ascii"
+        
+        if sample.startswith(b"\xef\xbb\xbf"):
+            sample = sample[3:]
+        
+        try:
+            # Incremental decoder drops a multi-byte sequence cut at the end
+            return codecs.getincrementaldecoder("utf-8")().decode(sample, final=False), "utf-8"
+        except UnicodeDecodeError:
+            pass
+        
+        # Cheap fallback: mostly 7-bit text is read as a legacy 8-bit encoding
+        high = sum(1 for byte in sample if byte >= 0x80)
+        if high > len(sample) * 0.3:
+            return None
+        return sample.decode("cp1252", errors="replace"), "cp1252"
@@ -0,0 +1,203 @@
+"""Parallel directory traversal for FileFlowCLI."""
+
+import os
+import threading
+from pathlib import Path
+from queue import Queue
+from typing import List, Optional, Callable, Tuple
+
+from .exceptions_manager import ExclusionMatcher, PathTrie
+from .run_control import RunControl
+
+
+# Work item: (absolute path, relative POSIX path, trie node, depth)
+_WorkItem = Tuple[str, str, Optional[PathTrie], int]
+
+
+class ParallelDirectoryWalker:
+    """
+    Lists directories concurrently using a shared work queue.
+    
+    Every worker takes a directory from the queue, lists it once with
+    os.scandir, pushes its subdirectories back onto the queue and keeps the
+    files it found. On network filesystems each listing is a round trip, so
+    several listings in flight hide most of the latency.
+    """
+    
+    def __init__(
+        self,
+        matcher: Optional[ExclusionMatcher] = None,
+        max_workers: int = 8,
+        max_depth: Optional[int] = None,
+        max_breadth: Optional[int] = None,
+        skip_paths: Optional[List[str]] = None,
+        error_handler: Optional[Callable[[Exception, str], None]] = None,
+        control: Optional[RunControl] = None
+    ):
+        """
+        Initialize directory walker.
+        
+        Args:
+            matcher: Compiled exclusion matcher (default: exclude nothing)
+            max_workers: Number of listing threads (default: 8)
+            max_depth: Maximum directory depth to descend (None for unlimited)
+            max_breadth: Maximum subdirectories descended per directory,
+                taken in name order (None for unlimited)
+            skip_paths: Absolute directory paths that are never entered
+            error_handler: Optional handler function(exception, path)
+            control: Pause/cancel token checked before each listing (optional);
+                a cancelled walk returns the files found so far
+        """
+        self.matcher = matcher or ExclusionMatcher()
+        self.max_workers = max(1, int(max_workers))
+        self.max_depth = max_depth
+        self.max_breadth = max_breadth
+        self.skip_paths = frozenset(skip_paths or ())
+        self.error_handler = error_handler
+        self.control = control
+        self._lock = threading.Lock()
+        self._directories_listed = 0
+    
+    def walk(self, root: Path) -> List[Path]:
+        """
+        Collect all readable files below root.
+        
+        The result is sorted, so the same tree always yields the same list
+        regardless of thread scheduling (checkpoints rely on this).
+        
+        Args:
+            root: Directory to scan
+        
+        Returns:
+            Sorted list of file paths
+        """
+        work_queue: "Queue[Optional[_WorkItem]]" = Queue()
+        results: List[List[str]] = []
+        self._directories_listed = 0
+        
+        work_queue.put((str(root), "", self.matcher.trie, 0))
+        
+        workers = []
+        for _ in range(self.max_workers):
+            found: List[str] = []
+            results.append(found)
+            worker = threading.Thread(
+                target=self._worker,
+                args=(work_queue, found),
+                daemon=True
+            )
+            worker.start()
+            workers.append(worker)
+        
+        # All directories listed once every queued item is marked done
+        work_queue.join()
+        
+        for _ in workers:
+            work_queue.put(None)
+        for worker in workers:
+            worker.join()
+        
+        files = [path for found in results for path in found]
+        files.sort()
+        return [Path(path) for path in files]
+    
+    def get_directories_listed(self) -> int:
+        """
+        Get number of directories listed by the last walk.
+        
+        Returns:
+            Directory count
+        """
+        with self._lock:
+            return self._directories_listed
+    
+    def _worker(self, work_queue: "Queue[Optional[_WorkItem]]", found: List[str]) -> None:
+        """
+        Worker loop: list directories until a stop sentinel arrives.
+        
+        Args:
+            work_queue: Shared work queue
+            found: This worker's list of discovered file paths
+        """
+        while True:
+            item = work_queue.get()
+            if item is None:
+                work_queue.task_done()
+                return
+            
+            try:
+                # Once cancelled, queued directories are drained unlisted
+                if self.control is None or self.control.wait():
+                    for subdirectory in self._list_directory(item, found):
+                        work_queue.put(subdirectory)
+            except Exception as e:
+                # Any other failure (e.g. an undecodable name) loses only this
+                # directory; a dead worker could leave the walk waiting forever
+                self._handle_error(e, item[0])
+            finally:
+                work_queue.task_done()
+    
+    def _list_directory(self, item: _WorkItem, found: List[str]) -> List[_WorkItem]:
+        """
+        List one directory.
+        
+        Args:
+            item: Work item describing the directory
+            found: List to append discovered file paths to
+        
+        Returns:
+            Subdirectories to descend into
+        """
+        current, relative, node, depth = item
+        matcher = self.matcher
+        subdirectories: List[_WorkItem] = []
+        descend = self.max_depth is None or depth < self.max_depth
+        
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    name = entry.name
+                    entry_relative = f"{relative}/{name}" if relative else name
+                    
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not descend or entry.path in self.skip_paths:
+                                continue
+                            excluded, child_node = matcher.match_directory(
+                                name, entry_relative, node
+                            )
+                            if not excluded:
+                                subdirectories.append(
+                                    (entry.path, entry_relative, child_node, depth + 1)
+                                )
+                        elif entry.is_file():
+                            if matcher.match_file(name, entry_relative, node):
+                                continue
+                            # Skip files without read permissions
+                            if os.access(entry.path, os.R_OK):
+                                found.append(entry.path)
+                    except OSError as e:
+                        self._handle_error(e, entry.path)
+        except OSError as e:
+            # Unreadable directory: report and keep walking its siblings
+            self._handle_error(e, current)
+        
+        with self._lock:
+            self._directories_listed += 1
+        
+        if self.max_breadth is not None and len(subdirectories) > self.max_breadth:
+            subdirectories.sort(key=lambda sub: sub[1])
+            subdirectories = subdirectories[:self.max_breadth]
+        
+        return subdirectories
+    
+    def _handle_error(self, error: Exception, path: str) -> None:
+        """
+        Report a listing error.
+        
+        Args:
+            error: Exception that occurred
+            path: Path being listed
+        """
+        if self.error_handler:
+            self.error_handler(error, path)
@@ -0,0 +1,594 @@
+"""Deferred metadata enrichment (EXIF/ID3/archive headers) for FileFlowCLI."""
+
+import heapq
+import json
+import os
+import struct
+import tarfile
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, wait as wait_futures
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable, Tuple
+
+from ..storage.atomic_write import write_atomic
+from ..storage.index_storage import IndexStorage
+from ..utils.config import get_config
+from ..utils.error_handler import handle_error
+
+
+# Bytes read from the start of a file when looking for EXIF data
+EXIF_READ_LIMIT = 128 * 1024
+
+# Archive listings are capped so huge archives stay cheap to summarize
+ARCHIVE_ENTRY_LIMIT = 10000
+
+# EXIF IFD0 tags worth keeping
+EXIF_TAGS = {
+    0x010F: "camera_make",
+    0x0110: "camera_model",
+    0x0112: "orientation",
+    0x0132: "date_taken",
+    0x013B: "artist",
+}
+
+# ID3v2 text frames worth keeping (v2.3/v2.4 and v2.2 identifiers)
+ID3_FRAMES = {
+    "TIT2": "title", "TT2": "title",
+    "TPE1": "artist", "TP1": "artist",
+    "TALB": "album", "TAL": "album",
+    "TYER": "year", "TYE": "year", "TDRC": "year",
+    "TCON": "genre", "TCO": "genre",
+    "TRCK": "track", "TRK": "track",
+}
+
+_ID3_ENCODINGS = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}
+
+
+def extract_image_metadata(file_path: Path) -> Dict[str, Any]:
+    """
+    Extract dimensions and EXIF tags from an image header.
+    
+    Args:
+        file_path: Path to image file
+    
+    Returns:
+        Metadata dictionary
+    """
+    with open(file_path, "rb") as f:
+        data = f.read(EXIF_READ_LIMIT)
+    
+    metadata: Dict[str, Any] = {}
+    
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        metadata["width"], metadata["height"] = struct.unpack(">II", data[16:24])
+        return metadata
+    
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        metadata["width"], metadata["height"] = struct.unpack("<HH", data[6:10])
+        return metadata
+    
+    if not data.startswith(b"\xff\xd8"):
+        return metadata
+    
+    # Walk JPEG segments up to the start of scan
+    position = 2
+    while position + 4 <= len(data):
+        if data[position] != 0xFF:
+            break
+        marker = data[position + 1]
+        if marker == 0xDA:
+            break
+        length = struct.unpack(">H", data[position + 2:position + 4])[0]
+        segment = data[position + 4:position + 2 + length]
+        
+        if marker == 0xE1 and segment.startswith(b"Exif\x00\x00"):
+            metadata.update(_parse_exif(segment[6:]))
+        elif 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC) and len(segment) >= 5:
+            metadata["height"], metadata["width"] = struct.unpack(">HH", segment[1:5])
+        
+        position += 2 + length
+    
+    return metadata
+
+
+def _parse_exif(tiff: bytes) -> Dict[str, Any]:
+    """
+    Parse IFD0 of an EXIF TIFF block.
+    
+    Args:
+        tiff: TIFF structure following the Exif header
+    
+    Returns:
+        Metadata dictionary
+    """
+    metadata: Dict[str, Any] = {}
+    if len(tiff) < 8:
+        return metadata
+    
+    order = "<" if tiff[:2] == b"II" else ">"
+    ifd_offset = struct.unpack(order + "I", tiff[4:8])[0]
+    if ifd_offset + 2 > len(tiff):
+        return metadata
+    
+    count = struct.unpack(order + "H", tiff[ifd_offset:ifd_offset + 2])[0]
+    for index in range(count):
+        entry = ifd_offset + 2 + index * 12
+        if entry + 12 > len(tiff):
+            break
+        tag, value_type, value_count = struct.unpack(order + "HHI", tiff[entry:entry + 8])
+        name = EXIF_TAGS.get(tag)
+        if name is None:
+            continue
+        
+        if value_type == 2:
+            # ASCII: inline if it fits in four bytes, otherwise at an offset
+            if value_count <= 4:
+                raw = tiff[entry + 8:entry + 8 + value_count]
+            else:
+                offset = struct.unpack(order + "I", tiff[entry + 8:entry + 12])[0]
+                raw = tiff[offset:offset + value_count]
+            metadata[name] = raw.split(b"\x00", 1)[0].decode("latin-1").strip()
+        elif value_type == 3:
+            metadata[name] = struct.unpack(order + "H", tiff[entry + 8:entry + 10])[0]
+    
+    return metadata
+
+
+def extract_audio_metadata(file_path: Path) -> Dict[str, Any]:
+    """
+    Extract ID3 tags (v2 header, falling back to v1 trailer).
+    
+    Args:
+        file_path: Path to audio file
+    
+    Returns:
+        Metadata dictionary
+    """
+    metadata: Dict[str, Any] = {}
+    
+    with open(file_path, "rb") as f:
+        header = f.read(10)
+        
+        if header[:3] == b"ID3" and len(header) == 10:
+            version = header[3]
+            size = _syncsafe(header[6:10])
+            tag = f.read(size)
+            metadata.update(_parse_id3v2(tag, version))
+        
+        if not metadata:
+            f.seek(0, 2)
+            if f.tell() >= 128:
+                f.seek(-128, 2)
+                trailer = f.read(128)
+                if trailer[:3] == b"TAG":
+                    for name, start, end in (("title", 3, 33), ("artist", 33, 63), ("album", 63, 93), ("year", 93, 97)):
+                        value = trailer[start:end].split(b"\x00", 1)[0].decode("latin-1").strip()
+                        if value:
+                            metadata[name] = value
+    
+    return metadata
+
+
+def _syncsafe(data: bytes) -> int:
+    """
+    Decode a 4-byte syncsafe integer.
+    
+    Args:
+        data: Four bytes
+    
+    Returns:
+        Decoded integer
+    """
+    return (data[0] << 21) | (data[1] << 14) | (data[2] << 7) | data[3]
+
+
+def _parse_id3v2(tag: bytes, version: int) -> Dict[str, Any]:
+    """
+    Parse text frames of an ID3v2 tag.
+    
+    Args:
+        tag: Tag body following the 10-byte header
+        version: Major version (2, 3 or 4)
+    
+    Returns:
+        Metadata dictionary
+    """
+    metadata: Dict[str, Any] = {}
+    id_length, header_length = (3, 6) if version == 2 else (4, 10)
+    position = 0
+    
+    while position + header_length <= len(tag):
+        frame_id = tag[position:position + id_length]
+        if not frame_id.strip(b"\x00"):
+            break  # Padding
+        
+        if version == 2:
+            size = int.from_bytes(tag[position + 3:position + 6], "big")
+        elif version == 4:
+            size = _syncsafe(tag[position + 4:position + 8])
+        else:
+            size = struct.unpack(">I", tag[position + 4:position + 8])[0]
+        
+        body = tag[position + header_length:position + header_length + size]
+        name = ID3_FRAMES.get(frame_id.decode("latin-1"))
+        if name and body:
+            encoding = _ID3_ENCODINGS.get(body[0], "latin-1")
+            value = body[1:].decode(encoding, errors="replace").strip("\x00").strip()
+            if value:
+                metadata[name] = value
+        
+        position += header_length + size
+    
+    return metadata
+
+
+def extract_archive_metadata(file_path: Path) -> Dict[str, Any]:
+    """
+    Summarize archive structure without extracting content.
+    
+    Args:
+        file_path: Path to ZIP or uncompressed TAR archive
+    
+    Returns:
+        Metadata dictionary
+    """
+    names: List[str] = []
+    uncompressed = 0
+    
+    if zipfile.is_zipfile(file_path):
+        with zipfile.ZipFile(file_path) as archive:
+            for info in archive.infolist()[:ARCHIVE_ENTRY_LIMIT]:
+                names.append(info.filename)
+                uncompressed += info.file_size
+    else:
+        # Plain TAR only: headers are read and member data is skipped over
+        with tarfile.open(file_path, "r:") as archive:
+            for member in archive:
+                names.append(member.name)
+                uncompressed += member.size
+                if len(names) >= ARCHIVE_ENTRY_LIMIT:
+                    break
+    
+    top_level = sorted({name.strip("/").split("/", 1)[0] for name in names if name.strip("/")})
+    
+    return {
+        "entry_count": len(names),
+        "uncompressed_size": uncompressed,
+        "top_level_entries": top_level[:20],
+        "truncated": len(names) >= ARCHIVE_ENTRY_LIMIT
+    }
+
+
+# magic -> (priority, extractor); lower priority runs first
+EXTRACTORS: Dict[str, Tuple[int, Callable[[Path], Dict[str, Any]]]] = {
+    "JPEG": (0, extract_image_metadata),
+    "PNG": (0, extract_image_metadata),
+    "GIF": (0, extract_image_metadata),
+    "MP3": (1, extract_audio_metadata),
+    "ZIP": (2, extract_archive_metadata),
+    "TAR": (2, extract_archive_metadata),
+}
+
+
+class MetadataEnricher:
+    """
+    Second indexing phase: fills in rich metadata after the structural index.
+    
+    Runs in the background with its own worker budget. Records are
+    processed from a priority queue (cheap header formats and small files
+    first). Results are appended to an enrichment segment (one JSON line
+    per file, keyed by path), which also serves as the checkpoint, and
+    merged into the index in batches that double in size, so enriched
+    fields appear while the index is already usable and the index is
+    rewritten only a logarithmic number of times.
+    """
+    
+    SEGMENT_FILENAME = "enrichment_segment.jsonl"
+    
+    def __init__(
+        self,
+        config_dir: Path,
+        directory: Path,
+        max_workers: Optional[int] = None,
+        flush_interval: float = 5.0,
+        flush_size: int = 500
+    ):
+        """
+        Initialize metadata enricher.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            directory: Indexed root directory
+            max_workers: Worker threads (default: enrichment_thread_count config)
+            flush_interval: Seconds between segment flushes (default: 5.0)
+            flush_size: Results that force a flush, and the size of the
+                first merge into the index (default: 500)
+        """
+        self.config_dir = Path(config_dir)
+        self.directory = Path(directory).resolve()
+        self.max_workers = max_workers or get_config("enrichment_thread_count", 2)
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self.index_storage = IndexStorage(self.config_dir)
+        self.segment_file = self.config_dir / self.SEGMENT_FILENAME
+        self._segment = None
+        # Results merged into the index by this run
+        self._merged = 0
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._progress = {"completed": 0, "total": 0, "errors": 0}
+    
+    def start(self) -> None:
+        """Start enrichment in a background thread."""
+        if self.is_running():
+            return
+        
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+        self._thread.start()
+    
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop enrichment; pending results are flushed to the segment.
+        
+        A stopped run does not write the index (nor take the index lock);
+        the next run merges what is in the segment.
+        
+        Args:
+            wait: Whether to wait for the background thread to finish
+        """
+        self._stop_event.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+    
+    def is_running(self) -> bool:
+        """
+        Check if enrichment is running.
+        
+        Returns:
+            True if background thread is alive
+        """
+        return self._thread is not None and self._thread.is_alive()
+    
+    def get_progress(self) -> Dict[str, int]:
+        """
+        Get current progress information (thread-safe).
+        
+        Returns:
+            Dictionary with progress stats
+        """
+        with self._lock:
+            return self._progress.copy()
+    
+    def run(self) -> None:
+        """Enrich all pending records of the current index."""
+        # Records are streamed from the record table; the index is never loaded
+        record_table = self.index_storage.get_record_table()
+        if record_table is None:
+            return
+        
+        indexed_at = record_table.indexed_at
+        # Results of earlier runs not merged into the index yet
+        unmerged = self._open_segment(indexed_at)
+        
+        queue: List[Tuple[int, int, str, str]] = []
+        for record in record_table.iter_records():
+            extractor = EXTRACTORS.get(record.get("magic"))
+            if extractor is None or record["path"] in unmerged or "metadata" in record:
+                continue
+            queue.append((extractor[0], record.get("size", 0), record["path"], record["magic"]))
+        heapq.heapify(queue)
+        
+        with self._lock:
+            self._progress = {"completed": 0, "total": len(queue), "errors": 0}
+        
+        try:
+            if queue:
+                self._enrich(queue, unmerged, indexed_at)
+            if not queue and not self._stop_event.is_set() and self._merge(unmerged, indexed_at):
+                self._finish(indexed_at)
+        finally:
+            self._close_segment()
+    
+    def _enrich(
+        self,
+        queue: List[Tuple[int, int, str, str]],
+        unmerged: Dict[str, Dict[str, Any]],
+        indexed_at: Optional[str]
+    ) -> None:
+        """
+        Extract metadata of queued records until the queue is empty or enrichment stops.
+        
+        Args:
+            queue: Heap of (priority, size, path, magic), drained by this call
+            unmerged: Results not merged into the index yet (updated in place)
+            indexed_at: Timestamp of the index being enriched
+        """
+        queue_lock = threading.Lock()
+        pending: Dict[str, Dict[str, Any]] = {}
+        pending_lock = threading.Lock()
+        
+        def worker() -> None:
+            while not self._stop_event.is_set():
+                with queue_lock:
+                    if not queue:
+                        return
+                    _, _, path, magic = heapq.heappop(queue)
+                
+                metadata = self._extract(path, magic)
+                with pending_lock:
+                    pending[path] = {"metadata": metadata}
+                with self._lock:
+                    self._progress["completed"] += 1
+                    if metadata is None:
+                        self._progress["errors"] += 1
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(worker) for _ in range(self.max_workers)]
+            last_flush = time.monotonic()
+            
+            while not all(future.done() for future in futures):
+                wait_futures(futures, timeout=0.2)
+                with pending_lock:
+                    ready = len(pending) >= self.flush_size
+                if ready or time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush(pending, pending_lock, unmerged, indexed_at)
+                    last_flush = time.monotonic()
+        
+        self._flush(pending, pending_lock, unmerged, indexed_at, merge=False)
+    
+    def _extract(self, path: str, magic: str) -> Optional[Dict[str, Any]]:
+        """
+        Run the extractor for one file.
+        
+        Args:
+            path: Path relative to the indexed root
+            magic: Magic name detected in phase one
+        
+        Returns:
+            Metadata dictionary or None on error
+        """
+        try:
+            return EXTRACTORS[magic][1](self.directory / path)
+        except Exception as e:
+            handle_error(e, {"operation": "enrich_metadata", "file": path})
+            return None
+    
+    def _flush(
+        self,
+        pending: Dict[str, Dict[str, Any]],
+        pending_lock: threading.Lock,
+        unmerged: Dict[str, Dict[str, Any]],
+        indexed_at: Optional[str],
+        merge: bool = True
+    ) -> None:
+        """
+        Append pending results to the segment, and merge them into the index
+        once there are as many as were merged before (or flush_size).
+        
+        Args:
+            pending: Results keyed by path (drained by this call)
+            pending_lock: Lock guarding pending
+            unmerged: Results not merged into the index yet (updated in place)
+            indexed_at: Timestamp of the index being enriched
+            merge: Whether the index may be written
+        """
+        with pending_lock:
+            updates = dict(pending)
+            pending.clear()
+        
+        if updates:
+            if self._segment is not None:
+                try:
+                    self._segment.write(self._segment_lines(updates))
+                    self._segment.flush()
+                    os.fsync(self._segment.fileno())
+                except (IOError, ValueError) as e:
+                    print(f"Error saving enrichment segment: {e}")
+            unmerged.update(updates)
+        
+        if merge and not self._stop_event.is_set() and len(unmerged) >= max(self.flush_size, self._merged):
+            self._merge(unmerged, indexed_at)
+    
+    def _merge(self, unmerged: Dict[str, Dict[str, Any]], indexed_at: Optional[str]) -> bool:
+        """
+        Merge results into the index.
+        
+        Args:
+            unmerged: Results not merged into the index yet (cleared on success)
+            indexed_at: Timestamp of the index being enriched
+        
+        Returns:
+            True if everything is merged, False if the index could not be
+            updated (e.g. while another writer holds the index lock)
+        """
+        if not unmerged:
+            return True
+        if not self.index_storage.update_records(unmerged, expected_indexed_at=indexed_at):
+            return False
+        self._merged += len(unmerged)
+        unmerged.clear()
+        return True
+    
+    def _finish(self, indexed_at: Optional[str]) -> None:
+        """
+        Mark enrichment complete for this index.
+        
+        Args:
+            indexed_at: Timestamp of the enriched index
+        """
+        self.index_storage.update_header(
+            {"enriched_at": datetime.now().isoformat()},
+            expected_indexed_at=indexed_at
+        )
+        self._close_segment()
+        try:
+            if self.segment_file.exists():
+                self.segment_file.unlink()
+        except IOError as e:
+            print(f"Error clearing enrichment segment: {e}")
+    
+    def _open_segment(self, indexed_at: Optional[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Open the enrichment segment for appending, starting a new one if
+        it belongs to another index.
+        
+        The first line of the segment is {"indexed_at": ...}; every other
+        line holds the fields of one record and its "path". A torn last
+        line is dropped.
+        
+        Args:
+            indexed_at: Timestamp of the current index
+        
+        Returns:
+            Results stored in the segment, keyed by path
+        """
+        results: Dict[str, Dict[str, Any]] = {}
+        intact = False
+        try:
+            with open(self.segment_file, "r", encoding="utf-8") as f:
+                header = json.loads(f.readline() or "null")
+                if isinstance(header, dict) and header.get("indexed_at") == indexed_at:
+                    intact = True
+                    for line in f:
+                        try:
+                            fields = json.loads(line)
+                        except ValueError:
+                            intact = False  # Torn write of the last line
+                            break
+                        results[fields.pop("path")] = fields
+        except FileNotFoundError:
+            pass
+        except (IOError, ValueError) as e:
+            print(f"Error loading enrichment segment: {e}")
+        
+        try:
+            if not intact:
+                # New lines must not be appended to a torn one
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                write_atomic(
+                    self.segment_file,
+                    json.dumps({"indexed_at": indexed_at}) + "\n" + self._segment_lines(results)
+                )
+            self._segment = open(self.segment_file, "a", encoding="utf-8")
+        except IOError as e:
+            print(f"Error opening enrichment segment: {e}")
+            self._segment = None
+        return results
+    
+    def _segment_lines(self, results: Dict[str, Dict[str, Any]]) -> str:
+        """Format results as segment lines."""
+        return "".join(
+            json.dumps({"path": path, **fields}, ensure_ascii=False) + "\n"
+            for path, fields in results.items()
+        )
+    
+    def _close_segment(self) -> None:
+        """Close the enrichment segment file."""
+        if self._segment is not None:
+            self._segment.close()
+            self._segment = None
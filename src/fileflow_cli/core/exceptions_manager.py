@@ -0,0 +1,334 @@
+"""Exceptions system (directories/files/extensions to ignore) for FileFlowCLI."""
+
+import fnmatch
+import json
+import re
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+
+# Directories that are never worth indexing: VCS metadata, dependency trees,
+# caches and the tool's own state directory.
+DEFAULT_EXCLUDED_DIRECTORIES = (
+    ".fileflow_cli",
+    ".git",
+    ".hg",
+    ".svn",
+    "node_modules",
+    "bower_components",
+    "__pycache__",
+    ".cache",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".ruff_cache",
+    ".tox",
+    ".nox",
+    ".venv",
+)
+
+
+class PathTrie:
+    """Prefix trie over relative path components."""
+    
+    __slots__ = ("children", "terminal")
+    
+    def __init__(self):
+        """Initialize an empty trie node."""
+        self.children: Dict[str, "PathTrie"] = {}
+        self.terminal = False
+    
+    def insert(self, parts: Iterable[str]) -> None:
+        """
+        Insert a path into the trie.
+        
+        Args:
+            parts: Path components relative to the indexed root
+        """
+        node = self
+        for part in parts:
+            node = node.children.setdefault(part, PathTrie())
+        node.terminal = True
+    
+    def child(self, name: str) -> Optional["PathTrie"]:
+        """
+        Get child node for a path component.
+        
+        Args:
+            name: Path component
+        
+        Returns:
+            Child node or None if no rule continues below this component
+        """
+        return self.children.get(name)
+
+
+class ExclusionMatcher:
+    """Compiled matcher for all exclusion rules."""
+    
+    def __init__(
+        self,
+        directory_names: Iterable[str] = (),
+        paths: Iterable[str] = (),
+        extensions: Iterable[str] = (),
+        patterns: Iterable[str] = ()
+    ):
+        """
+        Compile exclusion rules.
+        
+        Args:
+            directory_names: Directory names excluded at any depth
+            paths: Directory or file paths relative to the indexed root
+            extensions: File extensions (with or without leading dot)
+            patterns: Glob patterns matched against names and relative paths
+        """
+        self.directory_names = frozenset(directory_names)
+        self.extensions = frozenset(
+            ext.lower() if ext.startswith(".") else f".{ext.lower()}"
+            for ext in extensions if ext
+        )
+        
+        self.trie = PathTrie()
+        for path in paths:
+            parts = [part for part in Path(path).parts if part not in ("", ".", "/")]
+            if parts:
+                self.trie.insert(parts)
+        
+        patterns = [pattern for pattern in patterns if pattern]
+        if patterns:
+            combined = "|".join(f"(?:{fnmatch.translate(pattern)})" for pattern in patterns)
+            self.pattern_regex = re.compile(combined)
+        else:
+            self.pattern_regex = None
+    
+    def match_directory(
+        self,
+        name: str,
+        relative_path: str,
+        node: Optional[PathTrie]
+    ) -> Tuple[bool, Optional[PathTrie]]:
+        """
+        Check whether a directory should be pruned.
+        
+        Args:
+            name: Directory name
+            relative_path: Directory path relative to the indexed root (POSIX style)
+            node: Trie node of the parent directory (None if no path rule applies)
+        
+        Returns:
+            Tuple of (excluded, trie node to pass to children)
+        """
+        if name in self.directory_names:
+            return True, None
+        
+        child = node.child(name) if node is not None else None
+        if child is not None and child.terminal:
+            return True, None
+        
+        if self.pattern_regex is not None and (
+            self.pattern_regex.match(name) or self.pattern_regex.match(relative_path)
+        ):
+            return True, None
+        
+        return False, child
+    
+    def match_file(
+        self,
+        name: str,
+        relative_path: str,
+        node: Optional[PathTrie]
+    ) -> bool:
+        """
+        Check whether a file should be skipped.
+        
+        Args:
+            name: File name
+            relative_path: File path relative to the indexed root (POSIX style)
+            node: Trie node of the parent directory (None if no path rule applies)
+        
+        Returns:
+            True if file is excluded, False otherwise
+        """
+        if self.extensions:
+            dot = name.rfind(".")
+            if dot > 0 and name[dot:].lower() in self.extensions:
+                return True
+        
+        if node is not None:
+            child = node.child(name)
+            if child is not None and child.terminal:
+                return True
+        
+        if self.pattern_regex is not None and (
+            self.pattern_regex.match(name) or self.pattern_regex.match(relative_path)
+        ):
+            return True
+        
+        return False
+    
+    def is_excluded(self, relative_path: str, is_directory: bool = False) -> bool:
+        """
+        Check a single relative path against all rules (including its parents).
+        
+        Args:
+            relative_path: Path relative to the indexed root
+            is_directory: Whether the path itself is a directory
+        
+        Returns:
+            True if path or one of its parent directories is excluded
+        """
+        parts = Path(relative_path).parts
+        node: Optional[PathTrie] = self.trie
+        current = ""
+        
+        for index, part in enumerate(parts):
+            current = f"{current}/{part}" if current else part
+            is_last = index == len(parts) - 1
+            
+            if is_last and not is_directory:
+                return self.match_file(part, current, node)
+            
+            excluded, node = self.match_directory(part, current, node)
+            if excluded:
+                return True
+        
+        return False
+
+
+class ExceptionsManager:
+    """Manages exceptions.json and builds the compiled exclusion matcher."""
+    
+    EXCEPTIONS_VERSION = "1.0"
+    EXCEPTIONS_FILENAME = "exceptions.json"
+    
+    def __init__(self, config_dir: Path, root_directory: Optional[Path] = None):
+        """
+        Initialize exceptions manager.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            root_directory: Indexed root used to relativize absolute paths
+                (default: parent of config_dir)
+        """
+        self.config_dir = Path(config_dir)
+        self.exceptions_file = self.config_dir / self.EXCEPTIONS_FILENAME
+        self.root_directory = Path(root_directory) if root_directory else self.config_dir.parent
+        self.exceptions = self._default_exceptions()
+        self._load_exceptions()
+    
+    def _default_exceptions(self) -> Dict[str, Any]:
+        """
+        Get empty exceptions structure.
+        
+        Returns:
+            Exceptions dictionary
+        """
+        return {
+            "version": self.EXCEPTIONS_VERSION,
+            "use_default_exclusions": True,
+            "directories": [],
+            "files": [],
+            "extensions": [],
+            "patterns": []
+        }
+    
+    def _load_exceptions(self) -> None:
+        """Load exceptions from file if it exists."""
+        if not self.exceptions_file.exists():
+            return
+        
+        try:
+            with open(self.exceptions_file, "r", encoding="utf-8") as f:
+                loaded = json.load(f)
+            
+            for key, value in loaded.items():
+                self.exceptions[key] = value
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            print(f"Warning: Could not load exceptions: {e}")
+    
+    def save_exceptions(self) -> bool:
+        """
+        Save exceptions to disk.
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            with open(self.exceptions_file, "w", encoding="utf-8") as f:
+                json.dump(self.exceptions, f, indent=2, ensure_ascii=False)
+            return True
+        except IOError as e:
+            print(f"Error saving exceptions: {e}")
+            return False
+    
+    def add_exception(self, kind: str, value: str) -> None:
+        """
+        Add an exception rule and persist it.
+        
+        Args:
+            kind: One of "directories", "files", "extensions", "patterns"
+            value: Rule value
+        """
+        rules: List[str] = self.exceptions.setdefault(kind, [])
+        if value not in rules:
+            rules.append(value)
+            self.save_exceptions()
+    
+    def remove_exception(self, kind: str, value: str) -> None:
+        """
+        Remove an exception rule and persist the change.
+        
+        Args:
+            kind: One of "directories", "files", "extensions", "patterns"
+            value: Rule value
+        """
+        rules: List[str] = self.exceptions.get(kind, [])
+        if value in rules:
+            rules.remove(value)
+            self.save_exceptions()
+    
+    def build_matcher(self, root_directory: Optional[Path] = None) -> ExclusionMatcher:
+        """
+        Compile all rules into a single matcher.
+        
+        Args:
+            root_directory: Indexed root (default: root passed to the manager)
+        
+        Returns:
+            ExclusionMatcher instance
+        """
+        root = Path(root_directory).resolve() if root_directory else self.root_directory.resolve()
+        
+        directory_names = {self.config_dir.name}
+        if self.exceptions.get("use_default_exclusions", True):
+            directory_names.update(DEFAULT_EXCLUDED_DIRECTORIES)
+        
+        paths = [self._relativize(p, root) for p in self.exceptions.get("directories", [])]
+        paths += [self._relativize(p, root) for p in self.exceptions.get("files", [])]
+        
+        return ExclusionMatcher(
+            directory_names=directory_names,
+            paths=[p for p in paths if p is not None],
+            extensions=self.exceptions.get("extensions", []),
+            patterns=self.exceptions.get("patterns", [])
+        )
+    
+    def _relativize(self, path: str, root: Path) -> Optional[str]:
+        """
+        Convert an exception path to a path relative to the indexed root.
+        
+        Args:
+            path: Absolute or relative path from exceptions.json
+            root: Indexed root directory
+        
+        Returns:
+            Relative path or None if an absolute path lies outside the root
+        """
+        candidate = Path(path)
+        if not candidate.is_absolute():
+            return candidate.as_posix()
+        
+        try:
+            return candidate.relative_to(root).as_posix()
+        except ValueError:
+            return None
@@ -0,0 +1,798 @@
+"""Batched file operations with a write-ahead journal for FileFlowCLI."""
+
+import errno
+import os
+import shutil
+import time
+from functools import partial
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator, Set, Tuple
+
+from ..storage.index_lock import IndexLock
+from ..storage.index_storage import IndexStorage
+from ..storage.operation_journal import OperationJournal
+from ..storage.version_storage import VersionStorage
+from ..utils.config import get_config
+from ..utils.error_handler import FileOperationError, IndexLockedError
+from ..utils.metrics import get_metrics
+from .parallel_executor import ParallelExecutor
+from .run_control import OperationCancelled, RunControl
+
+
+# Operation kinds accepted in a plan; renames are carried out as moves
+OPERATION_KINDS = ("mkdir", "move", "rename")
+
+# Completed operations recorded per journal line (one write and fsync)
+JOURNAL_GROUP_SIZE = 1000
+
+# Suffix of the temporary copy made by a move between devices
+COPY_SUFFIX = ".fileflow-copy"
+
+# Failed operations reported with their error in a run summary
+MAX_REPORTED_ERRORS = 20
+
+# Move of a run: operation number, source, destination, and whether its
+# state must be checked on disk first (completion was not journaled)
+_Move = Tuple[int, str, str, bool]
+
+
+def _relative(path: Any) -> str:
+    """
+    Normalize a path of a plan, relative to the organized directory.
+    
+    Args:
+        path: Path from the plan
+    
+    Returns:
+        Normalized relative path
+    
+    Raises:
+        FileOperationError: If the path is absolute or leaves the directory
+    """
+    if not isinstance(path, str) or not path or os.path.isabs(path):
+        raise FileOperationError(f"Not a relative path: {path!r}")
+    normalized = os.path.normpath(path)
+    if normalized in (os.curdir, os.pardir) or normalized.startswith(os.pardir + os.sep):
+        raise FileOperationError(f"Path leaves the directory: {path!r}")
+    return normalized
+
+
+def _parents(path: str) -> Iterator[str]:
+    """
+    Get the parent directories of a relative path.
+    
+    Args:
+        path: Normalized relative path
+    
+    Yields:
+        Parent directories, nearest first
+    """
+    parent = os.path.dirname(path)
+    while parent:
+        yield parent
+        parent = os.path.dirname(parent)
+
+
+class _Run:
+    """Progress of one pass over a plan: journal groups, counts and errors."""
+    
+    def __init__(self, journal: OperationJournal, entry_type: str, completed: Set[int]):
+        """
+        Initialize run progress.
+        
+        Args:
+            journal: Journal of the plan
+            entry_type: Journal line type of completed operations
+                ("done" or "undone")
+            completed: Operation numbers already completed (updated)
+        """
+        self.journal = journal
+        self.entry_type = entry_type
+        self.completed = completed
+        self.group: List[int] = []
+        self.counts = {"created_dirs": 0, "removed_dirs": 0, "moved": 0, "copied": 0, "failed": 0}
+        self.errors: List[Dict[str, Any]] = []
+    
+    def finish(self, number: int, count: Optional[str] = None) -> None:
+        """
+        Record a completed operation (journaled with its group).
+        
+        Args:
+            number: Operation number
+            count: Counter to increase (optional)
+        """
+        if count is not None:
+            self.counts[count] += 1
+        self.group.append(number)
+        if len(self.group) >= JOURNAL_GROUP_SIZE:
+            self.flush()
+    
+    def fail(self, number: int, operation: List[Optional[str]], error: Exception) -> None:
+        """
+        Record a failed operation.
+        
+        Failures of a forward run are journaled, so resuming does not try
+        them again; failed rollbacks are tried again by the next undo.
+        
+        Args:
+            number: Operation number
+            operation: Planned operation
+            error: What went wrong
+        """
+        self.counts["failed"] += 1
+        if self.entry_type == "done":
+            self.journal.append({"type": "failed", "op": number, "error": str(error)})
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"operation": operation, "error": str(error)})
+    
+    def flush(self) -> None:
+        """Journal the completed operations of the current group."""
+        self.journal.mark(self.entry_type, self.group)
+        self.completed.update(self.group)
+        self.group = []
+
+
+class FileOperationExecutor:
+    """
+    Applies and rolls back plans of file operations (mkdir, move, rename).
+    
+    A plan is checked before anything is touched: sources exist, nothing
+    is overwritten, no path is used by two operations and no move depends
+    on another. Duplicate operations are dropped, and the missing parent
+    directories of all destinations are created first, shallowest first.
+    Moves are plain os.rename calls; moves between devices are copied by
+    a bounded pool of threads (ParallelExecutor), then the source is
+    removed.
+    
+    Every plan goes through an OperationJournal: the plan is on disk
+    before the first operation runs, and completed operations are
+    journaled in groups. An interrupted plan can be resumed or undone;
+    operations whose completion was not journaled yet are checked on disk
+    first. Once the files are in place the index records are moved in
+    place (no re-scan) and a version is recorded from the changes. All of
+    it runs under the index lock.
+    """
+    
+    def __init__(
+        self,
+        config_dir: Path,
+        directory: Path,
+        copy_workers: Optional[int] = None,
+        control: Optional[RunControl] = None
+    ):
+        """
+        Initialize file operation executor.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            directory: Organized root directory (plan paths are relative to it)
+            copy_workers: Threads copying between devices (default:
+                operation_copy_thread_count config)
+            control: Pause/cancel token checked between operations (optional)
+        """
+        self.config_dir = Path(config_dir)
+        self.directory = Path(directory).resolve()
+        self._root = str(self.directory) + os.sep
+        self.copy_workers = copy_workers or get_config("operation_copy_thread_count", 4)
+        self.control = control
+        self.index_storage = IndexStorage(self.config_dir)
+        self.version_storage = VersionStorage(
+            self.config_dir,
+            max_delta_chain=get_config("version_max_delta_chain", 256)
+        )
+        self.journal = OperationJournal(self.config_dir)
+        self.index_lock = IndexLock(self.config_dir)
+        
+        metrics = get_metrics()
+        self._completed_metric = metrics.counter(
+            "fileflow_file_operations_total", "File operations applied or rolled back", result="ok"
+        )
+        self._failed_metric = metrics.counter(
+            "fileflow_file_operations_total", "File operations applied or rolled back", result="error"
+        )
+        self._run_metric = metrics.histogram(
+            "fileflow_file_operations_seconds", "Wall time per plan applied, resumed or undone"
+        )
+    
+    def plan(self, operations: List[Dict[str, Any]]) -> List[List[Optional[str]]]:
+        """
+        Check a plan and put it in execution order, without running it.
+        
+        Args:
+            operations: Operations as {"op": "mkdir", "path": ...},
+                {"op": "move", "source": ..., "destination": ...} or
+                {"op": "rename", "source": ..., "name": ...}, with paths
+                relative to the directory
+        
+        Returns:
+            Planned operations as [kind, source, destination]: directories
+            to create (source None), then moves
+        
+        Raises:
+            FileOperationError: If the plan cannot be applied as a whole
+        """
+        return self._plan(operations)[0]
+    
+    def get_pending_plan(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the journal of an interrupted plan or rollback.
+        
+        Returns:
+            Journal state (see OperationJournal.load) or None if the last
+            plan finished
+        """
+        state = self.journal.load()
+        if state is None or state["status"] not in (OperationJournal.PENDING, OperationJournal.UNDOING):
+            return None
+        return state
+    
+    def apply(
+        self,
+        operations: List[Dict[str, Any]],
+        description: str,
+        llm_suggestions: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Apply a plan of operations.
+        
+        Args:
+            operations: Operations (see plan)
+            description: Plan description (for the journal and the version)
+            llm_suggestions: LLM recommendations behind the plan (optional)
+        
+        Returns:
+            Summary: counts per outcome, "errors", "cancelled", "version"
+            and "elapsed_seconds"
+        
+        Raises:
+            FileOperationError: If the plan is invalid or an interrupted
+                plan must be resumed or undone first
+            IndexLockedError: If another writer holds the index lock
+        """
+        self._acquire_lock("operations")
+        try:
+            if self.get_pending_plan() is not None:
+                raise FileOperationError("The last plan was interrupted; resume or undo it first")
+            
+            planned, skipped = self._plan(operations)
+            
+            # The structure before the plan, so there is a version to roll
+            # back to (also when the index changed since the latest version)
+            if self.index_storage.index_exists() and not self._version_matches_index():
+                self.version_storage.create_version(self.index_storage, f"Before: {description}")
+            
+            self.journal.start(planned, description, self.directory, llm_suggestions)
+            summary = self._apply(self.journal.load(), reconcile=False)
+            summary["skipped"] = skipped
+            return summary
+        finally:
+            self.journal.close()
+            self.index_lock.release()
+    
+    def resume(self) -> Dict[str, Any]:
+        """
+        Continue an interrupted plan (or an interrupted rollback).
+        
+        Returns:
+            Summary (see apply)
+        
+        Raises:
+            FileOperationError: If there is nothing to resume
+            IndexLockedError: If another writer holds the index lock
+        """
+        self._acquire_lock("operations")
+        try:
+            state = self.get_pending_plan()
+            if state is None:
+                raise FileOperationError("No interrupted plan to resume")
+            if state["status"] == OperationJournal.UNDOING:
+                return self._undo(state)
+            return self._apply(state, reconcile=True)
+        finally:
+            self.journal.close()
+            self.index_lock.release()
+    
+    def undo(self) -> Dict[str, Any]:
+        """
+        Roll back the last plan, whether it finished or was interrupted.
+        
+        Returns:
+            Summary (see apply); the rollback can be run again to retry
+            failed operations
+        
+        Raises:
+            FileOperationError: If there is no plan to roll back
+            IndexLockedError: If another writer holds the index lock
+        """
+        self._acquire_lock("operations")
+        try:
+            state = self.journal.load()
+            if state is None or state["status"] == OperationJournal.ROLLED_BACK:
+                raise FileOperationError("No plan to undo")
+            return self._undo(state)
+        finally:
+            self.journal.close()
+            self.index_lock.release()
+    
+    def _acquire_lock(self, purpose: str) -> None:
+        """
+        Take the index lock.
+        
+        Args:
+            purpose: What the holder is doing
+        
+        Raises:
+            IndexLockedError: If another writer holds it
+        """
+        if not self.index_lock.acquire(purpose):
+            raise IndexLockedError(self.config_dir, self.index_lock.holder())
+    
+    def _plan(self, operations: List[Dict[str, Any]]) -> Tuple[List[List[Optional[str]]], int]:
+        """
+        Check a plan and put it in execution order.
+        
+        Args:
+            operations: Operations (see plan)
+        
+        Returns:
+            Planned operations and the number of operations skipped as
+            duplicates or no-ops
+        
+        Raises:
+            FileOperationError: If the plan cannot be applied as a whole
+        """
+        moves: Dict[str, str] = {}
+        destinations: Set[str] = set()
+        directories: Set[str] = set()
+        skipped = 0
+        
+        # Plans never touch the index itself
+        protected = os.path.relpath(str(self.config_dir.resolve()), str(self.directory))
+        
+        def check(path: str) -> str:
+            if path == protected or path.startswith(protected + os.sep):
+                raise FileOperationError(f"Not allowed in a plan: {path}")
+            return path
+        
+        for operation in operations:
+            kind = operation.get("op")
+            if kind not in OPERATION_KINDS:
+                raise FileOperationError(f"Unknown operation: {kind!r}")
+            
+            if kind == "mkdir":
+                path = check(_relative(operation.get("path")))
+                if path in directories:
+                    skipped += 1
+                directories.add(path)
+                continue
+            
+            source = check(_relative(operation.get("source")))
+            if kind == "rename":
+                name = operation.get("name")
+                if (not isinstance(name, str) or name in ("", os.curdir, os.pardir)
+                        or os.sep in name or (os.altsep and os.altsep in name)):
+                    raise FileOperationError(f"Not a file name: {name!r}")
+                destination = check(os.path.join(os.path.dirname(source), name))
+            else:
+                destination = check(_relative(operation.get("destination")))
+            
+            if source == destination or moves.get(source) == destination:
+                skipped += 1
+                continue
+            if source in moves:
+                raise FileOperationError(f"More than one operation moves {source}")
+            if destination in destinations:
+                raise FileOperationError(f"More than one operation moves a file to {destination}")
+            moves[source] = destination
+            destinations.add(destination)
+        
+        # Moves must not depend on each other, so they can run in any order
+        checked: Set[str] = set()
+        needed: Set[str] = set()
+        for source, destination in moves.items():
+            if destination in moves:
+                raise FileOperationError(f"{destination} is moved by another operation; apply chained moves as separate plans")
+            for parent in _parents(source):
+                if parent in checked:
+                    break
+                if parent in moves:
+                    raise FileOperationError(f"{source} is inside {parent}, which is moved as well")
+                checked.add(parent)
+            for parent in _parents(destination):
+                if parent in needed:
+                    break
+                if parent in moves:
+                    raise FileOperationError(f"{source} would be moved into {parent}, which is moved as well")
+                needed.add(parent)
+            if not os.path.lexists(self._path(source)):
+                raise FileOperationError(f"Not found: {source}")
+            if os.path.lexists(self._path(destination)):
+                raise FileOperationError(f"Already exists: {destination}")
+        
+        for path in list(directories):
+            needed.add(path)
+            needed.update(_parents(path))
+        
+        mkdirs = []
+        for path in needed:
+            if path in moves or path in destinations:
+                raise FileOperationError(f"{path} is both a directory to create and moved")
+            full_path = self._path(path)
+            if os.path.isdir(full_path):
+                continue
+            if os.path.lexists(full_path):
+                raise FileOperationError(f"Not a directory: {path}")
+            mkdirs.append(path)
+        mkdirs.sort(key=lambda path: (path.count(os.sep), path))
+        
+        planned: List[List[Optional[str]]] = [["mkdir", None, path] for path in mkdirs]
+        planned.extend(["move", source, destination] for source, destination in moves.items())
+        return planned, skipped
+    
+    def _apply(self, state: Dict[str, Any], reconcile: bool) -> Dict[str, Any]:
+        """
+        Carry out the operations of a journaled plan that are not done yet.
+        
+        Args:
+            state: Journal state
+            reconcile: Check on disk whether operations already ran
+                (after an interruption)
+        
+        Returns:
+            Summary (see apply)
+        """
+        started = time.perf_counter()
+        operations = state["operations"]
+        run = _Run(self.journal, "done", state["done"])
+        moves: List[_Move] = []
+        cancelled = False
+        
+        try:
+            for number, (kind, source, destination) in enumerate(operations):
+                if number in state["done"] or number in state["failed"]:
+                    continue
+                if kind == "move":
+                    moves.append((number, source, destination, reconcile))
+                    continue
+                
+                self._check()
+                try:
+                    os.mkdir(self._path(destination))
+                    run.finish(number, "created_dirs")
+                except FileExistsError:
+                    run.finish(number)
+                except OSError as e:
+                    run.fail(number, operations[number], e)
+            
+            self._move_all(run, moves, operations)
+        except OperationCancelled:
+            cancelled = True
+        finally:
+            run.flush()
+        
+        version = None
+        if not cancelled:
+            if not state["indexed"]:
+                moved = {
+                    source: destination
+                    for number, (kind, source, destination) in enumerate(operations)
+                    if kind == "move" and number in state["done"]
+                }
+                version = self._record(moved, state["description"], state.get("llm_suggestions"))
+                self.journal.append({"type": "indexed", "version": version})
+        
+        summary = self._summary(state, run, started, cancelled, version)
+        if not cancelled:
+            self.journal.append({"type": "complete", **{key: value for key, value in summary.items() if key != "errors"}})
+        return summary
+    
+    def _undo(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Roll back the operations of a journaled plan, last one first.
+        
+        Args:
+            state: Journal state
+        
+        Returns:
+            Summary (see apply)
+        """
+        started = time.perf_counter()
+        operations = state["operations"]
+        resuming = state["status"] == OperationJournal.UNDOING
+        if not resuming:
+            self.journal.append({"type": "undo"})
+        
+        run = _Run(self.journal, "undone", state["undone"])
+        cancelled = False
+        
+        # Moves back first, so the directories created by the plan are
+        # empty again; moves not journaled as done (or interrupted while
+        # moving back) are checked on disk
+        moves: List[_Move] = [
+            (number, destination, source, resuming or number not in state["done"])
+            for number, (kind, source, destination) in reversed(list(enumerate(operations)))
+            if kind == "move" and number not in state["undone"] and number not in state["failed"]
+        ]
+        try:
+            self._move_all(run, moves, operations)
+            
+            for number in reversed(range(len(operations))):
+                kind, _, path = operations[number]
+                if kind != "mkdir" or number in state["undone"]:
+                    continue
+                self._check()
+                try:
+                    os.rmdir(self._path(path))
+                    run.finish(number, "removed_dirs")
+                except FileNotFoundError:
+                    run.finish(number)
+                except OSError as e:
+                    if e.errno in (errno.ENOTEMPTY, errno.EEXIST):
+                        # Holds files that were not part of the plan
+                        run.finish(number)
+                    else:
+                        run.fail(number, operations[number], e)
+        except OperationCancelled:
+            cancelled = True
+        finally:
+            run.flush()
+        
+        version = None
+        finished = not cancelled and not run.counts["failed"]
+        if finished and state["indexed"]:
+            moved_back = {
+                destination: source
+                for number, (kind, source, destination) in enumerate(operations)
+                if kind == "move" and number in state["done"]
+            }
+            version = self._record(moved_back, f"Undo: {state['description']}", None)
+        
+        summary = self._summary(state, run, started, cancelled, version)
+        if finished:
+            self.journal.append({"type": "rolled_back", **{key: value for key, value in summary.items() if key != "errors"}})
+        return summary
+    
+    def _move_all(self, run: _Run, moves: List[_Move], operations: List[List[Optional[str]]]) -> None:
+        """
+        Carry out moves: renames at once, moves between devices in parallel.
+        
+        Args:
+            run: Run progress
+            moves: Moves to carry out
+            operations: Planned operations (for error reports)
+        
+        Raises:
+            OperationCancelled: If the control token was cancelled
+        """
+        copies: List[Tuple[int, str, str]] = []
+        for number, source, destination, reconcile in moves:
+            self._check()
+            try:
+                if reconcile and self._settle(source, destination):
+                    run.finish(number)
+                    continue
+                if not self._rename(source, destination):
+                    copies.append((number, source, destination))
+                    continue
+            except OSError as e:
+                run.fail(number, operations[number], e)
+                continue
+            run.finish(number, "moved")
+        
+        if not copies:
+            return
+        
+        executor = ParallelExecutor(max_workers=self.copy_workers, control=self.control)
+        executor.execute_parallel(
+            [partial(self._copy, number, source, destination) for number, source, destination in copies],
+            callback=lambda completed, number: run.finish(number, "copied"),
+            error_handler=lambda e, position: run.fail(copies[position][0], operations[copies[position][0]], e)
+        )
+        # Copies skipped after a cancel are left for resume or undo
+        self._check()
+    
+    def _rename(self, source: str, destination: str) -> bool:
+        """
+        Move a file or directory on the same device.
+        
+        Args:
+            source: Relative source path
+            destination: Relative destination path
+        
+        Returns:
+            True if moved, False if the destination is on another device
+        
+        Raises:
+            OSError: If the move failed for another reason
+        """
+        try:
+            os.rename(self._path(source), self._path(destination))
+            return True
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                return False
+            raise
+    
+    def _copy(self, number: int, source: str, destination: str) -> int:
+        """
+        Move a file or directory to another device (runs in a copy thread).
+        
+        The copy is written next to the destination under a temporary name
+        and renamed into place, and files are flushed to disk, before the
+        source is removed.
+        
+        Args:
+            number: Operation number
+            source: Relative source path
+            destination: Relative destination path
+        
+        Returns:
+            Operation number
+        """
+        source_path = self._path(source)
+        destination_path = self._path(destination)
+        temp_path = destination_path + COPY_SUFFIX
+        
+        is_directory = os.path.isdir(source_path) and not os.path.islink(source_path)
+        try:
+            if is_directory:
+                shutil.copytree(source_path, temp_path, symlinks=True)
+            else:
+                shutil.copy2(source_path, temp_path, follow_symlinks=False)
+                if not os.path.islink(temp_path):
+                    with open(temp_path, "rb") as f:
+                        os.fsync(f.fileno())
+            os.replace(temp_path, destination_path)
+        except OSError:
+            if os.path.lexists(temp_path):
+                self._remove(temp_path)
+            raise
+        
+        self._remove(source_path)
+        return number
+    
+    def _settle(self, source: str, destination: str) -> bool:
+        """
+        Find out on disk whether a move ran, cleaning up after an interrupted copy.
+        
+        Args:
+            source: Relative source path
+            destination: Relative destination path
+        
+        Returns:
+            True if the move is complete, False if it has not started
+        
+        Raises:
+            OSError: If neither path exists, or both do and differ in size
+        """
+        source_path = self._path(source)
+        destination_path = self._path(destination)
+        for temp_path in (source_path + COPY_SUFFIX, destination_path + COPY_SUFFIX):
+            if os.path.lexists(temp_path):
+                self._remove(temp_path)
+        
+        source_exists = os.path.lexists(source_path)
+        if not os.path.lexists(destination_path):
+            if source_exists:
+                return False
+            raise FileNotFoundError(errno.ENOENT, os.strerror(errno.ENOENT), source_path)
+        
+        if source_exists:
+            # A copy between devices finished, but the source was not removed
+            source_stat = os.lstat(source_path)
+            destination_stat = os.lstat(destination_path)
+            if os.path.isdir(source_path) != os.path.isdir(destination_path) or (
+                    not os.path.isdir(source_path) and source_stat.st_size != destination_stat.st_size):
+                raise FileExistsError(errno.EEXIST, os.strerror(errno.EEXIST), destination_path)
+            self._remove(source_path)
+        return True
+    
+    @staticmethod
+    def _remove(path: str) -> None:
+        """
+        Remove a file or a directory tree.
+        
+        Args:
+            path: Absolute path
+        """
+        if os.path.isdir(path) and not os.path.islink(path):
+            shutil.rmtree(path)
+        else:
+            os.unlink(path)
+    
+    def _record(self, moves: Dict[str, str], description: str, llm_suggestions: Optional[Any]) -> Optional[int]:
+        """
+        Move the index records of moved files and record a version.
+        
+        Args:
+            moves: New path for each moved path
+            description: Version description
+            llm_suggestions: LLM recommendations behind the plan (optional)
+        
+        Returns:
+            New version number or None if nothing was recorded
+        """
+        if not moves or not self.index_storage.index_exists():
+            return None
+        
+        moved = self.index_storage.move_records(moves)
+        if not moved:
+            return None
+        if not self._version_matches_index():
+            # The latest version is of another index: record this one whole
+            return self.version_storage.create_version(self.index_storage, description, llm_suggestions)
+        return self.version_storage.create_version_from_changes(
+            moved.values(), moved.keys(), description, llm_suggestions, self.index_storage.get_indexed_at()
+        )
+    
+    def _version_matches_index(self) -> bool:
+        """
+        Check whether the latest version was taken from the current index
+        (or from changes made to it), so changes can be recorded against it.
+        
+        Returns:
+            True if the latest version has the indexed_at of the index
+        """
+        latest = self.version_storage.latest_version
+        if latest is None:
+            return False
+        header = self.version_storage.get_version(latest)
+        return header.get("indexed_at") == self.index_storage.get_indexed_at()
+    
+    def _summary(
+        self,
+        state: Dict[str, Any],
+        run: _Run,
+        started: float,
+        cancelled: bool,
+        version: Optional[int]
+    ) -> Dict[str, Any]:
+        """
+        Build the summary of a run and update the metrics.
+        
+        Args:
+            state: Journal state
+            run: Run progress
+            started: perf_counter() at the start of the run
+            cancelled: Whether the run was cancelled
+            version: Version recorded by the run
+        
+        Returns:
+            Summary dictionary
+        """
+        elapsed = time.perf_counter() - started
+        counts = run.counts
+        self._completed_metric.inc(counts["created_dirs"] + counts["removed_dirs"] + counts["moved"] + counts["copied"])
+        self._failed_metric.inc(counts["failed"])
+        self._run_metric.observe(elapsed)
+        return {
+            "plan": state["id"],
+            "operations": len(state["operations"]),
+            **counts,
+            "errors": run.errors,
+            "cancelled": cancelled,
+            "version": version,
+            "elapsed_seconds": round(elapsed, 3)
+        }
+    
+    def _check(self) -> None:
+        """
+        Wait while paused and stop once cancelled.
+        
+        Raises:
+            OperationCancelled: If the control token was cancelled
+        """
+        if self.control is not None:
+            self.control.check()
+    
+    def _path(self, path: str) -> str:
+        """
+        Get the absolute path of a plan path.
+        
+        Args:
+            path: Relative path
+        
+        Returns:
+            Absolute path string
+        """
+        return self._root + path
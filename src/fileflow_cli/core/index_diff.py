@@ -0,0 +1,409 @@
+"""Diff engine comparing two file indexes."""
+
+import pickle
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Tuple
+
+
+# Change kinds, in the order they are reported
+CHANGE_KINDS = ("modified", "moved", "added", "removed")
+
+# Records of the old index held in memory before the diff spills both
+# indexes to partition files on disk
+MAX_RECORDS_IN_MEMORY = 1000000
+
+# Partitions (by path hash) used once the diff spills to disk
+SPILL_PARTITIONS = 64
+
+# Records per chunk written to a partition file
+SPILL_CHUNK_SIZE = 4096
+
+# Compact record: (path, size, hash, inode, modified)
+_Entry = Tuple[str, int, Optional[str], Optional[int], Optional[str]]
+
+
+def _entry(record: Dict[str, Any]) -> _Entry:
+    """
+    Reduce an index record to the fields the diff compares.
+    
+    Args:
+        record: File metadata dictionary
+    
+    Returns:
+        Compact record tuple
+    """
+    return (
+        record["path"],
+        record.get("size") or 0,
+        record.get("hash"),
+        record.get("inode"),
+        record.get("modified")
+    )
+
+
+def _content_changed(old: _Entry, new: _Entry) -> bool:
+    """
+    Check whether the content of a file differs between two records.
+    
+    Args:
+        old: Compact record from the old index
+        new: Compact record from the new index
+    
+    Returns:
+        True if the file was modified
+    """
+    if old[2] and new[2]:
+        return old[2] != new[2] or old[1] != new[1]
+    # No hash (e.g. unreadable file): fall back to size and modification time
+    return old[1] != new[1] or old[4] != new[4]
+
+
+def _name(path: str) -> str:
+    """
+    Get the file name of an index path.
+    
+    Args:
+        path: Relative path with "/" or "\\" separators
+    
+    Returns:
+        Last path component
+    """
+    return path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+class IndexDiff:
+    """
+    Compares two indexes in one pass and reports what changed.
+    
+    The old index is loaded into a hash table keyed by path and the new
+    index is streamed against it (a hash join), so each record is looked
+    at once. Files present only on one side are then paired up as moves:
+    first by inode (if the content or the name also matches, since inodes
+    of deleted files are reused), then by size and content hash. Empty
+    files are never paired by content.
+    
+    Indexes with more than max_records_in_memory records are partitioned
+    by path hash into temporary files and joined one partition at a time,
+    so memory holds one partition plus the unmatched records, whatever
+    the size of the indexes.
+    
+    Changes are dictionaries with a "change" kind (one of CHANGE_KINDS),
+    "path", "size" and "hash"; modified and moved changes also carry
+    "old_size" and "old_hash", and moved changes "old_path".
+    """
+    
+    def __init__(
+        self,
+        max_records_in_memory: int = MAX_RECORDS_IN_MEMORY,
+        spill_dir: Optional[Path] = None
+    ):
+        """
+        Initialize diff engine.
+        
+        Args:
+            max_records_in_memory: Old records held in memory before
+                spilling to partition files
+            spill_dir: Directory for partition files (default: system
+                temporary directory)
+        """
+        self.max_records_in_memory = max(1, max_records_in_memory)
+        self.spill_dir = spill_dir
+        self.summary: Dict[str, int] = {}
+        self._reset_summary()
+    
+    def _reset_summary(self) -> None:
+        """Zero the counters of the summary."""
+        self.summary = {kind: 0 for kind in CHANGE_KINDS}
+        self.summary.update({
+            "unchanged": 0,
+            "old_files": 0,
+            "new_files": 0,
+            "added_bytes": 0,
+            "removed_bytes": 0,
+            "modified_bytes": 0
+        })
+    
+    def diff(
+        self,
+        old_records: Iterable[Dict[str, Any]],
+        new_records: Iterable[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Stream the changes from an old index to a new one.
+        
+        Modified files are reported while the new index is read; moves,
+        additions and removals once both indexes are read. The summary
+        attribute is complete when the iterator is exhausted.
+        
+        Args:
+            old_records: Records of the old index
+            new_records: Records of the new index
+        
+        Yields:
+            Change dictionaries
+        """
+        self._reset_summary()
+        added: List[_Entry] = []
+        removed: List[_Entry] = []
+        
+        old_iter = iter(old_records)
+        table: Dict[str, _Entry] = {}
+        for record in old_iter:
+            entry = _entry(record)
+            table[entry[0]] = entry
+            if len(table) >= self.max_records_in_memory:
+                break
+        else:
+            old_iter = None
+        
+        if old_iter is None:
+            self.summary["old_files"] = len(table)
+            yield from self._join(table, (_entry(record) for record in new_records), added, removed)
+        else:
+            yield from self._join_spilled(table, old_iter, new_records, added, removed)
+        
+        yield from self._match_moves(added, removed)
+    
+    def run(
+        self,
+        old_records: Iterable[Dict[str, Any]],
+        new_records: Iterable[Dict[str, Any]]
+    ) -> Dict[str, int]:
+        """
+        Diff two indexes and return only the summary.
+        
+        Args:
+            old_records: Records of the old index
+            new_records: Records of the new index
+        
+        Returns:
+            Summary dictionary (counts per change kind and byte totals)
+        """
+        for _ in self.diff(old_records, new_records):
+            pass
+        return self.summary
+    
+    def _join(
+        self,
+        table: Dict[str, _Entry],
+        new_entries: Iterable[_Entry],
+        added: List[_Entry],
+        removed: List[_Entry]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Join new records against a hash table of old records.
+        
+        Matched records are removed from the table; what is left in it
+        afterwards was removed (or moved away).
+        
+        Args:
+            table: Old records keyed by path (emptied)
+            new_entries: Compact records of the new index
+            added: Receives new records without an old one
+            removed: Receives old records without a new one
+        
+        Yields:
+            Modified changes
+        """
+        summary = self.summary
+        new_files = 0
+        for new in new_entries:
+            new_files += 1
+            old = table.pop(new[0], None)
+            if old is None:
+                added.append(new)
+            elif _content_changed(old, new):
+                summary["modified"] += 1
+                summary["modified_bytes"] += new[1] - old[1]
+                yield self._change("modified", new, old)
+            else:
+                summary["unchanged"] += 1
+        
+        summary["new_files"] += new_files
+        removed.extend(table.values())
+        table.clear()
+    
+    def _join_spilled(
+        self,
+        table: Dict[str, _Entry],
+        old_iter: Iterator[Dict[str, Any]],
+        new_records: Iterable[Dict[str, Any]],
+        added: List[_Entry],
+        removed: List[_Entry]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Join two large indexes partition by partition (grace hash join).
+        
+        Args:
+            table: Old records read so far (emptied)
+            old_iter: Remaining records of the old index
+            new_records: Records of the new index
+            added: Receives new records without an old one
+            removed: Receives old records without a new one
+        
+        Yields:
+            Modified changes
+        """
+        spill_dir = Path(tempfile.mkdtemp(prefix="fileflow-diff-", dir=self.spill_dir))
+        try:
+            old_files = self._spill(spill_dir, "old", self._chain(table.values(), old_iter))
+            table.clear()
+            new_files = self._spill(spill_dir, "new", (_entry(record) for record in new_records))
+            
+            for old_file, new_file in zip(old_files, new_files):
+                partition = {entry[0]: entry for entry in self._read_spilled(old_file)}
+                self.summary["old_files"] += len(partition)
+                yield from self._join(partition, self._read_spilled(new_file), added, removed)
+                old_file.unlink()
+                new_file.unlink()
+        finally:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+    
+    @staticmethod
+    def _chain(entries: Iterable[_Entry], records: Iterator[Dict[str, Any]]) -> Iterator[_Entry]:
+        """
+        Continue compact records already read with the rest of an index.
+        
+        Args:
+            entries: Compact records read so far
+            records: Remaining index records
+        
+        Yields:
+            Compact records
+        """
+        yield from entries
+        for record in records:
+            yield _entry(record)
+    
+    @staticmethod
+    def _spill(spill_dir: Path, side: str, entries: Iterable[_Entry]) -> List[Path]:
+        """
+        Write compact records to partition files by path hash.
+        
+        Records are buffered per partition and written in pickled chunks,
+        which is several times faster than a line per record.
+        
+        Args:
+            spill_dir: Directory for the partition files
+            side: File name prefix ("old" or "new")
+            entries: Compact records
+        
+        Returns:
+            Partition file paths, in partition order
+        """
+        paths = [spill_dir / f"{side}-{number}.bin" for number in range(SPILL_PARTITIONS)]
+        files = [open(path, "wb") for path in paths]
+        buffers: List[List[_Entry]] = [[] for _ in range(SPILL_PARTITIONS)]
+        try:
+            for entry in entries:
+                # Both sides are partitioned in this process, so the
+                # (per-process) string hash puts a path in the same partition
+                partition = hash(entry[0]) % SPILL_PARTITIONS
+                buffer = buffers[partition]
+                buffer.append(entry)
+                if len(buffer) >= SPILL_CHUNK_SIZE:
+                    pickle.dump(buffer, files[partition], pickle.HIGHEST_PROTOCOL)
+                    buffer.clear()
+            for partition, buffer in enumerate(buffers):
+                if buffer:
+                    pickle.dump(buffer, files[partition], pickle.HIGHEST_PROTOCOL)
+        finally:
+            for f in files:
+                f.close()
+        return paths
+    
+    @staticmethod
+    def _read_spilled(file_path: Path) -> Iterator[_Entry]:
+        """
+        Read compact records back from a partition file.
+        
+        Args:
+            file_path: Partition file (written by _spill in this run)
+        
+        Yields:
+            Compact records
+        """
+        with open(file_path, "rb") as f:
+            while True:
+                try:
+                    chunk = pickle.load(f)
+                except EOFError:
+                    return
+                yield from chunk
+    
+    def _match_moves(self, added: List[_Entry], removed: List[_Entry]) -> Iterator[Dict[str, Any]]:
+        """
+        Pair files that appeared with files that disappeared.
+        
+        Args:
+            added: New records without an old record at the same path
+            removed: Old records without a new record at the same path
+        
+        Yields:
+            Moved, added and removed changes
+        """
+        summary = self.summary
+        by_inode: Dict[int, int] = {}
+        by_content: Dict[Tuple[int, str], List[int]] = {}
+        for position, old in enumerate(removed):
+            if old[3]:
+                by_inode[old[3]] = position
+            if old[1] and old[2]:
+                by_content.setdefault((old[1], old[2]), []).append(position)
+        
+        matched = [False] * len(removed)
+        unmatched: List[_Entry] = []
+        for new in added:
+            position = by_inode.get(new[3]) if new[3] else None
+            if position is not None:
+                old = removed[position]
+                if matched[position] or (old[2] != new[2] and _name(old[0]) != _name(new[0])):
+                    position = None
+            if position is None and new[1] and new[2]:
+                candidates = by_content.get((new[1], new[2]))
+                while candidates and matched[candidates[-1]]:
+                    candidates.pop()
+                if candidates:
+                    position = candidates.pop()
+            
+            if position is None:
+                unmatched.append(new)
+                continue
+            
+            matched[position] = True
+            summary["moved"] += 1
+            yield self._change("moved", new, removed[position])
+        
+        for new in unmatched:
+            summary["added"] += 1
+            summary["added_bytes"] += new[1]
+            yield self._change("added", new)
+        
+        for position, old in enumerate(removed):
+            if not matched[position]:
+                summary["removed"] += 1
+                summary["removed_bytes"] += old[1]
+                yield self._change("removed", old)
+    
+    @staticmethod
+    def _change(kind: str, entry: _Entry, old: Optional[_Entry] = None) -> Dict[str, Any]:
+        """
+        Build a change dictionary.
+        
+        Args:
+            kind: Change kind
+            entry: Compact record (the new one, or the old one if removed)
+            old: Old compact record for modified and moved changes
+        
+        Returns:
+            Change dictionary
+        """
+        change = {"change": kind, "path": entry[0], "size": entry[1], "hash": entry[2]}
+        if old is not None:
+            if kind == "moved":
+                change["old_path"] = old[0]
+            change["old_size"] = old[1]
+            change["old_hash"] = old[2]
+        return change
@@ -2,31 +2,91 @@
 
 import hashlib
 import os
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Iterator
+from typing import Dict, Any, Optional, List, Iterator, Tuple
 from datetime import datetime
 
 from ..storage.checkpoint_manager import CheckpointManager
-from ..utils.error_handler import handle_error, IndexingError
+from ..storage.index_storage import IndexStorage
+from ..storage.index_lock import IndexLock
+from .analyzer import FileAnalyzer, BufferPool, HEAD_SIZE
+from .directory_walker import ParallelDirectoryWalker
+from .exceptions_manager import ExceptionsManager
+from ..utils.error_handler import handle_error, get_error_handler, IndexingError, IndexLockedError
 from .parallel_executor import ParallelExecutor
-from ..utils.config import get_config
+from .progress import ProgressTracker
+from .run_control import OperationCancelled, RunControl
+from ..utils.config import get_config, get_performance_profile
+from ..utils.metrics import get_metrics, export_metrics
+
+
+# posix_fadvise hints for file reads, by read_advice setting
+READ_ADVICE = {
+    "normal": None,
+    "random": getattr(os, "POSIX_FADV_RANDOM", None),
+    "dontneed": getattr(os, "POSIX_FADV_DONTNEED", None),
+}
+
+# Read size for the rest of a file when hashing its whole content
+FULL_HASH_CHUNK_SIZE = 1024 * 1024
+
+# Rough memory per index record besides its preview (dict, strings)
+RECORD_OVERHEAD_BYTES = 2048
+
+# Most frequent error groups reported with the final progress update
+ERROR_SUMMARY_SIZE = 10
+
+# Process niceness already applied by a "nice" setting
+_applied_nice = 0
 
 
 class FileIndexer:
     """Indexes files and directories."""
     
-    def __init__(self, config_dir: Path):
+    def __init__(self, config_dir: Path, control: Optional[RunControl] = None):
         """
         Initialize file indexer.
         
         Args:
             config_dir: Path to .fileflow_cli directory
+            control: Pause/cancel token for runs (default: a new one, driven
+                by pause(), resume() and cancel())
         """
         self.config_dir = Path(config_dir)
-        self.checkpoint_manager = CheckpointManager(self.config_dir)
-        self.batch_size = get_config("batch_size", 100)
+        self.control = control or RunControl()
+        self.checkpoint_manager = CheckpointManager(
+            self.config_dir,
+            durability=get_config("checkpoint_durability", "fsync-file")
+        )
+        self.exceptions_manager = ExceptionsManager(self.config_dir)
+        self.index_storage = IndexStorage(self.config_dir)
+        self.index_lock = IndexLock(self.config_dir)
+        self.analyzer = FileAnalyzer()
+        self.buffer_pool = BufferPool(HEAD_SIZE)
+        # Read buffers for the rest of a file when hash_mode is "full"
+        self.chunk_pool = BufferPool(FULL_HASH_CHUNK_SIZE)
+        self.max_file_size_for_preview = get_config("max_file_size_for_preview", 10 * 1024 * 1024)
+        self.preview_max_bytes = get_config("preview_max_bytes", 1024)
+        self.preview_max_lines = get_config("preview_max_lines", 20)
+        self.performance_profile = get_performance_profile()[0]
         self.thread_count = get_config("thread_count", 4)
-        self.executor = ParallelExecutor(max_workers=self.thread_count)
+        self.scan_thread_count = get_config("scan_thread_count", 8)
+        self.checkpoint_interval = max(1, get_config("checkpoint_interval", 1))
+        self.hash_mode = get_config("hash_mode", "head")
+        self.read_advice = READ_ADVICE.get(get_config("read_advice", "normal"))
+        self.nice = get_config("nice", 0)
+        self.batch_size = get_config("batch_size", 100)
+        memory_limit_mb = get_config("memory_limit_mb", None)
+        if memory_limit_mb:
+            # Records of a batch (with previews) are held until it is staged
+            record_bytes = self.preview_max_bytes + RECORD_OVERHEAD_BYTES
+            self.batch_size = max(1, min(self.batch_size, memory_limit_mb * 1024 * 1024 // record_bytes))
+        self.executor = ParallelExecutor(max_workers=self.thread_count, control=self.control)
+        self.progress = ProgressTracker(metrics=get_metrics())
+        self.metrics_textfile_path = get_config("metrics_textfile_path", None)
+        self.metrics_export_interval = get_config("metrics_export_interval", 10.0)
+        self._metrics_exported_at = 0.0
     
     def index_directory(
         self,
@@ -40,38 +100,121 @@ class FileIndexer:
             directory: Directory to index
             checkpoint: Optional checkpoint data to resume from
         
+        Pausing blocks the workers (and this generator) until resumed.
+        After cancel(), in-flight files stop at their next read, a final
+        checkpoint is saved and a last update with "cancelled" set is
+        yielded.
+        
+        The index lock is held for the whole run, so only one process
+        indexes a directory at a time; readers keep seeing the previous
+        index until the new one is published.
+        
         Yields:
             Progress update dictionaries
+        
+        Raises:
+            IndexingError: If the directory does not exist
+            IndexLockedError: If another process is indexing it
         """
         directory = Path(directory).resolve()
         
         if not directory.exists() or not directory.is_dir():
             raise IndexingError(f"Directory does not exist: {directory}")
         
+        # Released when the run ends, fails or the generator is closed
+        if not self.index_lock.acquire("index"):
+            raise IndexLockedError(self.config_dir, self.index_lock.holder())
+        try:
+            yield from self._index_directory(directory, checkpoint)
+        finally:
+            # A queued checkpoint must not be written after another run
+            # takes the lock
+            self.checkpoint_manager.flush()
+            self.index_lock.release()
+    
+    def _index_directory(
+        self,
+        directory: Path,
+        checkpoint: Optional[Dict[str, Any]]
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Run an indexing pass (the caller holds the index lock).
+        
+        Args:
+            directory: Resolved directory to index
+            checkpoint: Optional checkpoint data to resume from
+        
+        Yields:
+            Progress update dictionaries
+        """
+        self.progress.reset()
+        get_error_handler().clear()
+        self._apply_nice()
+        
         # Collect all files to process
-        all_files = self._collect_files(directory)
+        with self.progress.stage("scan"):
+            all_files = self._collect_files(directory)
         total_files = len(all_files)
         
+        if self.control.is_cancelled:
+            # Nothing processed yet; an earlier checkpoint stays as it was
+            yield {
+                "total_files": total_files,
+                "processed_files": 0,
+                **self.progress.snapshot(),
+                "cancelled": True
+            }
+            return
+        
         # Determine starting point from checkpoint
-        start_index = 0
         processed_paths = []
         file_hashes = {}
+        completed_batches = 0
         
         if checkpoint:
             processed_paths = checkpoint.get("processed_paths", [])
             file_hashes = checkpoint.get("file_hashes", {})
-            start_index = len(processed_paths)
+            completed_batches = checkpoint.get("current_batch", 0)
+        else:
+            # Fresh run: drop records staged by an abandoned run
+            self.index_storage.clear_staged()
+        # Continue the checkpoint segments of a resumed run
+        self.checkpoint_manager.begin(checkpoint)
+        
+        # Skip files already recorded in the checkpoint. Matching by path
+        # (not by position) keeps resume correct when earlier files failed.
+        pending_files = all_files
+        if processed_paths:
+            processed_set = set(processed_paths)
+            pending_files = [
+                f for f in all_files
+                if self._relative_path(f, directory) not in processed_set
+            ]
+        
+        self.progress.set_total(len(pending_files))
         
         # Prepare progress data
         started_at = checkpoint.get("started_at") if checkpoint else datetime.now().isoformat()
         
         # Process files in batches
-        total_batches = (total_files - start_index + self.batch_size - 1) // self.batch_size
+        total_batches = completed_batches + (len(pending_files) + self.batch_size - 1) // self.batch_size
+        
+        def save_checkpoint(batch_num: int) -> None:
+            # Written by the background checkpoint writer
+            self.checkpoint_manager.queue_checkpoint({
+                "started_at": started_at,
+                "total_files": total_files,
+                "processed_files": len(processed_paths),
+                "processed_paths": processed_paths,
+                "file_hashes": file_hashes,
+                "current_batch": batch_num,
+                "total_batches": total_batches,
+                "status": "in_progress"
+            })
         
-        for batch_num in range((start_index // self.batch_size) + 1, total_batches + 1):
-            batch_start = start_index + (batch_num - 1) * self.batch_size
-            batch_end = min(batch_start + self.batch_size, total_files)
-            batch_files = all_files[batch_start:batch_end]
+        for batch_num in range(completed_batches + 1, total_batches + 1):
+            batch_start = (batch_num - completed_batches - 1) * self.batch_size
+            batch_files = pending_files[batch_start:batch_start + self.batch_size]
             
             # Process batch in parallel
             tasks = [
@@ -92,19 +235,37 @@ class FileIndexer:
                     file_hashes[result["path"]] = result["hash"]
                     batch_file_info.append(result)
             
-            # Save checkpoint
-            progress_data = {
-                "started_at": started_at,
-                "total_files": total_files,
-                "processed_files": len(processed_paths),
-                "processed_paths": processed_paths,
-                "file_hashes": file_hashes,
-                "current_batch": batch_num,
-                "total_batches": total_batches,
-                "status": "in_progress"
-            }
+            checkpoint_started = time.perf_counter()
+            
+            # Stage records before the checkpoint references them
+            self.index_storage.append_staged(batch_file_info)
             
-            self.checkpoint_manager.save_checkpoint(progress_data)
+            if self.control.is_cancelled:
+                # Keep the files finished so far; the rest of the batch is
+                # processed on resume
+                save_checkpoint(batch_num - 1)
+                self.checkpoint_manager.flush()
+                self.progress.add_time("checkpoint", time.perf_counter() - checkpoint_started)
+                self._export_metrics(force=True)
+                get_error_handler().flush()
+                yield {
+                    "total_files": total_files,
+                    "processed_files": len(processed_paths),
+                    "current_batch": batch_num - 1,
+                    "total_batches": total_batches,
+                    "progress_percent": (len(processed_paths) / total_files * 100) if total_files > 0 else 0,
+                    **self.progress.snapshot(),
+                    "cancelled": True
+                }
+                return
+            
+            # Save a checkpoint every checkpoint_interval batches. Files
+            # staged after the last checkpoint are processed again on
+            # resume, and their newer records replace the staged ones.
+            if (batch_num - completed_batches) % self.checkpoint_interval == 0 or batch_num == total_batches:
+                save_checkpoint(batch_num)
+            self.progress.add_time("checkpoint", time.perf_counter() - checkpoint_started)
+            self._export_metrics()
             
             # Yield progress update with file information
             yield {
@@ -113,11 +274,22 @@ class FileIndexer:
                 "current_batch": batch_num,
                 "total_batches": total_batches,
                 "progress_percent": (len(processed_paths) / total_files * 100) if total_files > 0 else 0,
-                "recent_files": [f["path"] for f in batch_file_info]  # Add recent files info
+                **self.progress.snapshot(),
+                # Size and type come along so the UI never has to stat files
+                "recent_files": [
+                    {"path": f["path"], "size": f["size"], "mime_type": f["mime_type"]}
+                    for f in batch_file_info
+                ]
             }
         
-        # Clear checkpoint when complete
-        self.checkpoint_manager.clear_checkpoint()
+        # Write the final index, then clear staging and checkpoint
+        with self.progress.stage("checkpoint"):
+            self.index_storage.save_index(self.index_storage.load_staged())
+            self.index_storage.clear_staged()
+            self.checkpoint_manager.clear_checkpoint()
+        self._export_metrics(force=True)
+        error_handler = get_error_handler()
+        error_handler.flush()
         
         # Final yield
         yield {
@@ -126,6 +298,8 @@ class FileIndexer:
             "current_batch": total_batches,
             "total_batches": total_batches,
             "progress_percent": 100.0,
+            **self.progress.snapshot(),
+            "error_groups": error_handler.get_error_summary(ERROR_SUMMARY_SIZE),
             "complete": True
         }
     
@@ -151,28 +325,93 @@ class FileIndexer:
         """
         Collect all files to index recursively.
         
+        Directories are listed in parallel and excluded directories are
+        pruned before descending, so vendored dependency trees and caches
+        are never listed.
+        
         Args:
             directory: Directory to scan
         
         Returns:
-            List of file paths
+            Sorted list of file paths
+        """
+        walker = ParallelDirectoryWalker(
+            matcher=self.exceptions_manager.build_matcher(directory),
+            max_workers=self.scan_thread_count,
+            max_depth=get_config("scan_max_depth", None),
+            max_breadth=get_config("scan_max_breadth", None),
+            skip_paths=[str(self.config_dir.resolve())],
+            error_handler=self._handle_scan_error,
+            control=self.control
+        )
+        return walker.walk(directory)
+    
+    def pause(self) -> None:
+        """Pause the running indexing run (workers block before their next read)."""
+        self.control.pause()
+    
+    def resume(self) -> None:
+        """Resume a paused indexing run."""
+        self.control.resume()
+    
+    def cancel(self) -> None:
+        """Cancel the running indexing run; it saves a final checkpoint and stops."""
+        self.control.cancel()
+    
+    def _apply_nice(self) -> None:
+        """Lower the process priority as the "nice" setting asks (once per process)."""
+        global _applied_nice
+        
+        if self.nice > _applied_nice and hasattr(os, "nice"):
+            try:
+                os.nice(self.nice - _applied_nice)
+                _applied_nice = self.nice
+            except OSError:
+                pass
+    
+    def _export_metrics(self, force: bool = False) -> None:
+        """
+        Write metrics export files, at most once per export interval.
+        
+        Args:
+            force: Export regardless of the interval (end of run)
+        """
+        if not get_metrics().enabled:
+            return
+        
+        now = time.monotonic()
+        if not force and now - self._metrics_exported_at < self.metrics_export_interval:
+            return
+        
+        self._metrics_exported_at = now
+        export_metrics(self.config_dir, self.metrics_textfile_path)
+    
+    def _handle_scan_error(self, error: Exception, path: str) -> None:
         """
-        files = []
+        Report an error raised while listing a directory.
         
+        Args:
+            error: Exception that occurred
+            path: Directory being listed
+        """
+        self.progress.add_error()
+        handle_error(error, {"operation": "collect_files", "directory": path})
+    
+    def _relative_path(self, file_path: Path, base_directory: Path) -> str:
+        """
+        Get path of a file relative to the indexed directory.
+        
+        Args:
+            file_path: Path to file
+            base_directory: Base directory for relative paths
+        
+        Returns:
+            Relative path string (the full path if outside base_directory)
+        """
         try:
-            for item in directory.rglob("*"):
-                if item.is_file():
-                    # Skip files without read permissions
-                    if os.access(item, os.R_OK):
-                        files.append(item)
-                    # Skip .fileflow_cli directory
-                    elif ".fileflow_cli" in str(item):
-                        continue
-        except PermissionError as e:
-            # Handle permission errors gracefully
-            handle_error(e, {"operation": "collect_files", "directory": str(directory)})
-        
-        return sorted(files)
+            return str(file_path.relative_to(base_directory))
+        except ValueError:
+            return str(file_path)
     
     def _process_file(self, file_path: Path, base_directory: Path) -> Optional[Dict[str, Any]]:
         """
@@ -185,34 +424,74 @@ class FileIndexer:
         Returns:
             Dictionary with file metadata or None if error
         """
+        progress = self.progress
+        progress.start_file()
+        size = 0
+        
         try:
             # Get relative path
-            try:
-                relative_path = file_path.relative_to(base_directory)
-            except ValueError:
-                relative_path = file_path
+            relative_path = self._relative_path(file_path, base_directory)
             
             # Get file stats
+            started = time.perf_counter()
             stat = file_path.stat()
+            size = stat.st_size
+            stat_done = time.perf_counter()
+            progress.add_time("stat", stat_done - started)
+            
+            # Hash and sniff from a single read of the file head. The head
+            # lives in this worker's pooled buffer and is passed on as a
+            # memoryview, so analysis costs no extra I/O or copies.
+            buffer = self.buffer_pool.acquire()
+            file_hash, head_length = self._hash_file_head(file_path, buffer, stat)
+            hash_done = time.perf_counter()
+            progress.add_time("hash", hash_done - stat_done)
             
-            # Calculate file hash (for change detection)
-            file_hash = self._calculate_file_hash(file_path)
+            preview = None
+            with memoryview(buffer)[:head_length] as head:
+                mime_type, magic = self.analyzer.sniff(head, file_path.name)
+                if magic == "text":
+                    preview = self.analyzer.extract_preview(
+                        head,
+                        stat.st_size,
+                        max_bytes=self.preview_max_bytes,
+                        max_lines=self.preview_max_lines,
+                        max_file_size=self.max_file_size_for_preview
+                    )
+            progress.add_time("analyze", time.perf_counter() - hash_done)
             
             # Get file extension
             suffix = file_path.suffix.lower()
             
-            return {
-                "path": str(relative_path),
+            record = {
+                "path": relative_path,
                 "name": file_path.name,
                 "size": stat.st_size,
                 "modified": datetime.fromtimestamp(stat.st_mtime).isoformat(),
                 "hash": file_hash,
+                # Lets the index diff follow moves of edited files
+                "inode": stat.st_ino,
                 "extension": suffix,
+                "mime_type": mime_type,
+                "magic": magic,
                 "is_directory": False
             }
+            
+            # Stored out of line by IndexStorage.save_index
+            if preview is not None:
+                record["preview"], record["encoding"] = preview
+            
+            progress.finish_file(size)
+            return record
+        
+        except OperationCancelled:
+            # Processed again on resume
+            progress.abandon_file()
+            return None
         
         except Exception as e:
             # Handle errors gracefully
+            progress.finish_file(size, error=True)
             handle_error(e, {"operation": "process_file", "file": str(file_path)})
             return None
     
@@ -227,35 +506,95 @@ class FileIndexer:
         Returns:
             SHA256 hash string
         """
+        buffer = self.buffer_pool.acquire() if chunk_size == self.buffer_pool.size else bytearray(chunk_size)
+        file_hash, _ = self._hash_file_head(file_path, buffer)
+        return file_hash
+    
+    def _hash_file_head(
+        self,
+        file_path: Path,
+        buffer: bytearray,
+        stat: Optional[os.stat_result] = None
+    ) -> Tuple[str, int]:
+        """
+        Hash a file, leaving its first chunk in the given buffer.
+        
+        Files larger than the buffer are hashed from the first chunk plus
+        size and modification time (hash_mode "head"), or from their whole
+        content (hash_mode "full"); smaller files are hashed completely.
+        
+        Args:
+            file_path: Path to file
+            buffer: Reusable buffer; receives the file head
+            stat: Stat result of the file, if already known
+        
+        Returns:
+            Tuple of (SHA256 hash string, number of head bytes in buffer)
+        """
         hash_obj = hashlib.sha256()
+        chunk_size = len(buffer)
+        head_length = 0
         
         try:
-            with open(file_path, "rb") as f:
+            with open(file_path, "rb", buffering=0) as f:
+                if self.read_advice is not None and self.read_advice != READ_ADVICE["dontneed"]:
+                    self._advise(f.fileno(), self.read_advice)
+                
                 # Read first chunk for quick hash (surface-level analysis)
-                chunk = f.read(chunk_size)
-                hash_obj.update(chunk)
+                with memoryview(buffer) as view:
+                    head_length = f.readinto(view) or 0
+                    
+                    # A raw read may return short; fill the head completely
+                    while 0 < head_length < chunk_size:
+                        read = f.readinto(view[head_length:])
+                        if not read:
+                            break
+                        head_length += read
+                    
+                    hash_obj.update(view[:head_length])
                 
-                # For small files, read the rest
-                if len(chunk) == chunk_size:
+                if head_length == chunk_size and self.hash_mode == "full":
+                    # Large file - hash the rest, keeping the head in buffer
+                    chunk = self.chunk_pool.acquire()
+                    with memoryview(chunk) as view:
+                        while True:
+                            # Pause and cancel take effect between chunks
+                            self.control.check()
+                            read = f.readinto(view)
+                            if not read:
+                                break
+                            hash_obj.update(view[:read])
+                elif head_length == chunk_size:
                     # Large file - only hash first chunk + metadata
-                    stat = file_path.stat()
+                    if stat is None:
+                        stat = file_path.stat()
                     hash_obj.update(str(stat.st_size).encode())
                     hash_obj.update(str(stat.st_mtime).encode())
-                else:
-                    # Small file - read everything
-                    while True:
-                        chunk = f.read(chunk_size)
-                        if not chunk:
-                            break
-                        hash_obj.update(chunk)
+                
+                if self.read_advice is not None and self.read_advice == READ_ADVICE["dontneed"]:
+                    self._advise(f.fileno(), self.read_advice)
         except (IOError, PermissionError):
             # If can't read, use path + modified time as hash
+            head_length = 0
             try:
-                stat = file_path.stat()
+                if stat is None:
+                    stat = file_path.stat()
                 hash_obj.update(str(file_path).encode())
                 hash_obj.update(str(stat.st_mtime).encode())
             except:
                 hash_obj.update(str(file_path).encode())
         
-        return hash_obj.hexdigest()
-
+        return hash_obj.hexdigest(), head_length
+    
+    def _advise(self, fd: int, advice: int) -> None:
+        """
+        Pass a read-ahead/caching hint for an open file to the kernel.
+        
+        Args:
+            fd: File descriptor
+            advice: posix_fadvise constant
+        """
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
@@ -0,0 +1,578 @@
+"""Token-budgeted LLM payloads built from the index."""
+
+import hashlib
+import heapq
+import itertools
+import os
+import re
+import time
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Callable
+
+from ..storage.index_storage import IndexStorage
+from ..storage.summary_cache import SummaryCache
+from ..utils.error_handler import LLMError
+from ..utils.metrics import get_metrics
+
+
+# What a payload includes (see "LLM Payload Modes" in the README)
+PAYLOAD_MODES = ("structure", "metadata", "previews")
+
+# Token budget of a payload unless configured
+DEFAULT_TOKEN_BUDGET = 32000
+
+# Characters per token assumed by estimate_tokens; paths, numbers and
+# dates split into more tokens than prose, so this errs on the high side
+CHARS_PER_TOKEN = 3
+
+# Directories with more files than this are summarized, never listed
+LISTING_LIMIT = 50
+
+# Entries shown per histogram of a summary
+TOP_TYPES = 6
+TOP_PATTERNS = 4
+
+# Distinct name patterns counted per directory
+PATTERN_LIMIT = 256
+
+# Characters of a text preview included per file ("previews" mode)
+PREVIEW_CHARS = 160
+
+# Metadata tags included per file ("metadata" and "previews" modes)
+MAX_TAGS = 4
+
+_DIGITS = re.compile(r"\d+")
+_INDENT = "  "
+_DIGEST_MASK = (1 << 128) - 1
+
+_HEADERS = {
+    "structure": "Files: name.",
+    "metadata": "Files: name, size, date modified, tags.",
+    "previews": "Files: name, size, date modified, tags; \"> \" lines start a text file."
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer.
+    
+    Args:
+        text: Text to estimate
+    
+    Returns:
+        Estimated token count (rounded up)
+    """
+    if text.isascii():
+        return len(text) // CHARS_PER_TOKEN + 1
+    # Letters outside ASCII take about a token per character or two
+    return len(text.encode("utf-8")) // 2 + 1
+
+
+def _format_size(size: float) -> str:
+    """Format file size in human-readable format."""
+    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+        if size < 1024.0:
+            return f"{size:.1f} {unit}"
+        size /= 1024.0
+    return f"{size:.1f} PB"
+
+
+def _top(counts: Dict[str, int], limit: int) -> List[Any]:
+    """Return the most frequent (key, count) pairs, most frequent first."""
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class _Directory:
+    """A directory of the index with its own files and subtree totals."""
+    
+    __slots__ = (
+        "path", "name", "depth", "children",
+        "files", "bytes", "types", "patterns", "oldest", "newest", "digest", "positions",
+        "total_files", "total_dirs", "total_bytes", "total_types", "total_patterns",
+        "total_oldest", "total_newest", "key", "hash"
+    )
+    
+    def __init__(self, path: str, name: str, depth: int):
+        self.path = path
+        self.name = name
+        self.depth = depth
+        self.children: List["_Directory"] = []
+        self.files = 0
+        self.bytes = 0
+        self.types: Dict[str, int] = {}
+        self.patterns: Dict[str, int] = {}
+        self.oldest = ""
+        self.newest = ""
+        self.digest = 0
+        # Index positions of the own files, dropped once there are too many to list
+        self.positions: Optional[List[int]] = []
+        self.total_files = 0
+        self.total_dirs = 0
+        self.total_bytes = 0
+        self.total_types: Dict[str, int] = {}
+        self.total_patterns: Dict[str, int] = {}
+        self.total_oldest = ""
+        self.total_newest = ""
+        # Content hash of the own files, and of the whole subtree
+        self.key = ""
+        self.hash = ""
+    
+    def add(self, position: int, name: str, record: Dict[str, Any], listing_limit: int) -> None:
+        """
+        Count a file of this directory.
+        
+        Args:
+            position: Position of the record in the index
+            name: File name
+            record: File metadata dictionary from the index
+            listing_limit: Stop keeping positions after this many files
+        """
+        self.files += 1
+        size = record.get("size") or 0
+        self.bytes += size
+        extension = record.get("extension") or ""
+        self.types[extension] = self.types.get(extension, 0) + 1
+        
+        # Digits of the extension (.mp3) are not part of the pattern
+        stem_length = len(name) - len(extension)
+        pattern = _DIGITS.sub("#", name[:stem_length]) + name[stem_length:]
+        count = self.patterns.get(pattern)
+        if count is not None:
+            self.patterns[pattern] = count + 1
+        elif len(self.patterns) < PATTERN_LIMIT:
+            self.patterns[pattern] = 1
+        
+        modified = record.get("modified") or ""
+        if modified:
+            if not self.oldest or modified < self.oldest:
+                self.oldest = modified
+            if modified > self.newest:
+                self.newest = modified
+        
+        # Adding the file hashes makes the digest independent of index order
+        content = f"{name}\0{size}\0{record.get('hash')}\0{modified}\0{record.get('metadata')}"
+        file_hash = hashlib.blake2b(content.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+        self.digest += int.from_bytes(file_hash, "little")
+        
+        if self.positions is not None:
+            if self.files > listing_limit:
+                self.positions = None
+            else:
+                self.positions.append(position)
+    
+    def finish(self) -> None:
+        """Compute subtree totals and hashes (children must be finished first)."""
+        self.key = f"{self.digest & _DIGEST_MASK:032x}"
+        self.children.sort(key=lambda child: child.name)
+        
+        self.total_files = self.files
+        self.total_dirs = len(self.children)
+        self.total_bytes = self.bytes
+        self.total_types = dict(self.types)
+        self.total_patterns = dict(self.patterns)
+        self.total_oldest = self.oldest
+        self.total_newest = self.newest
+        subtree_hash = hashlib.blake2b(self.key.encode("ascii"), digest_size=16)
+        for child in self.children:
+            self.total_files += child.total_files
+            self.total_dirs += child.total_dirs
+            self.total_bytes += child.total_bytes
+            for extension, count in child.total_types.items():
+                self.total_types[extension] = self.total_types.get(extension, 0) + count
+            for pattern, count in child.total_patterns.items():
+                if pattern in self.total_patterns:
+                    self.total_patterns[pattern] += count
+                elif len(self.total_patterns) < PATTERN_LIMIT:
+                    self.total_patterns[pattern] = count
+            if child.total_oldest and (not self.total_oldest or child.total_oldest < self.total_oldest):
+                self.total_oldest = child.total_oldest
+            if child.total_newest > self.total_newest:
+                self.total_newest = child.total_newest
+            subtree_hash.update(b"\0" + child.name.encode("utf-8", "surrogatepass") + b"\0" + child.hash.encode("ascii"))
+        self.hash = subtree_hash.hexdigest()
+
+
+class _CacheMiss(Exception):
+    """A text the payload needs is not in the summary cache."""
+
+
+class PayloadBuilder:
+    """
+    Builds the text sent to the LLM for analysis, within a token budget.
+    
+    The payload is a directory tree, one line per directory or file. The
+    budget is spent top-down, larger directories first: a directory is
+    either expanded (its files listed, or summarized if there are more
+    than listing_limit, and its subdirectories shown) or collapsed into a
+    single summary line with file counts, type histograms and name
+    patterns. Private files are never included.
+    
+    Summaries and listings are cached by content hash of what they
+    describe (llm_summaries.json.gz), so after re-indexing only changed
+    subtrees are rendered again. As long as the index does not change, the
+    directory tree itself comes from the cache and the index is not read.
+    """
+    
+    def __init__(
+        self,
+        config_dir: Path,
+        mode: str = "structure",
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        listing_limit: int = LISTING_LIMIT
+    ):
+        """
+        Initialize payload builder.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            mode: Payload mode ("structure", "metadata" or "previews")
+            token_budget: Maximum estimated tokens of the payload
+            listing_limit: List the files of directories with at most this many
+        
+        Raises:
+            ValueError: If the mode is unknown
+        """
+        if mode not in PAYLOAD_MODES:
+            raise ValueError(f"Unknown payload mode: {mode}")
+        self.config_dir = Path(config_dir)
+        self.mode = mode
+        self.token_budget = token_budget
+        self.listing_limit = listing_limit
+        self.index_storage = IndexStorage(config_dir)
+        self.cache = SummaryCache(config_dir)
+        # Texts used by the current build, and how many were not cached
+        self._used: Dict[str, str] = {}
+        self._rendered = 0
+    
+    def build(self) -> Optional[Dict[str, Any]]:
+        """
+        Build the payload.
+        
+        Returns:
+            Dictionary with the payload "text", its estimated "tokens", the
+            "token_budget", "mode", counts of "files", "directories",
+            "listed_directories" and "summarized_directories", "cached"
+            (True if the index was not read) and "elapsed_seconds";
+            None if no index exists
+        
+        Raises:
+            LLMError: If not even a summary of the whole index fits the budget
+        """
+        started = time.perf_counter()
+        stamp = self._stamp()
+        if stamp is None:
+            return None
+        
+        cache = self.cache.load()
+        texts = cache["texts"]
+        self._used = {}
+        self._rendered = 0
+        
+        result = None
+        tree = cache["tree"]
+        if cache["stamp"] == stamp and tree:
+            try:
+                result = self._allocate(self._load_tree(tree), texts, scanned=False)
+            except _CacheMiss:
+                result = None
+        cached = result is not None
+        if not cached:
+            root = self._scan()
+            tree = self._tree_rows(root)
+            self._used = {}
+            result = self._allocate(root, texts, scanned=True)
+        
+        if not cached or self._rendered:
+            # Texts of other modes stay; texts of this mode are pruned to this payload
+            prefix = f"{self.mode}:"
+            kept = {key: text for key, text in texts.items() if not key.startswith(prefix)}
+            kept.update(self._used)
+            self.cache.save(stamp, tree, kept)
+        
+        elapsed = time.perf_counter() - started
+        get_metrics().histogram(
+            "fileflow_llm_payload_seconds", "Time to build an LLM payload", cached=str(cached).lower()
+        ).observe(elapsed)
+        result.update({"cached": cached, "elapsed_seconds": elapsed})
+        return result
+    
+    def _stamp(self) -> Optional[List[Any]]:
+        """
+        Identify the current state of the index.
+        
+        Returns:
+            Index timestamp plus size and modification time of the record
+            table, or None if no index exists
+        """
+        record_table = self.index_storage.get_record_table()
+        if record_table is None:
+            return None
+        try:
+            stat = self.index_storage.records_file.stat()
+        except OSError:
+            return None
+        return [record_table.indexed_at, stat.st_size, stat.st_mtime_ns]
+    
+    def _scan(self) -> _Directory:
+        """
+        Read the index once and build the directory tree.
+        
+        Returns:
+            Root directory with totals and hashes computed
+        """
+        root = _Directory("", ".", 0)
+        directories = {"": root}
+        record_table = self.index_storage.get_record_table()
+        records = record_table.iter_records() if record_table is not None else ()
+        for position, record in enumerate(records):
+            if record.get("private") or record.get("is_directory"):
+                continue
+            parent_path, _, name = record["path"].rpartition(os.sep)
+            directory = directories.get(parent_path)
+            if directory is None:
+                directory = self._directory(directories, parent_path)
+            directory.add(position, name, record, self.listing_limit)
+        
+        # Deepest first, so children are finished before their parents
+        for directory in sorted(directories.values(), key=lambda d: d.depth, reverse=True):
+            directory.finish()
+        return root
+    
+    def _directory(self, directories: Dict[str, _Directory], path: str) -> _Directory:
+        """Create a directory of the tree, and its missing parents."""
+        parent_path, _, name = path.rpartition(os.sep)
+        parent = directories.get(parent_path)
+        if parent is None:
+            parent = self._directory(directories, parent_path)
+        directory = _Directory(path, name, parent.depth + 1)
+        parent.children.append(directory)
+        directories[path] = directory
+        return directory
+    
+    def _tree_rows(self, root: _Directory) -> List[List[Any]]:
+        """Flatten the tree for the cache, parents before their children."""
+        rows = []
+        queue = [root]
+        for directory in queue:
+            rows.append([
+                directory.path, directory.files, directory.total_files,
+                directory.total_dirs, directory.key, directory.hash
+            ])
+            queue.extend(directory.children)
+        return rows
+    
+    def _load_tree(self, rows: List[List[Any]]) -> _Directory:
+        """
+        Rebuild the tree from cached rows (counts and hashes only).
+        
+        Args:
+            rows: Rows written by _tree_rows
+        
+        Returns:
+            Root directory
+        """
+        directories: Dict[str, _Directory] = {}
+        for path, files, total_files, total_dirs, key, subtree_hash in rows:
+            if path:
+                parent_path, _, name = path.rpartition(os.sep)
+                parent = directories[parent_path]
+                directory = _Directory(path, name, parent.depth + 1)
+                parent.children.append(directory)
+            else:
+                directory = _Directory("", ".", 0)
+            directory.files = files
+            directory.total_files = total_files
+            directory.total_dirs = total_dirs
+            directory.key = key
+            directory.hash = subtree_hash
+            directories[path] = directory
+        return directories[""]
+    
+    def _allocate(self, root: _Directory, texts: Dict[str, str], scanned: bool) -> Dict[str, Any]:
+        """
+        Choose which directories to expand and render the payload.
+        
+        Directories are considered level by level, larger subtrees first,
+        and expanded while the estimated payload stays within the budget.
+        
+        Args:
+            root: Root of the directory tree
+            texts: Cached texts by key
+            scanned: Whether the tree was read from the index (texts missing
+                from the cache can be rendered)
+        
+        Returns:
+            Payload dictionary (see build)
+        
+        Raises:
+            _CacheMiss: If a text is missing and the tree was not scanned
+            LLMError: If not even a summary of the whole index fits the budget
+        """
+        def text(kind: str, key: str, directory: _Directory) -> str:
+            cache_key = f"{self.mode}:{kind}:{key}"
+            value = self._used.get(cache_key)
+            if value is None:
+                value = texts.get(cache_key)
+                if value is None:
+                    if not scanned:
+                        raise _CacheMiss(cache_key)
+                    value = self._render(kind, directory)
+                    self._rendered += 1
+                self._used[cache_key] = value
+            return value
+        
+        def collapsed(directory: _Directory) -> str:
+            return f"{_INDENT * directory.depth}{directory.name}/ {text('s', directory.hash, directory)}"
+        
+        header = self._header(root)
+        lines = {root: collapsed(root)}
+        total = estimate_tokens(header) + estimate_tokens(lines[root])
+        if total > self.token_budget:
+            raise LLMError(f"Token budget {self.token_budget} is too small for a summary of the index ({total} tokens)")
+        
+        expanded: Dict[_Directory, List[str]] = {}
+        order = itertools.count()
+        heap = [(root.depth, -root.total_files, next(order), root)]
+        while heap:
+            directory = heapq.heappop(heap)[3]
+            if not directory.children and directory.files > self.listing_limit:
+                continue  # Expanding would repeat the summary
+            
+            block = [f"{_INDENT * directory.depth}{directory.name}/"]
+            if directory.files:
+                own = self._own(directory, text)
+                indent = _INDENT * (directory.depth + 1)
+                block.append(indent + own.replace("\n", "\n" + indent))
+            child_lines = [collapsed(child) for child in directory.children]
+            delta = sum(estimate_tokens(line) for line in block + child_lines) - estimate_tokens(lines[directory])
+            if total + delta > self.token_budget:
+                continue
+            
+            total += delta
+            expanded[directory] = block
+            for child, line in zip(directory.children, child_lines):
+                lines[child] = line
+                heapq.heappush(heap, (child.depth, -child.total_files, next(order), child))
+        
+        output = [header]
+        summarized = 0
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            block = expanded.get(directory)
+            if block is None:
+                output.append(lines[directory])
+                summarized += 1
+            else:
+                output.extend(block)
+                stack.extend(reversed(directory.children))
+        payload = "\n".join(output)
+        
+        return {
+            "text": payload,
+            "tokens": estimate_tokens(payload),
+            "token_budget": self.token_budget,
+            "mode": self.mode,
+            "files": root.total_files,
+            "directories": root.total_dirs + 1,
+            "listed_directories": len(expanded),
+            "summarized_directories": summarized
+        }
+    
+    def _own(self, directory: _Directory, text: Callable[[str, str, _Directory], str]) -> str:
+        """Listing of the own files of a directory, or their summary if there are too many."""
+        if directory.files <= self.listing_limit:
+            return text("l", directory.key, directory)
+        return text("o", directory.key, directory)
+    
+    def _header(self, root: _Directory) -> str:
+        """First lines of the payload, explaining its format."""
+        return (
+            f"# {root.total_files} files in {root.total_dirs + 1} directories. "
+            f"One line per directory, indented by depth; files are listed below their directory.\n"
+            f"# \"name/ [...]\" summarizes a directory with everything below it: files, "
+            f"subdirectories, types and name patterns (# stands for digits). {_HEADERS[self.mode]}"
+        )
+    
+    def _render(self, kind: str, directory: _Directory) -> str:
+        """
+        Render a summary or listing of a scanned directory.
+        
+        Args:
+            kind: "s" (summary of the subtree), "o" (summary of the own
+                files) or "l" (listing of the own files)
+            directory: Directory to describe
+        
+        Returns:
+            Rendered text
+        """
+        if kind == "s":
+            return self._describe(
+                directory.total_files, directory.total_dirs, directory.total_bytes,
+                directory.total_oldest, directory.total_newest,
+                directory.total_types, directory.total_patterns
+            )
+        if kind == "o":
+            return self._describe(
+                directory.files, 0, directory.bytes, directory.oldest, directory.newest,
+                directory.types, directory.patterns
+            )
+        return self._listing(directory)
+    
+    def _describe(
+        self,
+        files: int,
+        dirs: int,
+        size: int,
+        oldest: str,
+        newest: str,
+        types: Dict[str, int],
+        patterns: Dict[str, int]
+    ) -> str:
+        """Summarize files by count, types and name patterns."""
+        parts = [f"{files} files" + (f" in {dirs} dirs" if dirs else "")]
+        if self.mode != "structure":
+            parts.append(_format_size(size))
+            if oldest:
+                parts.append(f"{oldest[:10]}..{newest[:10]}")
+        
+        shown = _top(types, TOP_TYPES)
+        type_text = ", ".join(f"{extension or 'no ext'} {count}" for extension, count in shown)
+        rest = files - sum(count for _, count in shown)
+        if rest > 0:
+            type_text += f", other {rest}"
+        if type_text:
+            parts.append(type_text)
+        
+        repeated = [(pattern, count) for pattern, count in _top(patterns, TOP_PATTERNS) if count > 1]
+        if repeated:
+            parts.append("names " + ", ".join(f"{pattern} x{count}" for pattern, count in repeated))
+        return "[" + "; ".join(parts) + "]"
+    
+    def _listing(self, directory: _Directory) -> str:
+        """List the own files of a directory, one per line."""
+        record_table = self.index_storage.get_record_table()
+        records = []
+        for position in directory.positions or ():
+            records.extend(record_table.get(position, 1))
+        records.sort(key=lambda record: record["name"])
+        
+        lines = []
+        for record in records:
+            line = record["name"]
+            if self.mode != "structure":
+                line += f" {_format_size(record.get('size') or 0)} {(record.get('modified') or '')[:10]}"
+                tags = [
+                    f"{key}={str(value)[:40]}"
+                    for key, value in (record.get("metadata") or {}).items()
+                    if isinstance(value, (str, int, float)) and not isinstance(value, bool)
+                ]
+                if tags:
+                    line += " " + " ".join(tags[:MAX_TAGS])
+            lines.append(line)
+            
+            if self.mode == "previews":
+                preview = self.index_storage.load_preview(record)
+                if preview:
+                    lines.append("> " + " ".join(preview.split())[:PREVIEW_CHARS])
+        return "\n".join(lines)
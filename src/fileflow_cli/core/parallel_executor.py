@@ -1,24 +1,42 @@
 """Parallel processing executor for FileFlowCLI."""
 
 import threading
+import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Callable, Any, Optional, Iterator, Dict
 from queue import Queue
 
+from .run_control import OperationCancelled, RunControl
+from ..utils.metrics import get_metrics
+
 
 class ParallelExecutor:
     """Dynamic parallel processing system for FileFlowCLI."""
     
-    def __init__(self, max_workers: int = 4):
+    def __init__(self, max_workers: int = 4, control: Optional[RunControl] = None):
         """
         Initialize parallel executor.
         
         Args:
             max_workers: Maximum number of worker threads (default: 4)
+            control: Pause/cancel token checked before each task (optional)
         """
         self.max_workers = max_workers
+        self.control = control
         self._lock = threading.Lock()
         self._progress = {"completed": 0, "total": 0, "errors": 0}
+        
+        metrics = get_metrics()
+        self._completed_metric = metrics.counter(
+            "fileflow_executor_tasks_total", "Tasks run by the parallel executor", result="ok"
+        )
+        self._failed_metric = metrics.counter(
+            "fileflow_executor_tasks_total", "Tasks run by the parallel executor", result="error"
+        )
+        self._batch_metric = metrics.histogram(
+            "fileflow_executor_batch_seconds", "Wall time per parallel batch"
+        )
+        metrics.gauge("fileflow_executor_workers", "Worker threads per executor").set(max_workers)
     
     def execute_parallel(
         self,
@@ -34,16 +52,28 @@ class ParallelExecutor:
             callback: Optional callback function(completed_count, result)
             error_handler: Optional error handler function(exception, task_index)
         
+        With a control token, a paused executor starts no new tasks until
+        resumed, and after cancel() the remaining tasks are skipped; their
+        results stay None.
+        
         Returns:
             List of results in order of task submission
         """
         self._progress = {"completed": 0, "total": len(tasks), "errors": 0}
         results = [None] * len(tasks)
+        started = time.perf_counter()
+        control = self.control
+        
+        def run(task: Callable) -> Any:
+            # Workers block here while paused and skip tasks once cancelled
+            if control is not None:
+                control.check()
+            return task()
         
         with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
             # Submit all tasks
             future_to_index = {
-                executor.submit(task): idx
+                executor.submit(run, task): idx
                 for idx, task in enumerate(tasks)
             }
             
@@ -56,19 +86,25 @@ class ParallelExecutor:
                     
                     with self._lock:
                         self._progress["completed"] += 1
+                    self._completed_metric.inc()
                     
                     if callback:
                         callback(self._progress["completed"], result)
                 
+                except OperationCancelled:
+                    continue
+                
                 except Exception as e:
                     with self._lock:
                         self._progress["errors"] += 1
+                    self._failed_metric.inc()
                     
                     if error_handler:
                         error_handler(e, idx)
                     else:
                         print(f"Error in task {idx}: {e}")
         
+        self._batch_metric.observe(time.perf_counter() - started)
         return results
     
     def execute_batch_parallel(
@@ -0,0 +1,218 @@
+"""Live indexing throughput and stage timing for FileFlowCLI."""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, Optional
+
+from ..utils.metrics import MetricsRegistry
+
+
+class ProgressTracker:
+    """
+    Thread-safe counters for one indexing run.
+    
+    Worker threads report file starts, finishes and stage times; readers
+    (the indexer's progress events, the UI) take snapshots with smoothed
+    rates and an ETA at any moment.
+    """
+    
+    # Stages timed during indexing. Worker stages (stat, hash, analyze)
+    # are summed over all threads, so they can exceed wall-clock time.
+    STAGES = ("scan", "stat", "hash", "analyze", "checkpoint")
+    
+    def __init__(
+        self,
+        smoothing: float = 0.3,
+        min_interval: float = 0.5,
+        metrics: Optional[MetricsRegistry] = None
+    ):
+        """
+        Initialize progress tracker.
+        
+        Args:
+            smoothing: EWMA weight of the newest rate sample (default: 0.3)
+            min_interval: Minimum seconds between rate samples (default: 0.5)
+            metrics: Registry that also receives every update (optional)
+        """
+        self.smoothing = smoothing
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        
+        metrics = metrics or MetricsRegistry(enabled=False)
+        self._files_metric = metrics.counter(
+            "fileflow_indexer_files_total", "Files processed by the indexer", result="ok"
+        )
+        self._failed_metric = metrics.counter(
+            "fileflow_indexer_files_total", "Files processed by the indexer", result="error"
+        )
+        self._errors_metric = metrics.counter(
+            "fileflow_indexer_errors_total", "Errors while scanning or processing files"
+        )
+        self._bytes_metric = metrics.counter(
+            "fileflow_indexer_bytes_total", "Bytes of files processed by the indexer"
+        )
+        self._in_flight_metric = metrics.gauge(
+            "fileflow_indexer_files_in_flight", "Files currently being processed"
+        )
+        self._stage_metrics = {
+            stage: metrics.histogram(
+                "fileflow_indexer_stage_seconds", "Time spent per indexing stage", stage=stage
+            )
+            for stage in self.STAGES
+        }
+        
+        self.reset()
+    
+    def reset(self, total_files: int = 0) -> None:
+        """
+        Start a new run.
+        
+        Args:
+            total_files: Number of files the run will process
+        """
+        now = time.monotonic()
+        with self._lock:
+            self.total_files = total_files
+            self.files_done = 0
+            self.bytes_done = 0
+            self.errors = 0
+            self.in_flight = 0
+            self.stage_times = {stage: 0.0 for stage in self.STAGES}
+            self._started = now
+            self._sample_time = now
+            self._sample_files = 0
+            self._sample_bytes = 0
+            self._files_rate: Optional[float] = None
+            self._bytes_rate: Optional[float] = None
+    
+    def set_total(self, total_files: int) -> None:
+        """
+        Set the number of files the run will process.
+        
+        Called once scanning is done; rate sampling starts here so the
+        scan does not drag down the first rate sample.
+        
+        Args:
+            total_files: Total file count
+        """
+        with self._lock:
+            self.total_files = total_files
+            self._sample_time = time.monotonic()
+            self._sample_files = self.files_done
+            self._sample_bytes = self.bytes_done
+    
+    def start_file(self) -> None:
+        """Record that a worker started on a file."""
+        with self._lock:
+            self.in_flight += 1
+        self._in_flight_metric.inc()
+    
+    def finish_file(self, size: int = 0, error: bool = False) -> None:
+        """
+        Record that a worker finished a file.
+        
+        Args:
+            size: File size in bytes
+            error: True if the file could not be processed
+        """
+        with self._lock:
+            self.in_flight -= 1
+            self.files_done += 1
+            self.bytes_done += size
+            if error:
+                self.errors += 1
+        
+        self._in_flight_metric.dec()
+        self._bytes_metric.inc(size)
+        if error:
+            self._failed_metric.inc()
+            self._errors_metric.inc()
+        else:
+            self._files_metric.inc()
+    
+    def abandon_file(self) -> None:
+        """Record that a worker stopped on a file without finishing it (cancelled)."""
+        with self._lock:
+            self.in_flight -= 1
+        self._in_flight_metric.dec()
+    
+    def add_error(self) -> None:
+        """Record an error outside file processing (e.g. an unreadable directory)."""
+        with self._lock:
+            self.errors += 1
+        self._errors_metric.inc()
+    
+    def add_time(self, stage: str, seconds: float) -> None:
+        """
+        Add time spent in a stage.
+        
+        Args:
+            stage: Stage name
+            seconds: Elapsed seconds
+        """
+        with self._lock:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + seconds
+        
+        histogram = self._stage_metrics.get(stage)
+        if histogram is not None:
+            histogram.observe(seconds)
+    
+    @contextmanager
+    def stage(self, stage: str) -> Iterator[None]:
+        """
+        Time a block of code as a stage.
+        
+        Args:
+            stage: Stage name
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(stage, time.perf_counter() - started)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get current throughput, ETA and stage times.
+        
+        Rates are exponentially weighted moving averages over samples at
+        least min_interval apart, so the ETA does not jump with every batch.
+        
+        Returns:
+            Dictionary with files_per_second, bytes_per_second, eta_seconds
+            (None until a rate is known), in_flight, error_count,
+            elapsed_seconds and stage_times
+        """
+        now = time.monotonic()
+        with self._lock:
+            interval = now - self._sample_time
+            if interval >= self.min_interval:
+                files_rate = (self.files_done - self._sample_files) / interval
+                bytes_rate = (self.bytes_done - self._sample_bytes) / interval
+                if self._files_rate is None:
+                    self._files_rate, self._bytes_rate = files_rate, bytes_rate
+                else:
+                    weight = self.smoothing
+                    self._files_rate = weight * files_rate + (1 - weight) * self._files_rate
+                    self._bytes_rate = weight * bytes_rate + (1 - weight) * self._bytes_rate
+                self._sample_time = now
+                self._sample_files = self.files_done
+                self._sample_bytes = self.bytes_done
+            
+            remaining = max(0, self.total_files - self.files_done)
+            eta = None
+            if self._files_rate:
+                eta = remaining / self._files_rate
+            elif remaining == 0 and self.total_files:
+                eta = 0.0
+            
+            return {
+                "files_per_second": self._files_rate or 0.0,
+                "bytes_per_second": self._bytes_rate or 0.0,
+                "eta_seconds": eta,
+                "in_flight": self.in_flight,
+                "error_count": self.errors,
+                "elapsed_seconds": now - self._started,
+                "stage_times": dict(self.stage_times)
+            }
@@ -0,0 +1,75 @@
+"""Pause, resume and cancel tokens for long-running work."""
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Raised inside work whose RunControl was cancelled."""
+    pass
+
+
+class RunControl:
+    """
+    Pause/resume/cancel token shared by a run and all of its workers.
+    
+    The controlling thread calls pause(), resume() and cancel(); workers
+    call check() (or wait()) before each task and between chunks of long
+    reads. A paused worker blocks on an event, so pausing costs no CPU,
+    and cancel() wakes paused workers so they can stop at once.
+    """
+    
+    def __init__(self):
+        """Initialize a running (not paused, not cancelled) token."""
+        self._resumed = threading.Event()
+        self._resumed.set()
+        self._cancelled = threading.Event()
+        self._lock = threading.Lock()
+    
+    def pause(self) -> None:
+        """Make workers block at their next check."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._resumed.clear()
+    
+    def resume(self) -> None:
+        """Let paused workers continue."""
+        with self._lock:
+            self._resumed.set()
+    
+    def cancel(self) -> None:
+        """Make workers stop at their next check (also wakes paused workers)."""
+        with self._lock:
+            self._cancelled.set()
+            self._resumed.set()
+    
+    @property
+    def is_paused(self) -> bool:
+        """True while paused."""
+        return not self._resumed.is_set()
+    
+    @property
+    def is_cancelled(self) -> bool:
+        """True once cancelled."""
+        return self._cancelled.is_set()
+    
+    def wait(self) -> bool:
+        """
+        Block while paused.
+        
+        Returns:
+            False if the run was cancelled, True if work may continue
+        """
+        self._resumed.wait()
+        return not self._cancelled.is_set()
+    
+    def check(self) -> None:
+        """
+        Block while paused; raise if cancelled.
+        
+        Raises:
+            OperationCancelled: If the run was cancelled
+        """
+        if not self._resumed.is_set():
+            self._resumed.wait()
+        if self._cancelled.is_set():
+            raise OperationCancelled()
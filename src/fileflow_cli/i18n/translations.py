@@ -17,8 +17,8 @@ class TranslationManager:
             language: Language code (default: "en")
         """
         self.language = language
-        self.translations: Dict[str, Any] = {}
-        self._load_translations()
+        # Loaded on first lookup, so startup does not read the JSON file
+        self.translations: Optional[Dict[str, Any]] = None
     
     def _load_translations(self) -> None:
         """Load translations from JSON file."""
@@ -49,6 +49,9 @@ class TranslationManager:
         Returns:
             Translated string with formatted arguments
         """
+        if self.translations is None:
+            self._load_translations()
+        
         keys = key.split(".")
         value = self.translations
         
@@ -72,7 +75,7 @@ class TranslationManager:
             language: Language code (e.g., "en", "lv", "ru")
         """
         self.language = language
-        self._load_translations()
+        self.translations = None
 
 
 # Global translation manager instance
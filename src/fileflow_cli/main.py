@@ -8,15 +8,52 @@ if __name__ == "__main__":
     src_path = Path(__file__).parent.parent.parent
     sys.path.insert(0, str(src_path))
 
-from fileflow_cli.tui.app import FileFlowCLIApp
-
-
-def main():
+import argparse
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    """
+    Parse command line arguments of the TUI.
+    
+    Args:
+        argv: Argument list (default: sys.argv[1:])
+    
+    Returns:
+        Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        prog="fileflow-cli",
+        epilog="Headless commands: fileflow-cli {index,resume,status} PATH (see fileflow-cli index --help)"
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="sampling",
+        choices=("sampling", "cprofile"),
+        help="Profile indexing runs and write a report to .fileflow_cli/profiles/ "
+             "(sampling by default, or cprofile)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
     """Main entry point for the FileFlowCLI application."""
-    app = FileFlowCLIApp()
+    if argv is None:
+        argv = sys.argv[1:]
+    
+    # Headless commands never import the TUI (or Textual)
+    from fileflow_cli.cli import COMMANDS
+    if argv and argv[0] in COMMANDS:
+        from fileflow_cli.cli import run
+        sys.exit(run(argv))
+    
+    args = parse_args(argv)
+    
+    from fileflow_cli.tui.app import FileFlowCLIApp
+    
+    app = FileFlowCLIApp(profile=args.profile)
     app.run()
 
 
 if __name__ == "__main__":
     main()
-
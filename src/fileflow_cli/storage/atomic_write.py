@@ -0,0 +1,111 @@
+"""Atomic file publishing for FileFlowCLI storage."""
+
+import os
+import threading
+from pathlib import Path
+from typing import Union
+
+
+# How hard write_atomic() works to keep a written file across power loss:
+# - "none": atomic against process crashes only (the OS writes it later)
+# - "fsync-file": the content is on disk before it is renamed into place
+# - "fsync-dir": the rename is on disk too (fsync of the directory)
+DURABILITY_LEVELS = ("none", "fsync-file", "fsync-dir")
+
+
+def temp_path_for(file_path: Path) -> Path:
+    """
+    Get a temporary path to write a file before publishing it.
+    
+    The path is next to the target (same filesystem, so the final rename
+    is atomic) and unique per process and thread, so concurrent writers
+    never write into each other's temporary files.
+    
+    Args:
+        file_path: Final path of the file
+    
+    Returns:
+        Temporary file path
+    """
+    file_path = Path(file_path)
+    return file_path.with_name(f"{file_path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+
+
+def publish(temp_path: Path, file_path: Path) -> None:
+    """
+    Atomically replace a file with a completely written temporary file.
+    
+    Readers that opened the old file keep reading it; new readers see
+    the new file. There is never a half-written file at file_path.
+    
+    Args:
+        temp_path: Written temporary file (from temp_path_for)
+        file_path: Final path of the file
+    """
+    os.replace(temp_path, file_path)
+
+
+def discard(temp_path: Path) -> None:
+    """
+    Remove the temporary file of a failed write, if it was created.
+    
+    Args:
+        temp_path: Temporary file (from temp_path_for)
+    """
+    try:
+        temp_path.unlink()
+    except OSError:
+        pass
+
+
+def fsync_directory(directory: Path) -> None:
+    """
+    Flush a directory entry (e.g. a rename into it) to disk.
+    
+    Does nothing on platforms that cannot open directories (Windows).
+    
+    Args:
+        directory: Directory to flush
+    """
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except (PermissionError, IsADirectoryError):
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # Some filesystems do not support fsync on directories
+    finally:
+        os.close(fd)
+
+
+def write_atomic(file_path: Path, data: Union[bytes, str], durability: str = "none") -> None:
+    """
+    Write a whole file through a temporary file and publish it.
+    
+    Args:
+        file_path: Final path of the file
+        data: File content (str is written as UTF-8)
+        durability: One of DURABILITY_LEVELS
+    
+    Raises:
+        OSError: If the file could not be written (the old file is kept)
+    """
+    file_path = Path(file_path)
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    
+    temp_path = temp_path_for(file_path)
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+            if durability != "none":
+                f.flush()
+                os.fsync(f.fileno())
+        publish(temp_path, file_path)
+    except OSError:
+        discard(temp_path)
+        raise
+    
+    if durability == "fsync-dir":
+        fsync_directory(file_path.parent)
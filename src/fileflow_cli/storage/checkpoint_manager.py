@@ -2,26 +2,120 @@
 
 import json
 import hashlib
+import os
+import threading
+import uuid
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
 
+from ..utils.metrics import get_metrics
+from .atomic_write import DURABILITY_LEVELS, write_atomic
+
 
 class CheckpointManager:
-    """Manages checkpoints for indexing operations."""
+    """
+    Manages checkpoints for indexing operations.
+    
+    A checkpoint is a small header (index_checkpoint.json) and a segments
+    file of one JSON line per saved batch with the paths and hashes it
+    added. Each segment carries a chained hash, sha256(previous chain +
+    segment), and the header records the segment count, byte length and
+    last chain hash, and has a hash of its own. Saving appends only the
+    new segment and then replaces the header atomically, so a crash
+    during a save leaves the previous checkpoint: bytes past the recorded
+    length are ignored. Status reads validate the header only.
+    
+    queue_checkpoint() hands the write to a background thread, so the
+    indexing path never waits for the disk. Checkpoints queued while a
+    write runs are coalesced into one segment.
+    """
     
-    CHECKPOINT_VERSION = "1.0"
+    CHECKPOINT_VERSION = "2.0"
+    # Single-file checkpoints written by earlier versions (still loaded)
+    LEGACY_CHECKPOINT_VERSION = "1.0"
     CHECKPOINT_FILENAME = "index_checkpoint.json"
+    SEGMENTS_GLOB = "index_checkpoint.*.segments"
     
-    def __init__(self, config_dir: Path):
+    # Header fields copied from the progress data, with their defaults
+    HEADER_FIELDS = {
+        "total_files": 0,
+        "processed_files": 0,
+        "current_batch": 0,
+        "total_batches": 0,
+        "status": "in_progress"
+    }
+    
+    def __init__(self, config_dir: Path, durability: str = "fsync-file"):
         """
         Initialize checkpoint manager.
         
         Args:
             config_dir: Path to .fileflow_cli directory
+            durability: How checkpoint writes are flushed to disk, one of
+                "none", "fsync-file" or "fsync-dir"
         """
         self.config_dir = Path(config_dir)
         self.checkpoint_file = self.config_dir / self.CHECKPOINT_FILENAME
+        self.durability = durability if durability in DURABILITY_LEVELS else "fsync-file"
+        
+        # Background writer state, guarded by _condition
+        self._condition = threading.Condition()
+        self._pending: Optional[Dict[str, Any]] = None
+        self._writing = False
+        self._writer: Optional[threading.Thread] = None
+        self._last_write_ok = True
+        
+        # Segments of the run being saved: paths handed to the writer so
+        # far, and the segments file with its verified (count, bytes,
+        # chain). Segments inside the verified prefix are not hashed again.
+        self._queued_paths = 0
+        self._segments_name: Optional[str] = None
+        self._verified: Tuple[int, int, str] = (0, 0, "")
+        
+        metrics = get_metrics()
+        self._save_metric = metrics.histogram(
+            "fileflow_checkpoint_seconds", "Checkpoint save/load latency", operation="save"
+        )
+        self._load_metric = metrics.histogram(
+            "fileflow_checkpoint_seconds", "Checkpoint save/load latency", operation="load"
+        )
+        self._coalesced_metric = metrics.counter(
+            "fileflow_checkpoints_coalesced_total", "Queued checkpoints replaced by a newer one before being written"
+        )
+    
+    def begin(self, checkpoint: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Start saving checkpoints of a run.
+        
+        Args:
+            checkpoint: Checkpoint the run resumes from (from
+                load_checkpoint); its segments are continued. Without one
+                the run starts a new segments file, and the previous
+                checkpoint stays until the first save replaces it.
+        """
+        self.flush()
+        with self._condition:
+            self._queued_paths = 0
+            self._segments_name = None
+            self._verified = (0, 0, "")
+            
+            segments = (checkpoint or {}).get("segments")
+            if not segments:
+                # New run, or a legacy checkpoint: its paths go into the
+                # first segment
+                return
+            
+            try:
+                # Drop a segment appended after the header was last saved
+                os.truncate(self.config_dir / segments["file"], segments["bytes"])
+            except (OSError, KeyError, TypeError) as e:
+                print(f"Error reopening checkpoint segments: {e}")
+                return
+            
+            self._queued_paths = len(checkpoint.get("processed_paths", []))
+            self._segments_name = segments["file"]
+            self._verified = (segments["count"], segments["bytes"], segments["chain"])
     
     def save_checkpoint(
         self,
@@ -29,7 +123,7 @@ class CheckpointManager:
         validate: bool = True
     ) -> bool:
         """
-        Save checkpoint to disk.
+        Save checkpoint to disk and wait for the write.
         
         Args:
             progress_data: Progress data dictionary
@@ -38,36 +132,149 @@ class CheckpointManager:
         Returns:
             True if saved successfully, False otherwise
         """
-        try:
-            # Ensure config directory exists
-            self.config_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Prepare checkpoint data
-            checkpoint = {
-                "checkpoint_version": self.CHECKPOINT_VERSION,
-                "started_at": progress_data.get("started_at", datetime.now().isoformat()),
-                "last_updated": datetime.now().isoformat(),
-                "total_files": progress_data.get("total_files", 0),
-                "processed_files": progress_data.get("processed_files", 0),
-                "processed_paths": progress_data.get("processed_paths", []),
-                "file_hashes": progress_data.get("file_hashes", {}),
-                "current_batch": progress_data.get("current_batch", 0),
-                "total_batches": progress_data.get("total_batches", 0),
-                "status": progress_data.get("status", "in_progress")
+        self.queue_checkpoint(progress_data)
+        self.flush()
+        return self._last_write_ok
+    
+    def queue_checkpoint(self, progress_data: Dict[str, Any]) -> None:
+        """
+        Save checkpoint to disk in the background.
+        
+        processed_paths must only grow during a run: the paths added since
+        the last queued checkpoint (and their file_hashes) are copied into
+        a new segment, so the caller may keep changing both. Call flush()
+        to wait for the write.
+        
+        Args:
+            progress_data: Progress data dictionary
+        """
+        processed_paths = progress_data.get("processed_paths", [])
+        file_hashes = progress_data.get("file_hashes", {})
+        
+        with self._condition:
+            new_paths = processed_paths[self._queued_paths:]
+            self._queued_paths = len(processed_paths)
+            header = {
+                field: progress_data.get(field, default)
+                for field, default in self.HEADER_FIELDS.items()
             }
+            header["started_at"] = progress_data.get("started_at", datetime.now().isoformat())
             
-            # Calculate integrity hash
-            checkpoint["integrity_hash"] = self._calculate_integrity_hash(checkpoint)
+            if self._pending is not None:
+                # Not written yet: merge into one segment
+                self._coalesced_metric.inc()
+                self._pending["header"] = header
+                self._pending["paths"].extend(new_paths)
+                self._pending["hashes"].extend(file_hashes.get(path) for path in new_paths)
+            else:
+                self._pending = {
+                    "header": header,
+                    "paths": new_paths,
+                    "hashes": [file_hashes.get(path) for path in new_paths]
+                }
             
-            # Save to file
-            with open(self.checkpoint_file, "w", encoding="utf-8") as f:
-                json.dump(checkpoint, f, indent=2, ensure_ascii=False)
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._write_loop, name="checkpoint-writer", daemon=True)
+                self._writer.start()
+            self._condition.notify_all()
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until queued checkpoints are written.
+        
+        Args:
+            timeout: Maximum seconds to wait (default: no limit)
+        
+        Returns:
+            True if nothing is left to write, False on timeout
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: self._pending is None and not self._writing, timeout
+            )
+    
+    def _write_loop(self) -> None:
+        """Write queued checkpoints until none is left (writer thread)."""
+        while True:
+            with self._condition:
+                pending = self._pending
+                if pending is None:
+                    self._writer = None
+                    self._condition.notify_all()
+                    return
+                self._pending = None
+                self._writing = True
             
-            return True
+            try:
+                self._last_write_ok = self._write(pending)
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+    
+    def _write(self, pending: Dict[str, Any]) -> bool:
+        """
+        Append a segment and publish the header that includes it.
         
-        except (IOError, json.JSONEncodeError) as e:
-            print(f"Error saving checkpoint: {e}")
-            return False
+        Args:
+            pending: Header fields and the paths and hashes of the segment
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        with self._save_metric.time():
+            try:
+                # Ensure config directory exists
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                
+                if self._segments_name is None:
+                    self._segments_name = f"index_checkpoint.{uuid.uuid4().hex[:12]}.segments"
+                count, size, chain = self._verified
+                
+                segment = {
+                    "batch": pending["header"]["current_batch"],
+                    "paths": pending["paths"],
+                    "hashes": pending["hashes"]
+                }
+                payload = self._segment_payload(segment)
+                chain = self._chain_hash(chain, payload)
+                line = payload[:-1] + b',"chain":"' + chain.encode("ascii") + b'"}\n'
+                
+                with open(self.config_dir / self._segments_name, "ab") as f:
+                    # Drop the rest of a failed earlier append
+                    f.truncate(size)
+                    f.write(line)
+                    if self.durability != "none":
+                        f.flush()
+                        os.fsync(f.fileno())
+                
+                self._verified = (count + 1, size + len(line), chain)
+                header = {
+                    "checkpoint_version": self.CHECKPOINT_VERSION,
+                    **pending["header"],
+                    "last_updated": datetime.now().isoformat(),
+                    "segments": {
+                        "file": self._segments_name,
+                        "count": count + 1,
+                        "bytes": size + len(line),
+                        "chain": chain
+                    }
+                }
+                header["integrity_hash"] = self._calculate_integrity_hash(header)
+                write_atomic(
+                    self.checkpoint_file,
+                    json.dumps(header, ensure_ascii=False, indent=2),
+                    self.durability
+                )
+                
+                if count == 0:
+                    # The previous run's segments are no longer referenced
+                    self._remove_segments(keep=self._segments_name)
+                return True
+            
+            except (OSError, TypeError, ValueError) as e:
+                print(f"Error saving checkpoint: {e}")
+                return False
     
     def load_checkpoint(self, validate: bool = True) -> Optional[Dict[str, Any]]:
         """
@@ -77,7 +284,43 @@ class CheckpointManager:
             validate: Whether to validate checkpoint integrity
         
         Returns:
-            Checkpoint data dictionary or None if not found/invalid
+            Checkpoint data dictionary (the header with processed_paths and
+            file_hashes) or None if not found/invalid
+        """
+        with self._load_metric.time():
+            checkpoint = self._load_header(validate)
+            if checkpoint is None:
+                return None
+            
+            if checkpoint.get("checkpoint_version") == self.LEGACY_CHECKPOINT_VERSION:
+                if validate and not self._validate_legacy_checkpoint(checkpoint):
+                    print("Warning: Checkpoint integrity validation failed")
+                    return None
+                return checkpoint
+            
+            try:
+                paths, hashes = self._read_segments(checkpoint["segments"], validate)
+            except (OSError, KeyError, TypeError, ValueError) as e:
+                print(f"Error loading checkpoint: {e}")
+                return None
+            
+            if validate and checkpoint.get("processed_files") != len(paths):
+                print(f"Warning: Processed files count mismatch: {checkpoint.get('processed_files')} != {len(paths)}")
+                return None
+            
+            checkpoint["processed_paths"] = paths
+            checkpoint["file_hashes"] = dict(zip(paths, hashes))
+            return checkpoint
+    
+    def _load_header(self, validate: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Load and validate the checkpoint header.
+        
+        Args:
+            validate: Whether to validate the header
+        
+        Returns:
+            Header dictionary or None if not found/invalid
         """
         if not self.checkpoint_file.exists():
             return None
@@ -85,33 +328,138 @@ class CheckpointManager:
         try:
             with open(self.checkpoint_file, "r", encoding="utf-8") as f:
                 checkpoint = json.load(f)
-            
-            # Validate checkpoint
-            if validate and not self._validate_checkpoint(checkpoint):
-                print("Warning: Checkpoint integrity validation failed")
-                return None
-            
-            return checkpoint
-        
         except (FileNotFoundError, json.JSONDecodeError) as e:
             print(f"Error loading checkpoint: {e}")
             return None
+        
+        if validate and not self._validate_checkpoint(checkpoint):
+            print("Warning: Checkpoint integrity validation failed")
+            return None
+        return checkpoint
+    
+    def _read_segments(self, segments: Dict[str, Any], validate: bool) -> Tuple[List[str], List[Optional[str]]]:
+        """
+        Read the segments a header refers to.
+        
+        Segments already verified by this manager are not hashed again.
+        
+        Args:
+            segments: "segments" entry of the header
+            validate: Whether to check the chained hashes
+        
+        Returns:
+            Tuple of (processed paths, their hashes)
+        
+        Raises:
+            ValueError: If a segment is corrupt or the chain does not match
+        """
+        name, count, size = segments["file"], segments["count"], segments["bytes"]
+        if name == self._segments_name:
+            verified_count, verified_bytes, verified_chain = self._verified
+        else:
+            verified_count, verified_bytes, verified_chain = 0, 0, ""
+        
+        paths: List[str] = []
+        hashes: List[Optional[str]] = []
+        chain, offset, index = "", 0, 0
+        with open(self.config_dir / name, "rb") as f:
+            # Bytes past the header's length were never committed
+            data = f.read(size)
+        if len(data) != size:
+            raise ValueError("checkpoint segments are truncated")
+        
+        for line in data.splitlines(keepends=True):
+            segment = json.loads(line)
+            stored_chain = segment.pop("chain")
+            offset += len(line)
+            index += 1
+            
+            if validate:
+                if index == verified_count and offset == verified_bytes:
+                    chain = verified_chain
+                elif index > verified_count:
+                    chain = self._chain_hash(chain, self._segment_payload(segment))
+                if index > verified_count and stored_chain != chain:
+                    raise ValueError(f"checkpoint segment {index} failed its integrity check")
+            
+            paths.extend(segment["paths"])
+            hashes.extend(segment["hashes"])
+        
+        if validate:
+            if index != count or chain != segments["chain"]:
+                raise ValueError("checkpoint segments do not match the header")
+            if name == self._segments_name:
+                self._verified = (count, size, chain)
+        return paths, hashes
+    
+    @staticmethod
+    def _segment_payload(segment: Dict[str, Any]) -> bytes:
+        """
+        Serialize a segment (without its chain hash) for hashing and writing.
+        
+        ASCII escapes keep the bytes identical after a load and re-dump,
+        whatever characters the paths contain.
+        
+        Args:
+            segment: Segment dictionary (batch, paths, hashes)
+        
+        Returns:
+            JSON bytes
+        """
+        return json.dumps(segment, separators=(",", ":")).encode("ascii")
+    
+    @staticmethod
+    def _chain_hash(previous: str, payload: bytes) -> str:
+        """
+        Calculate the chained hash of a segment.
+        
+        Args:
+            previous: Chain hash of the previous segment ("" for the first)
+            payload: Serialized segment
+        
+        Returns:
+            SHA256 hash string
+        """
+        return hashlib.sha256(previous.encode("ascii") + payload).hexdigest()
     
     def clear_checkpoint(self) -> bool:
         """
         Clear/delete checkpoint file.
         
+        Queued checkpoints are dropped and a running write is waited for,
+        so the checkpoint does not reappear after it is cleared.
+        
         Returns:
             True if deleted successfully, False otherwise
         """
+        with self._condition:
+            self._pending = None
+            self._condition.wait_for(lambda: not self._writing)
+            self._queued_paths = 0
+            self._segments_name = None
+            self._verified = (0, 0, "")
+        
         try:
+            # Header first: segments without a header are never read
             if self.checkpoint_file.exists():
                 self.checkpoint_file.unlink()
+            self._remove_segments()
             return True
         except IOError as e:
             print(f"Error clearing checkpoint: {e}")
             return False
     
+    def _remove_segments(self, keep: Optional[str] = None) -> None:
+        """
+        Delete segments files.
+        
+        Args:
+            keep: Name of a segments file to keep (optional)
+        """
+        for segments_file in self.config_dir.glob(self.SEGMENTS_GLOB):
+            if segments_file.name != keep:
+                segments_file.unlink()
+    
     def checkpoint_exists(self) -> bool:
         """
         Check if checkpoint file exists.
@@ -125,6 +473,9 @@ class CheckpointManager:
         """
         Calculate integrity hash for checkpoint.
         
+        For version 2.0 checkpoints this covers the header only; the
+        segments are covered by the chain hash stored in it.
+        
         Args:
             checkpoint: Checkpoint data dictionary
         
@@ -142,19 +493,55 @@ class CheckpointManager:
     
     def _validate_checkpoint(self, checkpoint: Dict[str, Any]) -> bool:
         """
-        Validate checkpoint integrity.
+        Validate a checkpoint header (constant time).
         
         Args:
-            checkpoint: Checkpoint data dictionary
+            checkpoint: Checkpoint header dictionary
         
         Returns:
             True if valid, False otherwise
         """
+        version = checkpoint.get("checkpoint_version")
+        if version == self.LEGACY_CHECKPOINT_VERSION:
+            # Validated with its data by _validate_legacy_checkpoint
+            return True
+        
         # Check version
-        if checkpoint.get("checkpoint_version") != self.CHECKPOINT_VERSION:
-            print(f"Warning: Checkpoint version mismatch: {checkpoint.get('checkpoint_version')}")
+        if version != self.CHECKPOINT_VERSION:
+            print(f"Warning: Checkpoint version mismatch: {version}")
             return False
         
+        # Check required fields
+        required_fields = [
+            "started_at", "total_files", "processed_files",
+            "current_batch", "status", "segments"
+        ]
+        
+        for field in required_fields:
+            if field not in checkpoint:
+                print(f"Warning: Missing required field in checkpoint: {field}")
+                return False
+        
+        # Validate integrity hash
+        stored_hash = checkpoint.get("integrity_hash")
+        if stored_hash:
+            calculated_hash = self._calculate_integrity_hash(checkpoint)
+            if stored_hash != calculated_hash:
+                print("Warning: Checkpoint integrity hash mismatch")
+                return False
+        
+        return True
+    
+    def _validate_legacy_checkpoint(self, checkpoint: Dict[str, Any]) -> bool:
+        """
+        Validate a single-file (version 1.0) checkpoint.
+        
+        Args:
+            checkpoint: Checkpoint data dictionary
+        
+        Returns:
+            True if valid, False otherwise
+        """
         # Check required fields
         required_fields = [
             "started_at", "total_files", "processed_files",
@@ -188,10 +575,14 @@ class CheckpointManager:
         """
         Get checkpoint progress information.
         
+        Reads and validates only the checkpoint header, so the cost does
+        not grow with the number of processed files (except for legacy
+        single-file checkpoints).
+        
         Returns:
             Dictionary with progress percentage and stats, or None if no checkpoint
         """
-        checkpoint = self.load_checkpoint()
+        checkpoint = self._load_header()
         if not checkpoint:
             return None
         
@@ -212,4 +603,3 @@ class CheckpointManager:
             "total_batches": checkpoint.get("total_batches", 0),
             "status": checkpoint.get("status", "unknown")
         }
-
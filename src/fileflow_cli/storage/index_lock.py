@@ -0,0 +1,255 @@
+"""Single-writer lock for the index of a directory."""
+
+import errno
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+from ..utils.error_handler import IndexLockedError
+
+
+# flock errors meaning the filesystem does not support it (e.g. some NFS mounts)
+_FLOCK_UNSUPPORTED = (errno.ENOLCK, errno.EOPNOTSUPP, errno.EINVAL)
+
+# An empty lock file younger than this may be a holder still writing its details
+EMPTY_LOCK_GRACE_SECONDS = 5.0
+
+
+class IndexLock:
+    """
+    Advisory lock that admits one writer (indexer, enrichment) per index.
+    
+    The lock is an flock() on .fileflow_cli/index_lock, so the kernel
+    releases it when the holding process exits or crashes and a stale
+    lock never blocks the next run. The file records who holds the lock
+    (pid, host, purpose) for error messages. Where flock is unavailable
+    the lock file is created exclusively instead, and a lock file left by
+    a process that no longer runs on this host is removed as stale.
+    
+    Readers never take the lock: writers publish complete files with
+    atomic renames, so the last complete index can always be read.
+    """
+    
+    LOCK_FILENAME = "index_lock"
+    
+    def __init__(self, config_dir: Path):
+        """
+        Initialize index lock.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+        """
+        self.config_dir = Path(config_dir)
+        self.lock_file = self.config_dir / self.LOCK_FILENAME
+        self._fd: Optional[int] = None
+        self._exclusive_file = False
+        self._lock = threading.Lock()
+    
+    def acquire(self, purpose: str = "index") -> bool:
+        """
+        Try to take the lock without waiting.
+        
+        Args:
+            purpose: What the holder is doing (shown to other processes)
+        
+        Returns:
+            True if the lock was taken, False if another writer holds it
+        """
+        with self._lock:
+            if self._fd is not None:
+                return True
+            
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            if fcntl is not None:
+                fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    os.close(fd)
+                    return False
+                except OSError as e:
+                    os.close(fd)
+                    if e.errno not in _FLOCK_UNSUPPORTED:
+                        raise
+                    return self._acquire_exclusive_file(purpose)
+                
+                self._fd = fd
+                self._write_holder(purpose)
+                return True
+            
+            return self._acquire_exclusive_file(purpose)
+    
+    def _acquire_exclusive_file(self, purpose: str) -> bool:
+        """
+        Take the lock by creating the lock file exclusively (no flock).
+        
+        Args:
+            purpose: What the holder is doing
+        
+        Returns:
+            True if the lock was taken
+        """
+        for _ in range(2):
+            try:
+                self._fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+            except FileExistsError:
+                if not self._is_stale(self._read_holder()):
+                    return False
+                # Left behind by a crashed run: remove it and try once more
+                try:
+                    self.lock_file.unlink()
+                except FileNotFoundError:
+                    pass
+                continue
+            
+            self._exclusive_file = True
+            self._write_holder(purpose)
+            return True
+        return False
+    
+    def release(self) -> None:
+        """Release the lock (no-op if not held)."""
+        with self._lock:
+            if self._fd is None:
+                return
+            
+            try:
+                if self._exclusive_file:
+                    self.lock_file.unlink()
+                else:
+                    # The file stays; an empty file means "not held"
+                    os.ftruncate(self._fd, 0)
+                    fcntl.flock(self._fd, fcntl.LOCK_UN)
+            except OSError as e:
+                print(f"Error releasing index lock: {e}")
+            finally:
+                os.close(self._fd)
+                self._fd = None
+                self._exclusive_file = False
+    
+    @property
+    def is_held(self) -> bool:
+        """True while this object holds the lock."""
+        return self._fd is not None
+    
+    def holder(self) -> Optional[Dict[str, Any]]:
+        """
+        Get who holds the lock.
+        
+        Returns:
+            Holder information (pid, host, purpose, since) or None if the
+            lock is free
+        """
+        if self._fd is not None:
+            return self._read_holder()
+        
+        if not self.lock_file.exists():
+            return None
+        
+        if fcntl is not None:
+            try:
+                fd = os.open(self.lock_file, os.O_RDONLY)
+            except FileNotFoundError:
+                return None
+            try:
+                fcntl.flock(fd, fcntl.LOCK_SH | fcntl.LOCK_NB)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            except BlockingIOError:
+                return self._read_holder() or {}
+            except OSError as e:
+                if e.errno not in _FLOCK_UNSUPPORTED:
+                    raise
+            else:
+                # Lockable, so nobody holds it (the file is left over)
+                return None
+            finally:
+                os.close(fd)
+        
+        info = self._read_holder()
+        return None if self._is_stale(info) else info
+    
+    def _write_holder(self, purpose: str) -> None:
+        """
+        Record this process as the holder in the lock file.
+        
+        Args:
+            purpose: What the holder is doing
+        """
+        info = json.dumps({
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "purpose": purpose,
+            "since": datetime.now().isoformat()
+        }).encode("utf-8")
+        os.ftruncate(self._fd, 0)
+        os.lseek(self._fd, 0, os.SEEK_SET)
+        os.write(self._fd, info)
+    
+    def _read_holder(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the holder information from the lock file.
+        
+        Returns:
+            Holder dictionary or None if the file is missing or empty
+        """
+        try:
+            with open(self.lock_file, "r", encoding="utf-8") as f:
+                content = f.read()
+            return json.loads(content) if content else None
+        except (IOError, ValueError):
+            return None
+    
+    def _is_stale(self, info: Optional[Dict[str, Any]]) -> bool:
+        """
+        Check whether a lock file was left behind by a process that is gone.
+        
+        Locks held from other hosts are never considered stale.
+        
+        Args:
+            info: Holder information from the lock file
+        
+        Returns:
+            True if the lock file can be removed
+        """
+        if not info or "pid" not in info:
+            # Empty: left over from flock mode, or a holder is still
+            # writing its details
+            try:
+                return time.time() - self.lock_file.stat().st_mtime > EMPTY_LOCK_GRACE_SECONDS
+            except FileNotFoundError:
+                return True
+        if info.get("host") != socket.gethostname() or os.name == "nt":
+            # No safe liveness check (os.kill would terminate on Windows)
+            return False
+        try:
+            os.kill(info["pid"], 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # Exists, owned by another user
+        return False
+    
+    def __enter__(self) -> "IndexLock":
+        """
+        Take the lock.
+        
+        Raises:
+            IndexLockedError: If another writer holds it
+        """
+        if not self.acquire():
+            raise IndexLockedError(self.config_dir, self.holder())
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        """Release the lock."""
+        self.release()
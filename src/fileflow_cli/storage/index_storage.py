@@ -1,15 +1,65 @@
 """Index storage system for FileFlowCLI."""
 
 import json
+import os
+import re
+import struct
 from pathlib import Path
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Iterator
 from datetime import datetime
 
+from ..utils.metrics import get_metrics
+from .atomic_write import discard, publish, temp_path_for
+from .index_lock import IndexLock
+from .search_index import SearchIndex
+from .record_table import RecordTable, SORT_COLUMNS
+
+
+# Previews blob: magic, little-endian u64 header length, JSON header
+# ({"indexed_at": ...}), then the preview texts. Record offsets count
+# from the end of the header.
+_PREVIEWS_MAGIC = b"FFPV1\n"
+
+
+def _is_current(stamp: Optional[str], indexed_at: Optional[str]) -> bool:
+    """
+    Check whether a derived file belongs to the published index or a newer one.
+    
+    A file newer than index.json is being published by a running writer
+    (index.json is renamed into place last) and is already complete.
+    
+    Args:
+        stamp: indexed_at stored in the derived file
+        indexed_at: indexed_at of index.json
+    
+    Returns:
+        True if the derived file can be used
+    """
+    if stamp is None or indexed_at is None:
+        return stamp == indexed_at
+    return stamp >= indexed_at
+
 
 class IndexStorage:
-    """Manages index storage for FileFlowCLI."""
+    """
+    Manages index storage for FileFlowCLI.
+    
+    One writer at a time (see IndexLock) publishes a new index as a set
+    of files, each written to a temporary file and renamed into place:
+    previews, record table and search index first, index.json last.
+    Readers take no lock and never see a half-written file; derived
+    files carry the indexed_at of their index, so a reader can tell a
+    set that belongs together.
+    """
     
     INDEX_FILENAME = "index.json"
+    STAGING_FILENAME = "index_staging.jsonl"
+    PREVIEWS_FILENAME = "index_previews.bin"
+    SEARCH_INDEX_FILENAME = "search_index.bin"
+    RECORDS_FILENAME = "index_records.bin"
+    
+    # Bytes read to find the header fields at the start of the index
+    HEADER_PEEK_BYTES = 4096
     
     def __init__(self, config_dir: Path):
         """
@@ -20,38 +70,340 @@ class IndexStorage:
         """
         self.config_dir = Path(config_dir)
         self.index_file = self.config_dir / self.INDEX_FILENAME
+        self.staging_file = self.config_dir / self.STAGING_FILENAME
+        self.previews_file = self.config_dir / self.PREVIEWS_FILENAME
+        self.search_index_file = self.config_dir / self.SEARCH_INDEX_FILENAME
+        self.records_file = self.config_dir / self.RECORDS_FILENAME
+        self._search_index: Optional[SearchIndex] = None
+        self._record_table: Optional[RecordTable] = None
+        # indexed_at of the index data last handed out (for previews)
+        self._snapshot_at: Optional[str] = None
+        self._metrics = get_metrics()
     
     def save_index(self, index_data: List[Dict[str, Any]]) -> bool:
         """
         Save index to disk.
         
+        Text previews are moved out of the records into a separate blob
+        segment, so loading the metadata-only index never reads them.
+        The caller should hold the IndexLock.
+        
         Args:
             index_data: List of file metadata dictionaries
         
         Returns:
             True if saved successfully, False otherwise
         """
+        with self._timer("save_index").time():
+            try:
+                # Ensure config directory exists
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                
+                indexed_at = datetime.now().isoformat()
+                files = self._write_previews(index_data, indexed_at)
+                
+                # Prepare index structure
+                index = {
+                    "indexed_at": indexed_at,
+                    "file_count": len(files),
+                    "files": files
+                }
+                
+                # Derived files first: once index.json is replaced, readers
+                # find everything of the new index in place
+                self._close_record_table()
+                RecordTable.write(files, self.records_file, indexed_at)
+                self._close_search_index()
+                SearchIndex.build(files, indexed_at).save(self.search_index_file)
+                
+                return self._write_index(index)
+            
+            except (IOError, TypeError, ValueError) as e:
+                print(f"Error saving index: {e}")
+                return False
+    
+    def _timer(self, operation: str) -> Any:
+        """
+        Get the latency histogram of a storage operation.
+        
+        Args:
+            operation: Operation name
+        
+        Returns:
+            Histogram (no-op while metrics are disabled)
+        """
+        return self._metrics.histogram(
+            "fileflow_storage_seconds", "Index storage operation latency", operation=operation
+        )
+    
+    def _write_index(self, index: Dict[str, Any]) -> bool:
+        """
+        Write a complete index structure to disk (atomically replaced).
+        
+        Args:
+            index: Index dictionary
+        
+        Returns:
+            True if written successfully, False otherwise
+        """
+        # Header fields go before the file list, so get_index_header can
+        # read them without parsing the records
+        if "files" in index:
+            files = index["files"]
+            index = {key: value for key, value in index.items() if key != "files"}
+            index["files"] = files
+        temp_path = temp_path_for(self.index_file)
         try:
-            # Ensure config directory exists
-            self.config_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Prepare index structure
-            index = {
-                "indexed_at": datetime.now().isoformat(),
-                "file_count": len(index_data),
-                "files": index_data
-            }
-            
-            # Save to file
-            with open(self.index_file, "w", encoding="utf-8") as f:
+            with open(temp_path, "w", encoding="utf-8") as f:
                 json.dump(index, f, indent=2, ensure_ascii=False)
-            
+            publish(temp_path, self.index_file)
             return True
-        
-        except (IOError, json.JSONEncodeError) as e:
+        except (IOError, TypeError, ValueError) as e:
+            discard(temp_path)
             print(f"Error saving index: {e}")
             return False
     
+    def update_records(
+        self,
+        updates: Dict[str, Dict[str, Any]],
+        expected_indexed_at: Optional[str] = None
+    ) -> bool:
+        """
+        Merge fields into existing index records.
+        
+        Args:
+            updates: Fields to merge, keyed by record path
+            expected_indexed_at: Only update if the index still has this
+                timestamp (guards against a re-index in between)
+        
+        Returns:
+            True if the index was updated, False otherwise (also while
+            another writer holds the index lock)
+        """
+        lock = IndexLock(self.config_dir)
+        if not lock.acquire("update_records"):
+            return False
+        
+        try:
+            with self._timer("update_records").time():
+                return self._update_records(updates, expected_indexed_at)
+        finally:
+            lock.release()
+    
+    def _update_records(
+        self,
+        updates: Dict[str, Dict[str, Any]],
+        expected_indexed_at: Optional[str]
+    ) -> bool:
+        """
+        Merge fields into existing index records (the caller holds the lock).
+        
+        Args:
+            updates: Fields to merge, keyed by record path
+            expected_indexed_at: Only update if the index still has this timestamp
+        
+        Returns:
+            True if the index was updated, False otherwise
+        """
+        index = self.load_index()
+        if not index:
+            return False
+        
+        if expected_indexed_at is not None and index.get("indexed_at") != expected_indexed_at:
+            return False
+        
+        for record in index.get("files", []):
+            fields = updates.get(record.get("path"))
+            if fields:
+                record.update(fields)
+        
+        # Sort orders stay valid unless a sort key changed
+        orders = None
+        sort_fields = set(SORT_COLUMNS.values())
+        if not any(sort_fields.intersection(fields) for fields in updates.values()):
+            record_table = self.get_record_table()
+            orders = record_table.orders() if record_table is not None else None
+        
+        # Derived files first, as in save_index
+        self._close_record_table()
+        if not RecordTable.write(index.get("files", []), self.records_file, index.get("indexed_at"), orders):
+            return False
+        return self._write_index(index)
+    
+    def move_records(self, moves: Dict[str, str]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """
+        Rename index records after their files were moved, without a re-scan.
+        
+        Moving a directory moves every record under it. Paths not in the
+        index are ignored, so applying the same moves twice changes
+        nothing. The caller should hold the IndexLock.
+        
+        Args:
+            moves: New path for each moved file or directory path
+        
+        Returns:
+            Moved records (under their new paths) keyed by their old path,
+            or None if there is no index or it could not be saved
+        """
+        with self._timer("move_records").time():
+            index = self.load_index()
+            if not index:
+                return None
+            
+            files = index.get("files", [])
+            moved: Dict[str, Dict[str, Any]] = {}
+            unmatched = dict(moves)
+            
+            def move(record: Dict[str, Any], new_path: str) -> None:
+                moved[record["path"]] = record
+                new = Path(new_path)
+                record["path"] = new_path
+                record["name"] = new.name
+                record["extension"] = new.suffix.lower()
+            
+            for record in files:
+                new_path = moves.get(record.get("path"))
+                if new_path is not None:
+                    unmatched.pop(record["path"], None)
+                    move(record, new_path)
+            
+            # Moves that matched no file record are directories (or were
+            # never indexed): look up the parents of the remaining records
+            if unmatched:
+                already_moved = {id(record) for record in moved.values()}
+                for record in files:
+                    if id(record) in already_moved:
+                        continue
+                    path = record.get("path", "")
+                    position = path.rfind(os.sep)
+                    while position > 0:
+                        new_parent = unmatched.get(path[:position])
+                        if new_parent is not None:
+                            move(record, new_parent + path[position:])
+                            break
+                        position = path.rfind(os.sep, 0, position)
+            
+            if not moved:
+                return moved
+            
+            # Derived files first, as in save_index
+            self._close_record_table()
+            if not RecordTable.write(files, self.records_file, index.get("indexed_at")):
+                return None
+            self.update_search_index(added=list(moved.values()), removed=list(moved))
+            self._close_search_index()
+            if not self._write_index(index):
+                return None
+            return moved
+    
+    def update_header(
+        self,
+        fields: Dict[str, Any],
+        expected_indexed_at: Optional[str] = None
+    ) -> bool:
+        """
+        Set top-level index fields (e.g. enrichment status).
+        
+        Args:
+            fields: Fields to set
+            expected_indexed_at: Only update if the index still has this timestamp
+        
+        Returns:
+            True if the index was updated, False otherwise (also while
+            another writer holds the index lock)
+        """
+        lock = IndexLock(self.config_dir)
+        if not lock.acquire("update_header"):
+            return False
+        
+        try:
+            index = self.load_index()
+            if not index:
+                return False
+            
+            if expected_indexed_at is not None and index.get("indexed_at") != expected_indexed_at:
+                return False
+            
+            index.update(fields)
+            return self._write_index(index)
+        finally:
+            lock.release()
+    
+    def _write_previews(self, index_data: List[Dict[str, Any]], indexed_at: str) -> List[Dict[str, Any]]:
+        """
+        Write previews to the blob segment and strip them from records.
+        
+        Args:
+            index_data: List of file metadata dictionaries
+            indexed_at: Timestamp of the index being saved (stamped into the blob)
+        
+        Returns:
+            Records with "preview" replaced by "preview_offset"/"preview_length"
+        """
+        files = []
+        offset = 0
+        header = json.dumps({"indexed_at": indexed_at}).encode("utf-8")
+        temp_path = temp_path_for(self.previews_file)
+        
+        try:
+            with open(temp_path, "wb") as blob:
+                blob.write(_PREVIEWS_MAGIC)
+                blob.write(struct.pack("<Q", len(header)))
+                blob.write(header)
+                for record in index_data:
+                    preview = record.get("preview")
+                    if preview is None:
+                        files.append(record)
+                        continue
+                    
+                    data = preview.encode("utf-8")
+                    blob.write(data)
+                    
+                    record = {key: value for key, value in record.items() if key != "preview"}
+                    record["preview_offset"] = offset
+                    record["preview_length"] = len(data)
+                    files.append(record)
+                    offset += len(data)
+            
+            publish(temp_path, self.previews_file)
+        except (IOError, TypeError, ValueError):
+            discard(temp_path)
+            raise
+        return files
+    
+    def load_preview(self, record: Dict[str, Any]) -> Optional[str]:
+        """
+        Load the text preview of an indexed file from the blob segment.
+        
+        Args:
+            record: File metadata dictionary from the index
+        
+        Returns:
+            Preview text or None if the file has no preview (or the blob
+            already belongs to a newer index than the record)
+        """
+        offset = record.get("preview_offset")
+        length = record.get("preview_length")
+        if offset is None or not length:
+            return None
+        
+        try:
+            with open(self.previews_file, "rb") as blob:
+                data_start = 0
+                if blob.read(len(_PREVIEWS_MAGIC)) == _PREVIEWS_MAGIC:
+                    (header_length,) = struct.unpack("<Q", blob.read(8))
+                    header = json.loads(blob.read(header_length).decode("utf-8"))
+                    if self._snapshot_at is not None and header.get("indexed_at") != self._snapshot_at:
+                        return None
+                    data_start = blob.tell()
+                # else: written before blobs had a header
+                
+                blob.seek(data_start + offset)
+                return blob.read(length).decode("utf-8", errors="replace")
+        except (IOError, struct.error, ValueError) as e:
+            print(f"Error loading preview: {e}")
+            return None
+    
     def load_index(self) -> Optional[Dict[str, Any]]:
         """
         Load index from disk.
@@ -59,18 +411,199 @@ class IndexStorage:
         Returns:
             Index data dictionary or None if not found
         """
+        with self._timer("load_index").time():
+            if not self.index_file.exists():
+                return None
+            
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+                
+                self._snapshot_at = index.get("indexed_at")
+                return index
+            
+            except (FileNotFoundError, json.JSONDecodeError) as e:
+                print(f"Error loading index: {e}")
+                return None
+    
+    def get_search_index(self) -> Optional[SearchIndex]:
+        """
+        Get the search index, loading it lazily on first use.
+        
+        The saved search index is memory-mapped; it is rebuilt from the
+        index only if it is missing or belongs to an older index.
+        
+        Returns:
+            SearchIndex instance or None if no index exists
+        """
+        if self._search_index is not None:
+            return self._search_index
+        
         if not self.index_file.exists():
             return None
         
-        try:
-            with open(self.index_file, "r", encoding="utf-8") as f:
-                index = json.load(f)
+        search_index = SearchIndex.load(self.search_index_file)
+        if search_index is not None and _is_current(search_index.indexed_at, self._peek_indexed_at()):
+            self._search_index = search_index
+        elif search_index is not None:
+            search_index.close()
+        
+        if self._search_index is None:
+            index = self.load_index()
+            if not index:
+                return None
+            self._search_index = SearchIndex.build(index.get("files", []), index.get("indexed_at"))
+            self._search_index.save(self.search_index_file)
+        
+        return self._search_index
+    
+    def get_record_table(self) -> Optional[RecordTable]:
+        """
+        Get the paged record table, opening it lazily on first use.
+        
+        The table is memory-mapped; it is rebuilt from the index only if it
+        is missing or belongs to an older index. Checking for a newer index
+        reads only the first bytes of the index file. An open table stays
+        readable while a writer publishes the next one.
+        
+        Returns:
+            RecordTable instance or None if no index exists
+        """
+        indexed_at = self._peek_indexed_at()
+        if self._record_table is not None:
+            # A long-lived storage object may outlive a re-index
+            if _is_current(self._record_table.indexed_at, indexed_at):
+                self._snapshot_at = self._record_table.indexed_at
+                return self._record_table
+            self._close_record_table()
+        
+        if not self.index_file.exists():
+            return None
+        
+        record_table = RecordTable.load(self.records_file)
+        if record_table is None or not _is_current(record_table.indexed_at, indexed_at):
+            if record_table is not None:
+                record_table.close()
             
-            return index
+            index = self.load_index()
+            if not index:
+                return None
+            if not RecordTable.write(index.get("files", []), self.records_file, index.get("indexed_at")):
+                return None
+            record_table = RecordTable.load(self.records_file)
+            if record_table is None:
+                return None
+        
+        self._record_table = record_table
+        self._snapshot_at = record_table.indexed_at
+        return record_table
+    
+    def get_record_count(self) -> int:
+        """
+        Get number of records without loading the index.
+        
+        Returns:
+            Number of records or 0 if no index
+        """
+        record_table = self.get_record_table()
+        return len(record_table) if record_table is not None else 0
+    
+    def get_records(
+        self,
+        offset: int,
+        limit: int,
+        sort_by: Optional[str] = None,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Get a window of index records by position.
+        
+        Sorted windows use the sort orders precomputed when the index was
+        saved, so paging and top-N queries never sort the index.
+        
+        Args:
+            offset: Position of the first record
+            limit: Maximum number of records
+            sort_by: Sort column ("name", "size", "modified" or "extension"),
+                None for index order
+            descending: Reverse the order
+        
+        Returns:
+            List of file metadata dictionaries
+        """
+        with self._timer("get_records").time():
+            record_table = self.get_record_table()
+            if record_table is None:
+                return []
+            return record_table.get(offset, limit, sort_by, descending)
+    
+    def iter_records(self) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all index records without loading the index.
+        
+        Yields:
+            File metadata dictionaries in index order
+        """
+        record_table = self.get_record_table()
+        if record_table is not None:
+            yield from record_table.iter_records()
+    
+    def update_search_index(
+        self,
+        added: Optional[List[Dict[str, Any]]] = None,
+        removed: Optional[List[str]] = None
+    ) -> bool:
+        """
+        Apply incremental changes to the search index and persist it.
+        
+        Args:
+            added: New or changed file records
+            removed: Paths no longer in the index
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        search_index = self.get_search_index()
+        if search_index is None:
+            return False
+        
+        if removed:
+            search_index.remove_paths(removed)
+        if added:
+            search_index.add_records(added)
+        
+        return search_index.save(self.search_index_file)
+    
+    def _peek_indexed_at(self) -> Optional[str]:
+        """
+        Read the index timestamp without parsing the whole index.
         
-        except (FileNotFoundError, json.JSONDecodeError) as e:
-            print(f"Error loading index: {e}")
+        "indexed_at" is always the first key written, so the first line
+        of the file is enough.
+        
+        Returns:
+            ISO timestamp string or None if not found
+        """
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                head = f.read(256)
+        except IOError:
             return None
+        
+        match = re.search(r'"indexed_at":\s*"([^"]*)"', head)
+        return match.group(1) if match else None
+    
+    def _close_search_index(self) -> None:
+        """Release a loaded search index so it is reopened on next use."""
+        if self._search_index is not None:
+            self._search_index.close()
+            self._search_index = None
+    
+    def _close_record_table(self) -> None:
+        """Release a loaded record table so it is reopened on next use."""
+        if self._record_table is not None:
+            self._record_table.close()
+            self._record_table = None
     
     def index_exists(self) -> bool:
         """
@@ -81,6 +614,37 @@ class IndexStorage:
         """
         return self.index_file.exists()
     
+    def get_index_header(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the top-level index fields (everything except the file list).
+        
+        Only the start of the index file is read, so the cost does not
+        depend on the number of indexed files. Indexes written before
+        header fields were kept in front of the file list are loaded in
+        full instead.
+        
+        Returns:
+            Dictionary with indexed_at, file_count and any other top-level
+            fields, or None if no index
+        """
+        try:
+            with open(self.index_file, "r", encoding="utf-8") as f:
+                head = f.read(self.HEADER_PEEK_BYTES)
+        except (FileNotFoundError, IOError):
+            return None
+        
+        end = head.find('\n  "files":')
+        if end != -1:
+            try:
+                return json.loads(head[:end].rstrip().rstrip(",") + "}")
+            except json.JSONDecodeError:
+                pass
+        
+        index = self.load_index()
+        if not index:
+            return None
+        return {key: value for key, value in index.items() if key != "files"}
+    
     def get_indexed_at(self) -> Optional[str]:
         """
         Get timestamp of when index was last created.
@@ -88,9 +652,9 @@ class IndexStorage:
         Returns:
             ISO timestamp string or None if no index
         """
-        index = self.load_index()
-        if index:
-            return index.get("indexed_at")
+        header = self.get_index_header()
+        if header:
+            return header.get("indexed_at")
         return None
     
     def get_file_count(self) -> int:
@@ -100,8 +664,80 @@ class IndexStorage:
         Returns:
             Number of files or 0 if no index
         """
-        index = self.load_index()
-        if index:
-            return index.get("file_count", 0)
+        header = self.get_index_header()
+        if header:
+            return header.get("file_count", 0)
         return 0
-
+    
+    
+    def append_staged(self, records: List[Dict[str, Any]]) -> bool:
+        """
+        Append processed file records to the staging file.
+        
+        Records are staged batch by batch while indexing runs, so an
+        interrupted run can resume without keeping every record in memory.
+        
+        Args:
+            records: List of file metadata dictionaries
+        
+        Returns:
+            True if appended successfully, False otherwise
+        """
+        with self._timer("append_staged").time():
+            try:
+                self.config_dir.mkdir(parents=True, exist_ok=True)
+                
+                with open(self.staging_file, "a", encoding="utf-8") as f:
+                    for record in records:
+                        f.write(json.dumps(record, ensure_ascii=False))
+                        f.write("\n")
+                
+                return True
+            
+            except (IOError, TypeError, ValueError) as e:
+                print(f"Error staging index records: {e}")
+                return False
+    
+    def load_staged(self) -> List[Dict[str, Any]]:
+        """
+        Load staged file records.
+        
+        Later records for the same path replace earlier ones, and a
+        truncated last line (interrupted write) is ignored.
+        
+        Returns:
+            List of file metadata dictionaries in staging order
+        """
+        with self._timer("load_staged").time():
+            if not self.staging_file.exists():
+                return []
+            
+            records: Dict[str, Dict[str, Any]] = {}
+            
+            try:
+                with open(self.staging_file, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            record = json.loads(line)
+                        except json.JSONDecodeError:
+                            continue
+                        records[record["path"]] = record
+            except (IOError, KeyError) as e:
+                print(f"Error loading staged index records: {e}")
+            
+            return list(records.values())
+    
+    def clear_staged(self) -> bool:
+        """
+        Delete the staging file.
+        
+        Returns:
+            True if deleted successfully, False otherwise
+        """
+        try:
+            if self.staging_file.exists():
+                self.staging_file.unlink()
+            return True
+        except IOError as e:
+            print(f"Error clearing staged index records: {e}")
+            return False
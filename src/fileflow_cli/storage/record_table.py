@@ -0,0 +1,280 @@
+"""Random-access record table for FileFlowCLI."""
+
+import json
+import mmap
+import struct
+from array import array
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterator
+
+from .atomic_write import discard, publish, temp_path_for
+
+
+_MAGIC = b"FFRT2\n"
+
+# Columns with a precomputed sort order, mapped to their record field
+SORT_COLUMNS = {
+    "name": "name",
+    "size": "size",
+    "modified": "modified",
+    "extension": "extension",
+}
+
+
+def _sort_key(column: str, record: Dict[str, Any]) -> Any:
+    """
+    Get the sort key of a record for a column.
+    
+    Args:
+        column: Sort column name
+        record: File metadata dictionary
+    
+    Returns:
+        Comparable key
+    """
+    value = record.get(SORT_COLUMNS[column])
+    if column == "size":
+        return int(value or 0)
+    return (value or "").lower()
+
+
+class RecordTable:
+    """
+    Index records stored for random access by position.
+    
+    Records are written as JSON lines with an array of line offsets and
+    one permutation vector per sort column (record positions in sorted
+    order). A saved table is memory-mapped: opening it reads only a small
+    header, and reading a window of rows, sorted or not, touches only
+    those rows, so the cost of paging does not depend on the size of the
+    index.
+    """
+    
+    def __init__(self):
+        """Initialize an unopened record table."""
+        self.indexed_at: Optional[str] = None
+        self._count = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._rows_start = 0
+        self._offsets: Optional[memoryview] = None
+        self._orders: Dict[str, memoryview] = {}
+    
+    @staticmethod
+    def write(
+        records: List[Dict[str, Any]],
+        file_path: Path,
+        indexed_at: Optional[str] = None,
+        orders: Optional[Dict[str, array]] = None
+    ) -> bool:
+        """
+        Write records to a record table file.
+        
+        Layout: magic, header length, JSON header (section offsets), row
+        offsets (count + 1 unsigned 64-bit values), one unsigned 32-bit
+        permutation per sort column, then the rows as JSON lines.
+        
+        Args:
+            records: File metadata dictionaries in table order
+            file_path: Destination file
+            indexed_at: Timestamp of the source index
+            orders: Sort orders to reuse when no sort key changed
+                (default: compute them from the records)
+        
+        Returns:
+            True if written successfully, False otherwise
+        """
+        rows = bytearray()
+        offsets = array("Q", [0])
+        for record in records:
+            rows += json.dumps(record, ensure_ascii=False).encode("utf-8")
+            rows += b"\n"
+            offsets.append(len(rows))
+        
+        count = len(offsets) - 1
+        if orders is None or any(len(orders.get(column, ())) != count for column in SORT_COLUMNS):
+            orders = {
+                column: array("I", sorted(
+                    range(count),
+                    key=lambda position: _sort_key(column, records[position])
+                ))
+                for column in SORT_COLUMNS
+            }
+        
+        sections = [("offsets", offsets.tobytes())]
+        sections.extend((f"order_{column}", orders[column].tobytes()) for column in SORT_COLUMNS)
+        sections.append(("rows", bytes(rows)))
+        
+        offset = 0
+        section_table = {}
+        for name, data in sections:
+            section_table[name] = [offset, len(data)]
+            offset += len(data)
+        
+        header = json.dumps({
+            "indexed_at": indexed_at,
+            "count": count,
+            "byteorder": "little" if array("Q", [1]).tobytes()[0] == 1 else "big",
+            "sections": section_table
+        }, ensure_ascii=False).encode("utf-8")
+        
+        file_path = Path(file_path)
+        temp_path = temp_path_for(file_path)
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_MAGIC)
+                f.write(struct.pack("<Q", len(header)))
+                f.write(header)
+                for _, data in sections:
+                    f.write(data)
+            publish(temp_path, file_path)
+            return True
+        except (IOError, TypeError, ValueError) as e:
+            discard(temp_path)
+            print(f"Error saving record table: {e}")
+            return False
+    
+    @classmethod
+    def load(cls, file_path: Path) -> Optional["RecordTable"]:
+        """
+        Open a saved record table (memory-mapped).
+        
+        Args:
+            file_path: Record table file
+        
+        Returns:
+            RecordTable instance or None if missing/invalid
+        """
+        try:
+            f = open(file_path, "rb")
+        except (FileNotFoundError, IOError):
+            return None
+        
+        try:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                f.close()
+                return None
+            header_length = struct.unpack("<Q", f.read(8))[0]
+            header = json.loads(f.read(header_length).decode("utf-8"))
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError, struct.error) as e:
+            f.close()
+            print(f"Error loading record table: {e}")
+            return None
+        
+        native = "little" if array("Q", [1]).tobytes()[0] == 1 else "big"
+        if header.get("byteorder", native) != native:
+            mapped.close()
+            f.close()
+            return None
+        
+        data_start = len(_MAGIC) + 8 + header_length
+        sections = header["sections"]
+        
+        def view(name: str, typecode: str) -> memoryview:
+            offset, length = sections[name]
+            with memoryview(mapped) as whole:
+                return whole[data_start + offset:data_start + offset + length].cast(typecode)
+        
+        table = cls()
+        table.indexed_at = header.get("indexed_at")
+        table._count = header["count"]
+        table._offsets = view("offsets", "Q")
+        table._orders = {column: view(f"order_{column}", "I") for column in SORT_COLUMNS}
+        table._rows_start = data_start + sections["rows"][0]
+        table._file = f
+        table._mmap = mapped
+        return table
+    
+    def __len__(self) -> int:
+        """Number of records in the table."""
+        return self._count
+    
+    def get(
+        self,
+        offset: int,
+        limit: int,
+        sort_by: Optional[str] = None,
+        descending: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Read a window of records, optionally in sorted order.
+        
+        Args:
+            offset: Position of the first record (in sorted order if sort_by is set)
+            limit: Maximum number of records
+            sort_by: Sort column ("name", "size", "modified" or "extension"),
+                None for index order
+            descending: Reverse the sort order
+        
+        Returns:
+            List of file metadata dictionaries (shorter at the end of the table)
+        """
+        if self._mmap is None:
+            return []
+        
+        start = max(0, offset)
+        end = min(self._count, start + max(0, limit))
+        if start >= end:
+            return []
+        
+        base = self._rows_start
+        if sort_by is None and not descending:
+            # One contiguous read covers the whole window
+            data = self._mmap[base + self._offsets[start]:base + self._offsets[end]]
+            return [json.loads(line) for line in data.splitlines()]
+        
+        if sort_by is None:
+            positions = range(self._count - 1 - start, self._count - 1 - end, -1)
+        else:
+            order = self._orders[sort_by]
+            if descending:
+                positions = order[self._count - end:self._count - start][::-1]
+            else:
+                positions = order[start:end]
+        
+        offsets = self._offsets
+        return [
+            json.loads(self._mmap[base + offsets[position]:base + offsets[position + 1]])
+            for position in positions
+        ]
+    
+    def iter_records(self, chunk_size: int = 4096) -> Iterator[Dict[str, Any]]:
+        """
+        Iterate over all records in index order.
+        
+        Rows are read a chunk at a time, so memory use does not depend on
+        the size of the table.
+        
+        Args:
+            chunk_size: Records read per chunk
+        
+        Yields:
+            File metadata dictionaries
+        """
+        for offset in range(0, self._count, chunk_size):
+            yield from self.get(offset, chunk_size)
+    
+    def orders(self) -> Dict[str, array]:
+        """
+        Copy the sort orders, e.g. to reuse them for a rewrite.
+        
+        Returns:
+            Permutation arrays keyed by sort column
+        """
+        return {column: array("I", order) for column, order in self._orders.items()}
+    
+    def close(self) -> None:
+        """Release the memory map."""
+        for order in self._orders.values():
+            order.release()
+        self._orders = {}
+        if self._offsets is not None:
+            self._offsets.release()
+            self._offsets = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,817 @@
+"""Path search index for FileFlowCLI."""
+
+import json
+import mmap
+import re
+import struct
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from .atomic_write import discard, publish, temp_path_for
+
+
+_MAGIC = b"FFSI1\n"
+
+# Posting key prefix for extension lists (cannot clash with name trigrams)
+_EXTENSION_KEY = "\x00"
+
+# Shortest name query searched; shorter ones have no trigram to look up
+# and would have to check every name
+MIN_QUERY_LENGTH = 3
+
+# Number of rarest posting lists intersected before verifying names
+_INTERSECT_LISTS = 4
+
+# Posting lists up to this length are intersected eagerly as sets
+_SET_INTERSECT_LIMIT = 20000
+
+# Maximum posting entries counted for one fuzzy lookup
+_FUZZY_POSTING_BUDGET = 150000
+
+_SIZE_UNITS = {"": 1, "b": 1, "k": 1024, "kb": 1024, "m": 1024 ** 2, "mb": 1024 ** 2,
+               "g": 1024 ** 3, "gb": 1024 ** 3, "t": 1024 ** 4, "tb": 1024 ** 4}
+
+_FILTER_PATTERN = re.compile(
+    r"^(?:(ext):(\S+)|(size)([<>]=?)(\d+(?:\.\d+)?)([kmgt]?b?)|(after|before):(\S+))$",
+    re.IGNORECASE
+)
+
+
+def trigrams(text: str) -> List[str]:
+    """
+    Get distinct trigrams of a string.
+    
+    Args:
+        text: Lowercase text
+    
+    Returns:
+        List of trigrams
+    """
+    return list({text[i:i + 3] for i in range(len(text) - 2)})
+
+
+def parse_query(text: str) -> Dict[str, Any]:
+    """
+    Split search input into a name query and filters.
+    
+    Supported filters: ext:.py, size>10mb, size<=4k, after:2024-01-01,
+    before:2024-06-30. Everything else is part of the name query.
+    
+    Args:
+        text: Raw search input
+    
+    Returns:
+        Keyword arguments for SearchIndex.search
+    """
+    terms = []
+    query: Dict[str, Any] = {}
+    
+    for token in text.split():
+        match = _FILTER_PATTERN.match(token)
+        if not match:
+            terms.append(token)
+            continue
+        
+        if match.group(1):
+            extension = match.group(2).lower()
+            query["extension"] = extension if extension.startswith(".") else f".{extension}"
+        elif match.group(3):
+            size = int(float(match.group(5)) * _SIZE_UNITS[match.group(6).lower()])
+            if match.group(4).startswith(">"):
+                query["min_size"] = size
+            else:
+                query["max_size"] = size
+        else:
+            try:
+                timestamp = datetime.fromisoformat(match.group(8)).timestamp()
+            except ValueError:
+                terms.append(token)
+                continue
+            key = "modified_after" if match.group(7).lower() == "after" else "modified_before"
+            query[key] = timestamp
+    
+    query["query"] = " ".join(terms)
+    return query
+
+
+def _bisect_order(order: Any, values: Any, target: float, right: bool) -> int:
+    """
+    Binary search a sort order by the values it sorts.
+    
+    Equivalent to bisect with a key function, which needs Python 3.10.
+    
+    Args:
+        order: Document ids sorted by value
+        values: Column values indexed by document id
+        target: Value to locate
+        right: Return the position after equal values instead of before
+    
+    Returns:
+        Insertion position in order
+    """
+    low, high = 0, len(order)
+    while low < high:
+        middle = (low + high) // 2
+        value = values[order[middle]]
+        if value < target or (right and value == target):
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+class SearchIndex:
+    """
+    Trigram inverted index over file names with column filters.
+    
+    Document ids are positions in the index. Posting lists are sorted id
+    arrays, so new documents are appended without re-sorting and removed
+    documents are masked with tombstones. Size and modification time also
+    have a sort order, so range filters scan only matching documents. A
+    saved index is memory-mapped: opening it reads only a small header,
+    and posting lists and columns are touched only when a query needs them.
+    """
+    
+    def __init__(self):
+        """Initialize an empty search index."""
+        self.indexed_at: Optional[str] = None
+        self._paths: List[str] = []
+        self._names: List[str] = []
+        self._sizes = array("q")
+        self._mtimes = array("d")
+        self._extensions = array("H")
+        self._extension_table: List[str] = [""]
+        self._extension_ids: Dict[str, int] = {"": 0}
+        self._postings: Dict[str, array] = {}
+        self._deleted: set = set()
+        self._path_ids: Optional[Dict[str, int]] = None
+        self._orders: Dict[str, Any] = {}
+        
+        # Memory-mapped state (set by load)
+        self._mmap: Optional[mmap.mmap] = None
+        self._file = None
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        self._views: Dict[str, memoryview] = {}
+        self._trigram_table: Dict[str, List[int]] = {}
+        self._doc_count = 0
+    
+    @classmethod
+    def build(cls, records: Iterable[Dict[str, Any]], indexed_at: Optional[str] = None) -> "SearchIndex":
+        """
+        Build a search index from index records.
+        
+        Args:
+            records: File metadata dictionaries
+            indexed_at: Timestamp of the source index
+        
+        Returns:
+            SearchIndex instance
+        """
+        search_index = cls()
+        search_index.indexed_at = indexed_at
+        search_index.add_records(records)
+        return search_index
+    
+    def add_records(self, records: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add records (a record with an already indexed path replaces it).
+        
+        Args:
+            records: File metadata dictionaries
+        """
+        self._materialize()
+        self._build_path_ids()
+        self._orders = {}
+        
+        for record in records:
+            path = record["path"]
+            if path in self._path_ids:
+                self._deleted.add(self._path_ids[path])
+            
+            doc_id = len(self._paths)
+            name = record.get("name") or path.rsplit("/", 1)[-1]
+            lowered = name.lower()
+            
+            self._paths.append(path)
+            self._names.append(lowered)
+            self._sizes.append(int(record.get("size", 0)))
+            self._mtimes.append(self._parse_mtime(record.get("modified")))
+            extension = (record.get("extension") or "").lower()
+            self._extensions.append(self._extension_id(extension))
+            
+            for trigram in trigrams(lowered) + [_EXTENSION_KEY + extension]:
+                posting = self._postings.get(trigram)
+                if posting is None:
+                    posting = self._postings[trigram] = array("I")
+                posting.append(doc_id)
+            
+            self._path_ids[path] = doc_id
+        
+        self._doc_count = len(self._paths)
+    
+    def remove_paths(self, paths: Iterable[str]) -> None:
+        """
+        Remove documents by path.
+        
+        Args:
+            paths: Relative paths to remove
+        """
+        self._materialize()
+        self._build_path_ids()
+        
+        for path in paths:
+            doc_id = self._path_ids.pop(path, None)
+            if doc_id is not None:
+                self._deleted.add(doc_id)
+    
+    def _build_path_ids(self) -> None:
+        """Map paths of live documents to their ids, on first use."""
+        if self._path_ids is None:
+            self._path_ids = {}
+            for doc_id, path in enumerate(self._paths):
+                if doc_id not in self._deleted:
+                    self._path_ids[path] = doc_id
+    
+    def __len__(self) -> int:
+        """Number of live documents."""
+        return self._doc_count - len(self._deleted)
+    
+    def search(
+        self,
+        query: str = "",
+        extension: Optional[str] = None,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        modified_after: Optional[float] = None,
+        modified_before: Optional[float] = None,
+        limit: int = 100,
+        fuzzy: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Find files by name substring, falling back to fuzzy matches.
+        
+        Args:
+            query: Name substring (case-insensitive)
+            extension: Only files with this extension (e.g. ".py")
+            min_size: Minimum size in bytes
+            max_size: Maximum size in bytes
+            modified_after: Only files modified after this POSIX timestamp
+            modified_before: Only files modified before this POSIX timestamp
+            limit: Maximum number of results (default: 100)
+            fuzzy: Fall back to trigram-similarity matches if nothing matches exactly
+        
+        Returns:
+            List of result dictionaries (path, name, size, modified, score);
+            empty for a query shorter than MIN_QUERY_LENGTH
+        """
+        query = query.lower().strip()
+        if 0 < len(query) < MIN_QUERY_LENGTH:
+            return []
+        extension_id = None
+        if extension is not None:
+            extension_id = self._extension_ids.get(extension.lower())
+            if extension_id is None:
+                return []
+        
+        def accept(doc_id: int) -> bool:
+            if doc_id in self._deleted:
+                return False
+            if extension_id is not None and self._column("extensions")[doc_id] != extension_id:
+                return False
+            if min_size is not None or max_size is not None:
+                size = self._column("sizes")[doc_id]
+                if (min_size is not None and size < min_size) or (max_size is not None and size > max_size):
+                    return False
+            if modified_after is not None or modified_before is not None:
+                mtime = self._column("mtimes")[doc_id]
+                if (modified_after is not None and mtime < modified_after) or (
+                    modified_before is not None and mtime > modified_before
+                ):
+                    return False
+            return True
+        
+        matches: List[Tuple[float, int]] = []
+        seen = set()
+        
+        postings = [self._posting(t) for t in trigrams(query)] if query else []
+        if extension is not None:
+            postings.append(self._posting(_EXTENSION_KEY + extension.lower()))
+        # Range filters map to a slice of a sort order; scan whichever
+        # candidate source is smallest
+        candidates = None
+        if min_size is not None or max_size is not None:
+            candidates = self._range("sizes", min_size, max_size)
+        if modified_after is not None or modified_before is not None:
+            in_range = self._range("mtimes", modified_after, modified_before)
+            if candidates is None or len(in_range) < len(candidates):
+                candidates = in_range
+        if postings and (candidates is None or min(len(p) for p in postings) < len(candidates)):
+            candidates = self._intersect(postings)
+        elif candidates is None:
+            candidates = range(self._doc_count)
+        
+        # Collect a few pages of verified substring matches, then rank them
+        target = limit * 4
+        for doc_id in candidates:
+            if query and query not in self._name(doc_id):
+                continue
+            if not accept(doc_id):
+                continue
+            matches.append((self._score(query, self._name(doc_id)), doc_id))
+            seen.add(doc_id)
+            if len(matches) >= target:
+                break
+        
+        if fuzzy and query and not matches:
+            for score, doc_id in self._fuzzy(query, limit * 4):
+                if doc_id not in seen and accept(doc_id):
+                    matches.append((score, doc_id))
+                    seen.add(doc_id)
+        
+        matches.sort(key=lambda match: (-match[0], match[1]))
+        return [self._result(doc_id, score) for score, doc_id in matches[:limit]]
+    
+    def _range(self, column: str, low: Optional[float], high: Optional[float]) -> Any:
+        """
+        Get the documents whose column value lies in [low, high].
+        
+        Args:
+            column: "sizes" or "mtimes"
+            low: Lower bound (None for unbounded)
+            high: Upper bound (None for unbounded)
+        
+        Returns:
+            Sequence of document ids in column order
+        """
+        order = self._order(column)
+        values = self._column(column)
+        start = _bisect_order(order, values, low, False) if low is not None else 0
+        end = _bisect_order(order, values, high, True) if high is not None else len(order)
+        return order[start:end]
+    
+    def _order(self, column: str) -> Any:
+        """
+        Get the documents sorted by a numeric column.
+        
+        Saved indexes carry the order; in memory it is computed on first use.
+        
+        Args:
+            column: "sizes" or "mtimes"
+        
+        Returns:
+            Sequence of document ids
+        """
+        section = f"order_{column}"
+        if self._mmap is not None and section in self._sections:
+            return self._view(section, "I")
+        
+        order = self._orders.get(column)
+        if order is None:
+            values = self._column(column)
+            order = array("I", sorted(range(self._doc_count), key=values.__getitem__))
+            self._orders[column] = order
+        return order
+    
+    def _intersect(self, postings: List[Any]) -> Iterable[int]:
+        """
+        Intersect the rarest posting lists.
+        
+        Only the few smallest lists are intersected; candidates are verified
+        against the name afterwards anyway, so the remaining (common) lists
+        would cost time without removing many candidates. Short lists are
+        intersected as sets; long ones are merged lazily so a query with
+        many matches stops as soon as enough results are found.
+        
+        Args:
+            postings: Sorted sequences of document ids
+        
+        Returns:
+            Iterable of document ids in ascending order
+        """
+        if not postings or any(len(posting) == 0 for posting in postings):
+            return []
+        postings = sorted(postings, key=len)[:_INTERSECT_LISTS]
+        
+        if len(postings[0]) > _SET_INTERSECT_LIMIT:
+            return self._merge(postings)
+        
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if len(posting) > len(candidates) * 16:
+                # Much longer list: probe it instead of scanning it
+                candidates = {
+                    doc_id for doc_id in candidates
+                    if self._contains(posting, doc_id)
+                }
+            else:
+                candidates.intersection_update(posting)
+            if not candidates:
+                break
+        
+        return sorted(candidates)
+    
+    def _merge(self, postings: List[Any]) -> Iterable[int]:
+        """
+        Lazily intersect sorted posting lists, smallest first.
+        
+        Args:
+            postings: Sorted sequences of document ids, smallest first
+        
+        Yields:
+            Document ids present in all lists
+        """
+        smallest, others = postings[0], postings[1:]
+        cursors = [0] * len(others)
+        
+        for doc_id in smallest:
+            present = True
+            for index, posting in enumerate(others):
+                position = bisect_left(posting, doc_id, cursors[index])
+                cursors[index] = position
+                if position >= len(posting) or posting[position] != doc_id:
+                    present = False
+                    break
+            if present:
+                yield doc_id
+    
+    def _contains(self, posting: Any, doc_id: int) -> bool:
+        """
+        Check membership in a sorted posting list.
+        
+        Args:
+            posting: Sorted sequence of document ids
+            doc_id: Document id
+        
+        Returns:
+            True if doc_id is in the list
+        """
+        position = bisect_left(posting, doc_id)
+        return position < len(posting) and posting[position] == doc_id
+    
+    def _fuzzy(self, query: str, limit: int) -> List[Tuple[float, int]]:
+        """
+        Rank documents by shared trigrams with the query.
+        
+        Args:
+            query: Lowercase query
+            limit: Maximum number of candidates
+        
+        Returns:
+            List of (score, doc_id), best first
+        """
+        query_trigrams = trigrams(query)
+        postings = sorted(
+            (posting for posting in map(self._posting, query_trigrams) if len(posting) > 0),
+            key=len
+        )
+        
+        # Count shared trigrams using the rarest lists within a work budget
+        counts: Counter = Counter()
+        budget = _FUZZY_POSTING_BUDGET
+        counted = 0
+        for posting in postings:
+            if len(posting) > budget:
+                break
+            counts.update(posting)
+            budget -= len(posting)
+            counted += 1
+        
+        if counted < 2:
+            return []
+        
+        threshold = max(2, (counted + 1) // 2)
+        ranked = [
+            (count / counted * 0.5, doc_id)
+            for doc_id, count in counts.most_common(limit)
+            if count >= threshold
+        ]
+        return ranked
+    
+    def _score(self, query: str, name: str) -> float:
+        """
+        Score a substring match: exact and prefix matches rank first.
+        
+        Args:
+            query: Lowercase query
+            name: Lowercase file name
+        
+        Returns:
+            Score (higher is better)
+        """
+        if not query:
+            return 0.0
+        if name == query:
+            return 3.0
+        if name.startswith(query):
+            return 2.0
+        return 1.0 + len(query) / max(len(name), 1) * 0.5
+    
+    def _result(self, doc_id: int, score: float) -> Dict[str, Any]:
+        """
+        Build a result dictionary.
+        
+        Args:
+            doc_id: Document id
+            score: Match score
+        
+        Returns:
+            Result dictionary
+        """
+        mtime = self._column("mtimes")[doc_id]
+        extension = self._extension_table[self._column("extensions")[doc_id]]
+        path = self._path(doc_id)
+        return {
+            "path": path,
+            "name": path.rsplit("/", 1)[-1],
+            "size": self._column("sizes")[doc_id],
+            "modified": datetime.fromtimestamp(mtime).isoformat() if mtime else None,
+            "extension": extension,
+            "score": round(score, 3)
+        }
+    
+    def save(self, file_path: Path) -> bool:
+        """
+        Save search index to disk.
+        
+        Layout: magic, header length, JSON header (section offsets and the
+        trigram table), then raw little-endian arrays.
+        
+        Args:
+            file_path: Destination file
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        self._materialize()
+        live = [doc_id for doc_id in range(len(self._paths)) if doc_id not in self._deleted]
+        remap = None
+        if self._deleted:
+            remap = {old: new for new, old in enumerate(live)}
+        
+        sections: List[Tuple[str, bytes]] = []
+        
+        def add_strings(name: str, values: List[str]) -> None:
+            blob = bytearray()
+            offsets = array("Q", [0])
+            for doc_id in live:
+                blob += values[doc_id].encode("utf-8")
+                offsets.append(len(blob))
+            sections.append((f"{name}_offsets", offsets.tobytes()))
+            sections.append((name, bytes(blob)))
+        
+        add_strings("paths", self._paths)
+        add_strings("names", self._names)
+        sizes = array("q", (self._sizes[i] for i in live))
+        mtimes = array("d", (self._mtimes[i] for i in live))
+        sections.append(("sizes", sizes.tobytes()))
+        sections.append(("mtimes", mtimes.tobytes()))
+        for name, values in (("sizes", sizes), ("mtimes", mtimes)):
+            order = array("I", sorted(range(len(values)), key=values.__getitem__))
+            sections.append((f"order_{name}", order.tobytes()))
+        sections.append(("extensions", array("H", (self._extensions[i] for i in live)).tobytes()))
+        
+        postings_blob = bytearray()
+        trigram_table: Dict[str, List[int]] = {}
+        item_size = array("I").itemsize
+        for trigram, posting in self._postings.items():
+            if remap is not None:
+                posting = array("I", (remap[doc_id] for doc_id in posting if doc_id in remap))
+            if not posting:
+                continue
+            trigram_table[trigram] = [len(postings_blob) // item_size, len(posting)]
+            postings_blob += posting.tobytes()
+        sections.append(("postings", bytes(postings_blob)))
+        
+        offset = 0
+        section_table = {}
+        for name, data in sections:
+            section_table[name] = [offset, len(data)]
+            offset += len(data)
+        
+        header = json.dumps({
+            "indexed_at": self.indexed_at,
+            "doc_count": len(live),
+            "byteorder": "little" if array("I", [1]).tobytes()[0] == 1 else "big",
+            "extensions": self._extension_table,
+            "sections": section_table,
+            "trigrams": trigram_table
+        }, ensure_ascii=False).encode("utf-8")
+        
+        file_path = Path(file_path)
+        temp_path = temp_path_for(file_path)
+        try:
+            with open(temp_path, "wb") as f:
+                f.write(_MAGIC)
+                f.write(struct.pack("<Q", len(header)))
+                f.write(header)
+                for _, data in sections:
+                    f.write(data)
+            publish(temp_path, file_path)
+            return True
+        except IOError as e:
+            discard(temp_path)
+            print(f"Error saving search index: {e}")
+            return False
+    
+    @classmethod
+    def load(cls, file_path: Path) -> Optional["SearchIndex"]:
+        """
+        Open a saved search index (memory-mapped, loaded lazily).
+        
+        Args:
+            file_path: Search index file
+        
+        Returns:
+            SearchIndex instance or None if missing/invalid
+        """
+        try:
+            f = open(file_path, "rb")
+        except (FileNotFoundError, IOError):
+            return None
+        
+        try:
+            if f.read(len(_MAGIC)) != _MAGIC:
+                f.close()
+                return None
+            header_length = struct.unpack("<Q", f.read(8))[0]
+            header = json.loads(f.read(header_length).decode("utf-8"))
+            data_start = len(_MAGIC) + 8 + header_length
+            if header["doc_count"] == 0:
+                f.close()
+                search_index = cls()
+                search_index.indexed_at = header.get("indexed_at")
+                return search_index
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (IOError, ValueError, struct.error) as e:
+            f.close()
+            print(f"Error loading search index: {e}")
+            return None
+        
+        native = "little" if array("I", [1]).tobytes()[0] == 1 else "big"
+        if header.get("byteorder", native) != native:
+            f.close()
+            return None
+        
+        search_index = cls()
+        search_index.indexed_at = header.get("indexed_at")
+        search_index._doc_count = header["doc_count"]
+        search_index._extension_table = header["extensions"]
+        search_index._extension_ids = {ext: i for i, ext in enumerate(header["extensions"])}
+        search_index._trigram_table = header["trigrams"]
+        search_index._sections = {
+            name: (data_start + offset, length)
+            for name, (offset, length) in header["sections"].items()
+        }
+        search_index._file = f
+        search_index._mmap = mapped
+        return search_index
+    
+    def close(self) -> None:
+        """Release the memory map of a loaded index."""
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+    
+    def _materialize(self) -> None:
+        """Copy a memory-mapped index into mutable in-memory structures."""
+        if self._mmap is None:
+            return
+        
+        count = self._doc_count
+        paths = [self._path(i) for i in range(count)]
+        names = [self._name(i) for i in range(count)]
+        sizes = array("q", self._column("sizes"))
+        mtimes = array("d", self._column("mtimes"))
+        extensions = array("H", self._column("extensions"))
+        postings = {trigram: array("I", self._posting(trigram)) for trigram in self._trigram_table}
+        
+        self.close()
+        self._paths, self._names = paths, names
+        self._sizes, self._mtimes, self._extensions = sizes, mtimes, extensions
+        self._postings = postings
+        self._trigram_table = {}
+    
+    def _view(self, section: str, typecode: str) -> memoryview:
+        """
+        Get a typed zero-copy view of a mapped section.
+        
+        Args:
+            section: Section name
+            typecode: array/struct type code
+        
+        Returns:
+            memoryview over the section
+        """
+        view = self._views.get(section)
+        if view is None:
+            offset, length = self._sections[section]
+            view = memoryview(self._mmap)[offset:offset + length]
+            if typecode != "B":
+                view = view.cast(typecode)
+            self._views[section] = view
+        return view
+    
+    def _column(self, name: str) -> Any:
+        """
+        Get a numeric column.
+        
+        Args:
+            name: "sizes", "mtimes" or "extensions"
+        
+        Returns:
+            Indexable sequence
+        """
+        if self._mmap is None:
+            return getattr(self, f"_{name}")
+        return self._view(name, {"sizes": "q", "mtimes": "d", "extensions": "H"}[name])
+    
+    def _posting(self, trigram: str) -> Any:
+        """
+        Get the posting list of a trigram.
+        
+        Args:
+            trigram: Trigram
+        
+        Returns:
+            Sorted sequence of document ids
+        """
+        if self._mmap is None:
+            return self._postings.get(trigram, ())
+        entry = self._trigram_table.get(trigram)
+        if entry is None:
+            return ()
+        start, count = entry
+        return self._view("postings", "I")[start:start + count]
+    
+    def _string(self, section: str, doc_id: int) -> str:
+        """
+        Decode one string from a mapped string section.
+        
+        Args:
+            section: "paths" or "names"
+            doc_id: Document id
+        
+        Returns:
+            Decoded string
+        """
+        offsets = self._view(f"{section}_offsets", "Q")
+        blob = self._view(section, "B")
+        return bytes(blob[offsets[doc_id]:offsets[doc_id + 1]]).decode("utf-8")
+    
+    def _path(self, doc_id: int) -> str:
+        """Get relative path of a document."""
+        if self._mmap is None:
+            return self._paths[doc_id]
+        return self._string("paths", doc_id)
+    
+    def _name(self, doc_id: int) -> str:
+        """Get lowercase file name of a document."""
+        if self._mmap is None:
+            return self._names[doc_id]
+        return self._string("names", doc_id)
+    
+    def _extension_id(self, extension: str) -> int:
+        """
+        Intern an extension.
+        
+        Args:
+            extension: File extension
+        
+        Returns:
+            Extension id
+        """
+        extension = (extension or "").lower()
+        extension_id = self._extension_ids.get(extension)
+        if extension_id is None:
+            extension_id = len(self._extension_table)
+            self._extension_table.append(extension)
+            self._extension_ids[extension] = extension_id
+        return extension_id
+    
+    def _parse_mtime(self, modified: Optional[str]) -> float:
+        """
+        Convert an ISO modification time to a POSIX timestamp.
+        
+        Args:
+            modified: ISO timestamp string
+        
+        Returns:
+            POSIX timestamp (0.0 if unknown)
+        """
+        if not modified:
+            return 0.0
+        try:
+            return datetime.fromisoformat(modified).timestamp()
+        except ValueError:
+            return 0.0
+
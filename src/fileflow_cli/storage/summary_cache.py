@@ -0,0 +1,87 @@
+"""Cache of directory summaries for LLM payloads."""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+from .atomic_write import write_atomic
+
+
+class SummaryCache:
+    """
+    Stores what the LLM payload builder derived from the index.
+    
+    The cache holds two things, in one gzip-compressed JSON file:
+    
+    - the directory tree (one row per directory with its file counts and
+      content hashes), valid for one state of the index only: it carries
+      the stamp of the record table it was read from;
+    - rendered texts (directory summaries and file listings), keyed by
+      payload mode and the content hash of what they describe, so they
+      stay valid across re-indexing for every subtree that did not change.
+    """
+    
+    CACHE_VERSION = 1
+    CACHE_FILENAME = "llm_summaries.json.gz"
+    
+    # zlib level of the cache file (speed matters more than size)
+    COMPRESSION_LEVEL = 1
+    
+    def __init__(self, config_dir: Path):
+        """
+        Initialize summary cache.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+        """
+        self.config_dir = Path(config_dir)
+        self.cache_file = self.config_dir / self.CACHE_FILENAME
+    
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the cache.
+        
+        Returns:
+            Dictionary with "stamp" and "tree" (None if no tree is cached)
+            and "texts" (empty if there is no usable cache)
+        """
+        empty = {"stamp": None, "tree": None, "texts": {}}
+        try:
+            with gzip.open(self.cache_file, "rt", encoding="utf-8") as f:
+                cache = json.load(f)
+        except FileNotFoundError:
+            return empty
+        except (IOError, EOFError, ValueError) as e:
+            print(f"Error loading summary cache: {e}")
+            return empty
+        
+        if not isinstance(cache, dict) or cache.get("version") != self.CACHE_VERSION:
+            return empty
+        return {
+            "stamp": cache.get("stamp"),
+            "tree": cache.get("tree"),
+            "texts": cache.get("texts") or {}
+        }
+    
+    def save(self, stamp: Optional[List[Any]], tree: Optional[List[List[Any]]], texts: Dict[str, str]) -> bool:
+        """
+        Replace the cache.
+        
+        Args:
+            stamp: Stamp of the record table the tree was read from
+            tree: Directory rows (None to keep no tree)
+            texts: Rendered texts by key
+        
+        Returns:
+            True if saved successfully, False otherwise
+        """
+        cache = {"version": self.CACHE_VERSION, "stamp": stamp, "tree": tree, "texts": texts}
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            data = json.dumps(cache, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            write_atomic(self.cache_file, gzip.compress(data, self.COMPRESSION_LEVEL))
+            return True
+        except (IOError, TypeError, ValueError) as e:
+            print(f"Error saving summary cache: {e}")
+            return False
@@ -0,0 +1,677 @@
+"""Content-addressed, delta-compressed version storage for FileFlowCLI."""
+
+import gzip
+import hashlib
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List, Iterable, Tuple
+
+from ..utils.metrics import get_metrics
+from .atomic_write import write_atomic
+from .index_storage import IndexStorage
+
+
+# Record fields kept in versions: the directory structure and what
+# identifies file contents, never previews or extracted metadata. The
+# path is stored next to the object key, and the name is taken from it.
+# Objects store the values in this order.
+VERSION_FIELDS = ("size", "modified", "hash", "extension", "mime_type", "magic", "is_directory", "inode")
+
+# Object index entry: 16-byte object key, u64 offset of its pack chunk
+_INDEX_ENTRY = struct.Struct("<16sQ")
+
+# Pack chunk: u32 length, then zlib-compressed JSON {key: field values}
+_CHUNK_HEADER = struct.Struct("<I")
+
+# zlib/gzip level of manifests and pack chunks
+COMPRESSION_LEVEL = 6
+
+# A version stores a full snapshot once rebuilding it from the last
+# snapshot would read more delta entries than this share of the tree
+SNAPSHOT_DELTA_RATIO = 0.5
+
+
+def _object_key(record: Dict[str, Any]) -> Tuple[str, List[Any]]:
+    """
+    Get the content address of the versioned fields of a record.
+    
+    Args:
+        record: File metadata dictionary
+    
+    Returns:
+        Tuple of (hex object key, versioned field values)
+    """
+    values = [record.get(field) for field in VERSION_FIELDS]
+    # repr of str, int, bool and None values is canonical and much faster
+    # than JSON; surrogate escapes in names keep it encodable
+    data = repr(values).encode("utf-8", "backslashreplace")
+    return hashlib.blake2b(data, digest_size=16).hexdigest(), values
+
+
+def _record(path: str, values: List[Any]) -> Dict[str, Any]:
+    """
+    Rebuild a record from its path and object.
+    
+    Args:
+        path: Relative path
+        values: Versioned field values
+    
+    Returns:
+        File metadata dictionary
+    """
+    record = {"path": path, "name": _record_name(path)}
+    record.update(zip(VERSION_FIELDS, values))
+    return record
+
+
+def _record_name(path: str) -> str:
+    """
+    Get the file name of an index path.
+    
+    Args:
+        path: Relative path
+    
+    Returns:
+        Last path component
+    """
+    return path.replace("\\", "/").rsplit("/", 1)[-1]
+
+
+class VersionStorage:
+    """
+    Stores the version history of an index.
+    
+    Each version is a delta against its parent: the paths it added or
+    changed (with the object key of their fields) and the paths it
+    removed (with the key they had, so deltas can be read backwards).
+    Record fields are content-addressed objects stored once in an
+    append-only pack, so unchanged and moved files cost nothing in later
+    versions. Every manifest and pack chunk is compressed.
+    
+    A version also stores a full snapshot (path to key) when rebuilding
+    it from the last snapshot would read more than SNAPSHOT_DELTA_RATIO
+    of the tree in deltas, or after max_delta_chain deltas. Rebuilding
+    a version therefore reads one snapshot and a bounded chain of deltas,
+    and get_changes() reads only the delta of the version.
+    
+    Layout of .fileflow_cli/versions/:
+    - versions.jsonl: one header line per version; appending the line
+      commits the version, and a torn last line is ignored
+    - vN.json.gz: manifest of version N (delta and optional snapshot)
+    - objects.pack / objects.idx: object chunks and their index
+    
+    The caller should hold the IndexLock while creating versions.
+    """
+    
+    VERSIONS_DIRNAME = "versions"
+    LOG_FILENAME = "versions.jsonl"
+    PACK_FILENAME = "objects.pack"
+    PACK_INDEX_FILENAME = "objects.idx"
+    
+    def __init__(self, config_dir: Path, max_delta_chain: int = 256):
+        """
+        Initialize version storage.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            max_delta_chain: Most deltas read to rebuild a version
+        """
+        self.config_dir = Path(config_dir)
+        self.versions_dir = self.config_dir / self.VERSIONS_DIRNAME
+        self.log_file = self.versions_dir / self.LOG_FILENAME
+        self.pack_file = self.versions_dir / self.PACK_FILENAME
+        self.pack_index_file = self.versions_dir / self.PACK_INDEX_FILENAME
+        self.max_delta_chain = max(1, max_delta_chain)
+        
+        # Loaded lazily: version headers, object key -> pack chunk offset,
+        # and the entries (path -> key) of the latest version
+        self._headers: Optional[List[Dict[str, Any]]] = None
+        self._objects: Optional[Dict[bytes, int]] = None
+        self._head_entries: Optional[Dict[str, str]] = None
+        self._metrics = get_metrics()
+    
+    def create_version(
+        self,
+        index_storage: IndexStorage,
+        description: str,
+        llm_suggestions: Optional[Any] = None
+    ) -> Optional[int]:
+        """
+        Record the current index as a new version.
+        
+        The index is streamed from its record table; only objects that
+        are not stored yet are written. The version header keeps the
+        indexed_at of the index.
+        
+        Args:
+            index_storage: Storage of the index to record
+            description: Operation description
+            llm_suggestions: LLM recommendations behind the operation (optional)
+        
+        Returns:
+            New version number or None if it could not be saved
+        """
+        record_table = index_storage.get_record_table()
+        if record_table is None:
+            return self.create_version_from_records([], description, llm_suggestions)
+        return self.create_version_from_records(
+            record_table.iter_records(), description, llm_suggestions, record_table.indexed_at
+        )
+    
+    def create_version_from_records(
+        self,
+        records: Iterable[Dict[str, Any]],
+        description: str,
+        llm_suggestions: Optional[Any] = None,
+        indexed_at: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Record a set of index records as a new version.
+        
+        Args:
+            records: File metadata dictionaries of the version
+            description: Operation description
+            llm_suggestions: LLM recommendations behind the operation (optional)
+            indexed_at: Timestamp of the index the records come from (optional)
+        
+        Returns:
+            New version number or None if it could not be saved
+        """
+        with self._timer("create_version").time():
+            try:
+                objects = self._load_objects()
+                parent_entries = self._head_state()
+                
+                # Hash join on path against the parent version
+                remaining = dict(parent_entries)
+                entries: Dict[str, str] = {}
+                upserts: List[List[Optional[str]]] = []
+                new_objects: Dict[str, List[Any]] = {}
+                for record in records:
+                    path = record["path"]
+                    key, values = _object_key(record)
+                    entries[path] = key
+                    old_key = remaining.pop(path, None)
+                    if old_key != key:
+                        upserts.append([path, key, old_key])
+                    if key not in new_objects and bytes.fromhex(key) not in objects:
+                        new_objects[key] = values
+                removes = [[path, key] for path, key in remaining.items()]
+                
+                return self._commit(entries, upserts, removes, new_objects, description, llm_suggestions, indexed_at)
+            
+            except (IOError, KeyError, TypeError, ValueError) as e:
+                print(f"Error saving version: {e}")
+                return None
+    
+    def create_version_from_changes(
+        self,
+        upserted: Iterable[Dict[str, Any]],
+        removed_paths: Iterable[str],
+        description: str,
+        llm_suggestions: Optional[Any] = None,
+        indexed_at: Optional[str] = None
+    ) -> Optional[int]:
+        """
+        Record a new version from the changes made to the latest one.
+        
+        Costs O(changes) instead of reading the whole index, for callers
+        that know exactly what they changed (e.g. file operations). The
+        latest version must match the index the changes were made to
+        (compare its "indexed_at"); otherwise use create_version.
+        
+        Args:
+            upserted: Records added or changed (moved files under their new path)
+            removed_paths: Paths that no longer exist (moved files under their old path)
+            description: Operation description
+            llm_suggestions: LLM recommendations behind the operation (optional)
+            indexed_at: Timestamp of the changed index (optional)
+        
+        Returns:
+            New version number or None if there is no version to start
+            from or it could not be saved
+        """
+        with self._timer("create_version").time():
+            try:
+                if not self._load_headers():
+                    print("Error saving version: no earlier version to record changes against")
+                    return None
+                objects = self._load_objects()
+                # Updated in place: the parent entries are not needed again
+                entries = self._head_state()
+                
+                removes = []
+                for path in removed_paths:
+                    old_key = entries.pop(path, None)
+                    if old_key is not None:
+                        removes.append([path, old_key])
+                
+                upserts: List[List[Optional[str]]] = []
+                new_objects: Dict[str, List[Any]] = {}
+                for record in upserted:
+                    path = record["path"]
+                    key, values = _object_key(record)
+                    old_key = entries.get(path)
+                    entries[path] = key
+                    if old_key != key:
+                        upserts.append([path, key, old_key])
+                    if key not in new_objects and bytes.fromhex(key) not in objects:
+                        new_objects[key] = values
+                
+                return self._commit(entries, upserts, removes, new_objects, description, llm_suggestions, indexed_at)
+            
+            except (IOError, KeyError, TypeError, ValueError) as e:
+                print(f"Error saving version: {e}")
+                self._head_entries = None
+                return None
+    
+    def _commit(
+        self,
+        entries: Dict[str, str],
+        upserts: List[List[Optional[str]]],
+        removes: List[List[str]],
+        new_objects: Dict[str, List[Any]],
+        description: str,
+        llm_suggestions: Optional[Any],
+        indexed_at: Optional[str]
+    ) -> int:
+        """
+        Write the objects, manifest and header of a new version.
+        
+        Args:
+            entries: Entries (path to object key) of the new version
+            upserts: [path, key, old key] entries of the delta
+            removes: [path, old key] entries of the delta
+            new_objects: Objects not stored yet
+            description: Operation description
+            llm_suggestions: LLM recommendations behind the operation
+            indexed_at: Timestamp of the index the version was taken from
+        
+        Returns:
+            New version number
+        """
+        headers = self._load_headers()
+        parent = headers[-1] if headers else None
+        if parent is None:
+            # The first version adds everything
+            upserts = [[path, key, None] for path, key in entries.items()]
+        
+        number = parent["version"] + 1 if parent else 1
+        chain = parent["chain"] + 1 if parent else 0
+        delta_entries = (parent["delta_entries"] if parent else 0) + len(upserts) + len(removes)
+        snapshot = (
+            parent is None
+            or chain >= self.max_delta_chain
+            or delta_entries > len(entries) * SNAPSHOT_DELTA_RATIO
+        )
+        if snapshot:
+            chain, delta_entries = 0, 0
+        
+        self.versions_dir.mkdir(parents=True, exist_ok=True)
+        self._append_objects(new_objects)
+        
+        manifest: Dict[str, Any] = {
+            "version": number,
+            "parent": parent["version"] if parent else None,
+            # The first version's delta is its snapshot
+            "upserts": upserts if parent else [],
+            "removes": removes
+        }
+        if snapshot:
+            manifest["entries"] = sorted(entries.items())
+        write_atomic(
+            self._manifest_path(number),
+            gzip.compress(json.dumps(manifest, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+        )
+        
+        header = {
+            "version": number,
+            "parent": manifest["parent"],
+            "created_at": datetime.now().isoformat(),
+            "indexed_at": indexed_at,
+            "description": description,
+            "llm_suggestions": llm_suggestions,
+            "file_count": len(entries),
+            "snapshot": snapshot,
+            "chain": chain,
+            "delta_entries": delta_entries,
+            "changes": self._count_changes(upserts, removes)
+        }
+        # Appending the header commits the version
+        with open(self.log_file, "a", encoding="utf-8") as f:
+            f.write(json.dumps(header, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        
+        headers.append(header)
+        self._head_entries = entries
+        return number
+    
+    @staticmethod
+    def _count_changes(upserts: List[List[Optional[str]]], removes: List[List[str]]) -> Dict[str, int]:
+        """
+        Count the changes of a delta by kind.
+        
+        A removed path whose object reappears at a new path is a move.
+        
+        Args:
+            upserts: [path, key, old key] entries
+            removes: [path, old key] entries
+        
+        Returns:
+            Counts of added, removed, modified and moved files
+        """
+        removed_keys: Dict[str, int] = {}
+        for _, key in removes:
+            removed_keys[key] = removed_keys.get(key, 0) + 1
+        
+        counts = {"added": 0, "removed": 0, "modified": 0, "moved": 0}
+        for _, key, old_key in upserts:
+            if old_key is not None:
+                counts["modified"] += 1
+            elif removed_keys.get(key):
+                removed_keys[key] -= 1
+                counts["moved"] += 1
+            else:
+                counts["added"] += 1
+        counts["removed"] = len(removes) - counts["moved"]
+        return counts
+    
+    def list_versions(self) -> List[Dict[str, Any]]:
+        """
+        Get the headers of all versions (oldest first).
+        
+        Returns:
+            List of version header dictionaries
+        """
+        return list(self._load_headers())
+    
+    def get_version(self, number: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the header of a version.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            Version header dictionary or None if there is no such version
+        """
+        headers = self._load_headers()
+        if 1 <= number <= len(headers):
+            return headers[number - 1]
+        return None
+    
+    @property
+    def latest_version(self) -> Optional[int]:
+        """Number of the latest version (None if there is none)."""
+        headers = self._load_headers()
+        return headers[-1]["version"] if headers else None
+    
+    def load_version(self, number: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rebuild the records of a version.
+        
+        Reads the nearest snapshot at or before the version and the
+        deltas after it, then the pack chunks of the objects it uses.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            File metadata dictionaries sorted by path, or None if the
+            version does not exist or could not be read
+        """
+        with self._timer("load_version").time():
+            try:
+                entries = self._entries_at(number)
+                if entries is None:
+                    return None
+                objects = self._read_objects(set(entries.values()))
+                return [
+                    _record(path, objects[key])
+                    for path, key in sorted(entries.items())
+                ]
+            except (IOError, KeyError, TypeError, ValueError) as e:
+                print(f"Error loading version {number}: {e}")
+                return None
+    
+    def get_changes(self, number: int) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Get what a version changed relative to its parent.
+        
+        Reads only the delta of the version and the objects it refers
+        to, whatever the size of the tree.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            Dictionary with "upserts" (records added or changed, with
+            "old" holding the previous record of changed paths) and
+            "removes" (records removed), or None if the version does not
+            exist or could not be read
+        """
+        try:
+            if self.get_version(number) is None:
+                return None
+            manifest = self._read_manifest(number)
+            if manifest["parent"] is None:
+                manifest["upserts"] = [[path, key, None] for path, key in manifest["entries"]]
+            
+            keys = {key for _, key, _ in manifest["upserts"]}
+            keys.update(old_key for _, _, old_key in manifest["upserts"] if old_key)
+            keys.update(key for _, key in manifest["removes"])
+            objects = self._read_objects(keys)
+            
+            upserts = []
+            for path, key, old_key in manifest["upserts"]:
+                record = _record(path, objects[key])
+                if old_key:
+                    record["old"] = _record(path, objects[old_key])
+                upserts.append(record)
+            removes = [
+                _record(path, objects[key])
+                for path, key in manifest["removes"]
+            ]
+            return {"upserts": upserts, "removes": removes}
+        except (IOError, KeyError, TypeError, ValueError) as e:
+            print(f"Error loading version {number}: {e}")
+            return None
+    
+    def _entries_at(self, number: int) -> Optional[Dict[str, str]]:
+        """
+        Get the entries (path to object key) of a version.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            Entries dictionary or None if there is no such version
+        """
+        headers = self._load_headers()
+        if not 1 <= number <= len(headers):
+            return None
+        if number == len(headers) and self._head_entries is not None:
+            return dict(self._head_entries)
+        
+        start = number
+        while not headers[start - 1]["snapshot"]:
+            start -= 1
+        
+        entries = dict(self._read_manifest(start)["entries"])
+        for version in range(start + 1, number + 1):
+            manifest = self._read_manifest(version)
+            for path, _ in manifest["removes"]:
+                entries.pop(path, None)
+            for path, key, _ in manifest["upserts"]:
+                entries[path] = key
+        return entries
+    
+    def _head_state(self) -> Dict[str, str]:
+        """
+        Get the entries of the latest version (cached).
+        
+        Returns:
+            Entries dictionary
+        """
+        if self._head_entries is None:
+            headers = self._load_headers()
+            self._head_entries = self._entries_at(len(headers)) if headers else {}
+        return self._head_entries
+    
+    def _manifest_path(self, number: int) -> Path:
+        """
+        Get the manifest file of a version.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            Manifest file path
+        """
+        return self.versions_dir / f"v{number}.json.gz"
+    
+    def _read_manifest(self, number: int) -> Dict[str, Any]:
+        """
+        Read the manifest of a version.
+        
+        Args:
+            number: Version number
+        
+        Returns:
+            Manifest dictionary
+        """
+        with open(self._manifest_path(number), "rb") as f:
+            return json.loads(gzip.decompress(f.read()).decode("utf-8"))
+    
+    def _load_headers(self) -> List[Dict[str, Any]]:
+        """
+        Load the version headers from the version log (cached).
+        
+        Returns:
+            List of version header dictionaries
+        """
+        if self._headers is not None:
+            return self._headers
+        
+        headers: List[Dict[str, Any]] = []
+        try:
+            with open(self.log_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        header = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # Torn last line: the version was not committed
+                    if header.get("version") != len(headers) + 1:
+                        break
+                    headers.append(header)
+        except FileNotFoundError:
+            pass
+        self._headers = headers
+        return headers
+    
+    def _load_objects(self) -> Dict[bytes, int]:
+        """
+        Load the object index (cached).
+        
+        Returns:
+            Dictionary of object key bytes to pack chunk offset
+        """
+        if self._objects is not None:
+            return self._objects
+        
+        objects: Dict[bytes, int] = {}
+        try:
+            with open(self.pack_index_file, "rb") as f:
+                data = f.read()
+            # A torn last entry (interrupted append) is ignored
+            usable = len(data) - len(data) % _INDEX_ENTRY.size
+            for key, offset in _INDEX_ENTRY.iter_unpack(data[:usable]):
+                objects[key] = offset
+        except FileNotFoundError:
+            pass
+        self._objects = objects
+        return objects
+    
+    def _append_objects(self, new_objects: Dict[str, List[Any]]) -> None:
+        """
+        Append new objects to the pack as one compressed chunk.
+        
+        The chunk is written before its index entries, so the index never
+        points into a torn chunk, and both are on disk before the version
+        header that refers to them is appended.
+        
+        Args:
+            new_objects: Versioned field values keyed by hex object key
+        """
+        if not new_objects:
+            return
+        
+        chunk = zlib.compress(json.dumps(new_objects, separators=(",", ":")).encode("utf-8"), COMPRESSION_LEVEL)
+        with open(self.pack_file, "ab") as f:
+            offset = f.tell()
+            f.write(_CHUNK_HEADER.pack(len(chunk)))
+            f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        
+        objects = self._load_objects()
+        entries = bytearray()
+        for key in new_objects:
+            key_bytes = bytes.fromhex(key)
+            entries += _INDEX_ENTRY.pack(key_bytes, offset)
+            objects[key_bytes] = offset
+        with open(self.pack_index_file, "ab") as f:
+            # Drop a torn last entry so the new entries stay aligned
+            torn = f.tell() % _INDEX_ENTRY.size
+            if torn:
+                f.truncate(f.tell() - torn)
+            f.write(entries)
+            f.flush()
+            os.fsync(f.fileno())
+    
+    def _read_objects(self, keys: Iterable[str]) -> Dict[str, List[Any]]:
+        """
+        Read objects from the pack, decompressing each chunk once.
+        
+        Args:
+            keys: Hex object keys
+        
+        Returns:
+            Versioned field values keyed by hex object key
+        
+        Raises:
+            KeyError: If an object is missing
+        """
+        objects = self._load_objects()
+        by_chunk: Dict[int, List[str]] = {}
+        for key in keys:
+            by_chunk.setdefault(objects[bytes.fromhex(key)], []).append(key)
+        
+        found: Dict[str, List[Any]] = {}
+        with open(self.pack_file, "rb") as f:
+            for offset in sorted(by_chunk):
+                f.seek(offset)
+                length = _CHUNK_HEADER.unpack(f.read(_CHUNK_HEADER.size))[0]
+                chunk = json.loads(zlib.decompress(f.read(length)).decode("utf-8"))
+                for key in by_chunk[offset]:
+                    found[key] = chunk[key]
+        return found
+    
+    def _timer(self, operation: str) -> Any:
+        """
+        Get the latency histogram of a storage operation.
+        
+        Args:
+            operation: Operation name
+        
+        Returns:
+            Histogram (no-op while metrics are disabled)
+        """
+        return self._metrics.histogram(
+            "fileflow_storage_seconds", "Index storage operation latency", operation=operation
+        )
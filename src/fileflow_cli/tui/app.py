@@ -4,13 +4,23 @@ from textual.app import App, ComposeResult
 from textual.containers import Container, Horizontal, Vertical
 from textual.widgets import Header, Footer, Static, Label
 from textual.binding import Binding
+from rich.text import Text
 
 from ..i18n.translations import init_translations, t
-from ..utils.config import init_config, get_config
+from ..utils.config import init_config, get_config, get_performance_profile
+from ..utils.error_handler import init_error_handler, LLMError
+from ..utils.metrics import init_metrics
 from ..storage.index_storage import IndexStorage
 from ..storage.checkpoint_manager import CheckpointManager
-from .screens.indexing import IndexingScreen
+from ..storage.index_lock import IndexLock
 from pathlib import Path
+from typing import Dict, Any, Optional
+
+# Screens and the enricher are imported when first used, so startup only
+# pays for the main screen
+
+# Payload lines shown on the analysis screen
+PAYLOAD_PREVIEW_LINES = 40
 
 
 class FileFlowCLIApp(App):
@@ -92,9 +102,15 @@ class FileFlowCLIApp(App):
         Binding("h", "help", "Help", priority=True),
     ]
     
-    def __init__(self):
-        """Initialize the application."""
+    def __init__(self, profile: Optional[str] = None):
+        """
+        Initialize the application.
+        
+        Args:
+            profile: Profile indexing runs in this mode ("sampling" or "cprofile")
+        """
         super().__init__()
+        self.profile = profile
         # Initialize translations
         language = get_config("language", "en")
         init_translations(language)
@@ -102,8 +118,17 @@ class FileFlowCLIApp(App):
         config_manager = init_config()
         self.config_dir = config_manager.get_config_dir()
         self.working_directory = config_manager.working_directory
+        # Before any component looks up its metrics
+        init_metrics(get_config("metrics_enabled", False))
+        init_error_handler(
+            self.config_dir / "logs",
+            max_errors=get_config("error_log_size", 200),
+            log_max_bytes=get_config("error_log_max_bytes", 1048576),
+            log_backups=get_config("error_log_backups", 3)
+        )
         self.index_storage = IndexStorage(self.config_dir)
         self.checkpoint_manager = CheckpointManager(self.config_dir)
+        self.enricher = None
     
     def compose(self) -> ComposeResult:
         """Create child widgets for the app."""
@@ -135,16 +160,87 @@ class FileFlowCLIApp(App):
         """Called when app is mounted."""
         self.title = t("app.title")
         self.sub_title = t("app.subtitle")
-        self._update_status_bar()
-        self._update_main_content()
+        self.query_one("#status_indexing", Static).update(f"{t('status.indexing')}: ...")
+        self.query_one("#main_content", Static).update(t("content.welcome"))
+        # Index and checkpoint state load after the first frame
+        self.call_after_refresh(self.refresh_status)
     
-    def _update_status_bar(self) -> None:
-        """Update status bar information."""
-        # Check indexing status
-        indexed_at = self.index_storage.get_indexed_at()
+    def refresh_status(self) -> None:
+        """Reload index and checkpoint state in the background, then redraw."""
+        self.run_worker(self._load_status, thread=True, group="status", exclusive=True)
+    
+    def _load_status(self) -> None:
+        """Read index and checkpoint state (runs in a worker thread)."""
         checkpoint_exists = self.checkpoint_manager.checkpoint_exists()
+        status = {
+            "header": self.index_storage.get_index_header(),
+            "checkpoint_exists": checkpoint_exists,
+            "checkpoint": self.checkpoint_manager.get_checkpoint_progress() if checkpoint_exists else None,
+            # Another process indexing this directory; the last complete
+            # index stays readable meanwhile
+            "lock_holder": IndexLock(self.config_dir).holder()
+        }
+        self.call_from_thread(self._apply_status, status)
+    
+    def _apply_status(self, status: Dict[str, Any]) -> None:
+        """
+        Show loaded status and start enrichment if the index needs it.
         
-        if checkpoint_exists:
+        Args:
+            status: State read by _load_status
+        """
+        self._update_status_bar(status)
+        self._update_main_content(status)
+        self.start_enrichment(status)
+    
+    def start_enrichment(self, status: Dict[str, Any]) -> None:
+        """
+        Start the background metadata enrichment pass if the index needs it.
+        
+        Args:
+            status: State read by _load_status
+        """
+        header = status["header"]
+        if status["checkpoint_exists"] or not header or header.get("enriched_at"):
+            return
+        if status["lock_holder"] is not None:
+            return
+        if self.enricher is not None:
+            return
+        
+        from ..core.enrichment import MetadataEnricher
+        
+        self.enricher = MetadataEnricher(self.config_dir, self.working_directory)
+        self.enricher.start()
+    
+    def stop_enrichment(self) -> None:
+        """Stop the background metadata enrichment pass (results are kept in its segment)."""
+        if self.enricher is not None:
+            # Not joined: a file being read finishes in the background
+            self.enricher.stop(wait=False)
+            self.enricher = None
+    
+    def _update_status_bar(self, status: Dict[str, Any]) -> None:
+        """
+        Update status bar information.
+        
+        Args:
+            status: State read by _load_status
+        """
+        header = status["header"] or {}
+        
+        # Check indexing status
+        indexed_at = header.get("indexed_at")
+        checkpoint_exists = status["checkpoint_exists"]
+        
+        lock_holder = status["lock_holder"]
+        if lock_holder is not None:
+            status_text = f"{t('status.indexing')}: " + t(
+                "indexing.locked",
+                pid=lock_holder.get("pid", "?"),
+                purpose=lock_holder.get("purpose", "index")
+            )
+        elif checkpoint_exists:
             status_text = f"{t('status.indexing')}: {t('indexing.in_progress')} (checkpoint)"
         elif indexed_at:
             status_text = f"{t('status.indexing')}: {t('indexing.complete')}"
@@ -154,7 +250,7 @@ class FileFlowCLIApp(App):
         self.query_one("#status_indexing", Static).update(status_text)
         
         # File count
-        file_count = self.index_storage.get_file_count()
+        file_count = header.get("file_count", 0)
         files_text = f"{t('status.files_indexed')}: {file_count}"
         self.query_one("#status_files", Static).update(files_text)
         
@@ -163,15 +259,21 @@ class FileFlowCLIApp(App):
         lang_text = f"{t('status.language')}: {lang.upper()}"
         self.query_one("#status_language", Static).update(lang_text)
     
-    def _update_main_content(self) -> None:
-        """Update main content area."""
-        indexed_at = self.index_storage.get_indexed_at()
-        file_count = self.index_storage.get_file_count()
-        checkpoint_exists = self.checkpoint_manager.checkpoint_exists()
+    def _update_main_content(self, status: Dict[str, Any]) -> None:
+        """
+        Update main content area.
+        
+        Args:
+            status: State read by _load_status
+        """
+        header = status["header"] or {}
+        indexed_at = header.get("indexed_at")
+        file_count = header.get("file_count", 0)
+        checkpoint_exists = status["checkpoint_exists"]
         
         if checkpoint_exists:
             # Checkpoint exists - offer to resume
-            progress = self.checkpoint_manager.get_checkpoint_progress()
+            progress = status["checkpoint"]
             if progress:
                 content = (
                     f"{t('content.welcome')}\n\n"
@@ -207,26 +309,30 @@ class FileFlowCLIApp(App):
     
     def action_quit(self) -> None:
         """Quit the application."""
+        self.stop_enrichment()
         self.exit()
     
     def action_start_indexing(self) -> None:
         """Start indexing action."""
+        # Enrichment resumes against the new index once indexing finishes
+        self.stop_enrichment()
+        
+        from .screens.indexing import IndexingScreen
+        
         # Push indexing screen
         indexing_screen = IndexingScreen(
             str(self.working_directory),
-            self.config_dir
+            self.config_dir,
+            profile=self.profile
         )
         self.push_screen(indexing_screen)
     
     def action_view_files(self) -> None:
         """View indexed files."""
-        file_count = self.index_storage.get_file_count()
-        if file_count > 0:
-            self.query_one("#main_content", Static).update(
-                f"{t('main_menu.view_files')}\n\n"
-                f"File table will be displayed here.\n"
-                f"Currently indexed: {file_count} files."
-            )
+        # The header is enough here; the browser opens the record table itself
+        if self.index_storage.get_file_count() > 0:
+            from .screens.file_browser import FileBrowserScreen
+            self.push_screen(FileBrowserScreen(self.config_dir))
         else:
             self.query_one("#main_content", Static).update(
                 f"{t('main_menu.view_files')}\n\n"
@@ -235,14 +341,13 @@ class FileFlowCLIApp(App):
             )
     
     def action_analyze_llm(self) -> None:
-        """Analyze with LLM."""
+        """Analyze with LLM: build the payload and show what would be sent."""
         file_count = self.index_storage.get_file_count()
         if file_count > 0:
             self.query_one("#main_content", Static).update(
-                f"{t('main_menu.analyze_llm')}\n\n"
-                f"LLM analysis functionality will be implemented later.\n"
-                f"Currently indexed: {file_count} files."
+                f"{t('main_menu.analyze_llm')}\n\n{t('llm.building', count=file_count)}"
             )
+            self.run_worker(self._build_payload, thread=True, group="llm", exclusive=True)
         else:
             self.query_one("#main_content", Static).update(
                 f"{t('main_menu.analyze_llm')}\n\n"
@@ -250,12 +355,61 @@ class FileFlowCLIApp(App):
                 f"Press [i] to start indexing first."
             )
     
+    def _build_payload(self) -> None:
+        """Build the LLM payload (runs in a worker thread)."""
+        from ..core.llm_payload import PayloadBuilder, DEFAULT_TOKEN_BUDGET
+        
+        try:
+            builder = PayloadBuilder(
+                self.config_dir,
+                mode=get_config("llm_payload_mode", "structure"),
+                token_budget=get_config("llm_token_budget", DEFAULT_TOKEN_BUDGET)
+            )
+            payload = builder.build()
+        except (LLMError, ValueError) as e:
+            payload = {"error": str(e)}
+        self.call_from_thread(self._show_payload, payload)
+    
+    def _show_payload(self, payload: Optional[Dict[str, Any]]) -> None:
+        """
+        Show the start of the LLM payload with its size.
+        
+        Args:
+            payload: Result of PayloadBuilder.build (or an "error")
+        """
+        content = Text(f"{t('main_menu.analyze_llm')}\n\n")
+        if payload is None:
+            content.append(t("content.no_files"))
+        elif "error" in payload:
+            content.append(t("errors.generic_error", message=payload["error"]))
+        else:
+            content.append(t(
+                "llm.payload_stats",
+                tokens=payload["tokens"],
+                budget=payload["token_budget"],
+                mode=payload["mode"],
+                files=payload["files"],
+                listed=payload["listed_directories"],
+                summarized=payload["summarized_directories"],
+                ms=int(payload["elapsed_seconds"] * 1000)
+            ) + "\n")
+            content.append(t("llm.payload_warning", provider=get_config("llm_provider", "openai")) + "\n\n")
+            
+            lines = payload["text"].split("\n")
+            # Payload text is shown as is, its "[...]" summaries are not markup
+            content.append("\n".join(lines[:PAYLOAD_PREVIEW_LINES]))
+            if len(lines) > PAYLOAD_PREVIEW_LINES:
+                content.append("\n" + t("llm.more_lines", count=len(lines) - PAYLOAD_PREVIEW_LINES))
+        self.query_one("#main_content", Static).update(content)
+    
     def action_settings(self) -> None:
         """Open settings."""
+        profile, reason = get_performance_profile()
         content = (
             f"{t('settings.title')}\n\n"
             f"{t('settings.language')}: {get_config('language', 'en')}\n"
             f"{t('settings.llm_provider')}: {get_config('llm_provider', 'openai')}\n"
+            f"{t('settings.performance_profile')}: {profile} ({reason})\n"
             f"{t('settings.thread_count')}: {get_config('thread_count', 4)}\n"
             f"{t('settings.batch_size')}: {get_config('batch_size', 100)}\n\n"
             f"Settings editing will be implemented later."
@@ -263,14 +417,9 @@ class FileFlowCLIApp(App):
         self.query_one("#main_content", Static).update(content)
     
     def action_search(self) -> None:
-        """Open search dialog."""
-        # Search functionality will be implemented in Step 14
-        content = (
-            f"Search\n\n"
-            f"Search functionality will be implemented in Step 14.\n"
-            f"Press [/] to open search dialog when available."
-        )
-        self.query_one("#main_content", Static).update(content)
+        """Open search screen."""
+        from .screens.search import SearchScreen
+        self.push_screen(SearchScreen(self.config_dir))
     
     def action_help(self) -> None:
         """Show help information."""
@@ -281,7 +430,7 @@ class FileFlowCLIApp(App):
             f"  [v] - {t('main_menu.view_files')}\n"
             f"  [a] - {t('main_menu.analyze_llm')}\n"
             f"  [s] - {t('main_menu.settings')}\n"
-            f"  [/] - Search\n"
+            f"  [/] - {t('shortcuts.search')}\n"
             f"  [h] - {t('shortcuts.help')}\n"
             f"  [q] - {t('shortcuts.quit')}\n\n"
             f"Features:\n"
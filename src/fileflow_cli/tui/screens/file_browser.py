@@ -0,0 +1,157 @@
+"""File browser screen for FileFlowCLI."""
+
+from textual.app import ComposeResult
+from textual.containers import Container
+from textual.widgets import Static, Footer
+from textual.screen import Screen
+from textual.binding import Binding
+
+from ...i18n.translations import t
+from ...storage.index_storage import IndexStorage
+from ..widgets.file_table import FileTable
+
+
+class FileBrowserScreen(Screen):
+    """Screen for browsing all indexed files."""
+    
+    BINDINGS = [
+        Binding("escape", "back", "Back", priority=True),
+        Binding("n", "sort('name')", "Sort: Name"),
+        Binding("z", "sort('size')", "Sort: Size"),
+        Binding("m", "sort('modified')", "Sort: Modified"),
+        Binding("e", "sort('extension')", "Sort: Type"),
+    ]
+    
+    CSS = """
+    #browser_container {
+        padding: 1;
+    }
+    
+    #browser_header {
+        text-style: bold;
+        color: $primary;
+    }
+    
+    #browser_status {
+        color: $text-muted;
+        margin-top: 1;
+    }
+    """
+    
+    def __init__(self, config_dir):
+        """
+        Initialize file browser screen.
+        
+        Args:
+            config_dir: Configuration directory path
+        """
+        super().__init__()
+        self.config_dir = config_dir
+        self.index_storage = IndexStorage(config_dir)
+        self.sort_by = None
+        self.descending = False
+        self.loaded = False
+        # No rows until the record table is open (see _open_table)
+        self.file_table = FileTable(
+            self.index_storage.get_records,
+            0,
+            [
+                ("Path", 0, lambda record: record.get("path", "")),
+                ("Size", 10, lambda record: self._format_size(record["size"]) if "size" in record else ""),
+                ("Modified", 19, lambda record: (record.get("modified") or "")[:19]),
+                ("Type", 24, lambda record: record.get("mime_type", "")),
+            ],
+            id="file_browser_table"
+        )
+    
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the file browser screen."""
+        with Container(id="browser_container"):
+            yield Static(id="browser_header")
+            yield self.file_table
+            yield Static(id="browser_status")
+        
+        yield Footer()
+    
+    def on_mount(self) -> None:
+        """Called when screen is mounted."""
+        self.title = t("main_menu.view_files")
+        self._update_status()
+        self.file_table.focus()
+        self.call_after_refresh(self._update_header)
+        self.run_worker(self._open_table, thread=True, group="records", exclusive=True)
+    
+    def _open_table(self) -> None:
+        """Open the record table (runs in a worker thread; a missing or stale table is rebuilt)."""
+        row_count = self.index_storage.get_record_count()
+        self.app.call_from_thread(self._show_rows, row_count)
+    
+    def _show_rows(self, row_count: int) -> None:
+        """
+        Show the rows of the opened record table.
+        
+        Args:
+            row_count: Number of records
+        """
+        self.loaded = True
+        self.file_table.reset(row_count=row_count)
+        self._update_status()
+    
+    def on_resize(self) -> None:
+        """Re-layout the column titles for the new width."""
+        self.call_after_refresh(self._update_header)
+    
+    def _update_header(self) -> None:
+        """Lay out the column titles to match the table."""
+        self.query_one("#browser_header", Static).update(
+            self.file_table.format_header(self.file_table.size.width)
+        )
+    
+    def _update_status(self) -> None:
+        """Show row count and current sort order."""
+        if not self.loaded:
+            self.query_one("#browser_status", Static).update(t("browser.loading"))
+            return
+        if self.sort_by is None:
+            order = t("browser.unsorted")
+        else:
+            direction = t("browser.descending") if self.descending else t("browser.ascending")
+            order = f"{self.sort_by} ({direction})"
+        self.query_one("#browser_status", Static).update(
+            t("browser.status", count=self.file_table.row_count, order=order)
+        )
+    
+    def action_sort(self, column: str) -> None:
+        """
+        Sort by a column; sorting by the same column again reverses it.
+        
+        Rows come from the precomputed sort orders of the index, so this
+        only drops the cached pages.
+        
+        Args:
+            column: Sort column name
+        """
+        if self.sort_by == column:
+            self.descending = not self.descending
+        else:
+            self.sort_by = column
+            self.descending = column in ("size", "modified")
+        
+        sort_by, descending = self.sort_by, self.descending
+        self.file_table.reset(
+            fetch=lambda offset, limit: self.index_storage.get_records(offset, limit, sort_by, descending)
+        )
+        self.file_table.move_cursor(0)
+        self._update_status()
+    
+    def action_back(self) -> None:
+        """Return to the previous screen."""
+        self.app.pop_screen()
+    
+    def _format_size(self, size: int) -> str:
+        """Format file size in human-readable format."""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} PB"
@@ -2,6 +2,7 @@
 
 import threading
 from pathlib import Path
+from typing import Optional
 from textual.app import ComposeResult
 from textual.containers import Container, Vertical, Horizontal
 from textual.widgets import Static, ProgressBar, DataTable, Footer
@@ -9,10 +10,10 @@ from collections import deque
 from textual.screen import Screen
 from textual.binding import Binding
 
+from ...core.run_control import RunControl
 from ...i18n.translations import t
-from ...core.indexer import FileIndexer
 from ...storage.checkpoint_manager import CheckpointManager
-from ...storage.index_storage import IndexStorage
+from ...utils.error_handler import IndexLockedError
 
 
 class IndexingScreen(Screen):
@@ -32,7 +33,7 @@ class IndexingScreen(Screen):
     }
     
     #progress_section {
-        height: 6;
+        height: auto;
         border: solid $primary;
         padding: 1;
     }
@@ -57,26 +58,40 @@ class IndexingScreen(Screen):
     }
     """
     
-    def __init__(self, directory: str, config_dir):
+    # Screen refresh rate for progress (frames per second)
+    FRAME_RATE = 10
+    
+    # Number of recently processed files shown
+    RECENT_FILES = 50
+    
+    # Seconds quitting waits for a cancelled run to save its checkpoint
+    QUIT_CHECKPOINT_TIMEOUT = 2.0
+    
+    def __init__(self, directory: str, config_dir, profile: Optional[str] = None):
         """
         Initialize indexing screen.
         
         Args:
             directory: Directory to index
             config_dir: Configuration directory path
+            profile: Profile the run in this mode ("sampling" or "cprofile")
         """
         super().__init__()
         self.directory = Path(directory)
         self.config_dir = config_dir
-        self.indexer = FileIndexer(config_dir)
+        self.profile = profile
+        # Created by the indexing thread, so opening the screen stays cheap
+        self.indexer = None
         self.checkpoint_manager = CheckpointManager(config_dir)
-        self.index_storage = IndexStorage(config_dir)
-        self.is_paused = False
-        self.is_cancelled = False
+        # Pause/cancel token handed to the indexer and its workers
+        self.control = RunControl()
         self.indexing_thread = None
-        self.indexed_files = []
-        self.recent_files = deque(maxlen=50)  # Keep last 50 processed files
-        self.current_processing = []  # Files currently being processed
+        
+        # Written by the indexing thread, drained by the render timer
+        self._progress_lock = threading.Lock()
+        self.recent_files = deque(maxlen=self.RECENT_FILES)
+        self._latest_progress = None
+        self._files_dirty = False
     
     def compose(self) -> ComposeResult:
         """Create child widgets for the indexing screen."""
@@ -88,6 +103,7 @@ class IndexingScreen(Screen):
                 with Horizontal():
                     yield Static(id="progress_stats")
                     yield Static(id="progress_speed")
+                yield Static(id="progress_stages", classes="stats_text")
                 yield Static(id="progress_status")
             
             # File processing table (bottom)
@@ -104,17 +120,15 @@ class IndexingScreen(Screen):
         file_table = self.query_one("#file_table", DataTable)
         file_table.add_columns("Status", "File", "Size", "Type")
         file_table.cursor_type = "row"
+        self.set_interval(1 / self.FRAME_RATE, self._render_frame)
         self._start_indexing()
     
     def _start_indexing(self) -> None:
         """Start or resume indexing in background thread."""
-        self.is_paused = False
-        self.is_cancelled = False
-        
-        # Check if checkpoint exists
-        checkpoint = self.checkpoint_manager.load_checkpoint()
+        self.control = RunControl()
         
-        if checkpoint:
+        # The indexing thread loads the checkpoint itself
+        if self.checkpoint_manager.checkpoint_exists():
             self._update_status(t("indexing.resuming"))
         else:
             self._update_status(t("indexing.starting"))
@@ -128,61 +142,72 @@ class IndexingScreen(Screen):
     
     def _run_indexing(self) -> None:
         """Run indexing in background thread."""
+        from ...core.indexer import FileIndexer
+        
+        profiler = None
+        if self.profile:
+            from ...utils.profiler import RunProfiler
+            profiler = RunProfiler(self.config_dir, mode=self.profile)
+            profiler.start()
+        
         try:
+            self.indexer = FileIndexer(self.config_dir, control=self.control)
             checkpoint = self.checkpoint_manager.load_checkpoint()
             
-            if checkpoint:
-                progress_iterator = self.indexer.resume_indexing(self.directory)
-            else:
-                progress_iterator = self.indexer.index_directory(self.directory)
-            
-            indexed_files = []
-            
-            for progress_update in progress_iterator:
-                if self.is_cancelled:
+            # Pausing blocks inside the indexer; after cancel it saves a
+            # checkpoint and ends the run
+            for progress_update in self.indexer.index_directory(self.directory, checkpoint):
+                if progress_update.get("cancelled"):
                     break
                 
-                while self.is_paused and not self.is_cancelled:
-                    self.call_from_thread(self._update_status, t("indexing.paused"))
-                    threading.Event().wait(0.5)
-                
-                if self.is_cancelled:
-                    break
-                
-                # Update progress with file information
-                recent_files = progress_update.get("recent_files", [])
-                if recent_files:
-                    self.call_from_thread(self._update_file_list, recent_files)
-                else:
-                    # Fallback to checkpoint data
-                    checkpoint_data = self.checkpoint_manager.load_checkpoint()
-                    if checkpoint_data:
-                        processed_paths = checkpoint_data.get("processed_paths", [])
-                        if processed_paths:
-                            recent = processed_paths[-10:]  # Last 10 files
-                            self.call_from_thread(self._update_file_list, recent)
-                
-                # Update progress
-                self.call_from_thread(self._update_progress, progress_update)
-                
-                # Collect files if complete
-                if progress_update.get("complete"):
-                    # Load final index from checkpoint
-                    final_checkpoint = self.checkpoint_manager.load_checkpoint()
-                    if final_checkpoint:
-                        file_hashes = final_checkpoint.get("file_hashes", {})
-                        # We'll need to rebuild full file list
-                        # For now, mark as complete
-                        pass
+                # Only buffer here; the render timer draws at a fixed rate
+                with self._progress_lock:
+                    recent_files = progress_update.get("recent_files")
+                    if recent_files:
+                        self.recent_files.extend(recent_files)
+                        self._files_dirty = True
+                    self._latest_progress = progress_update
             
-            if not self.is_cancelled:
-                # Save index (simplified for now)
-                # Full implementation will save complete file metadata
-                self.call_from_thread(self._update_status, t("indexing.complete_msg"))
+            if self.control.is_cancelled:
+                # The checkpoint is saved; leave without waiting
+                self.call_from_thread(self._return_to_main)
+            else:
+                # The indexer has written the final index at this point; the
+                # last frame shows the completion message
                 self.call_from_thread(self.set_timer, 2.0, self._return_to_main)
         
+        except IndexLockedError as e:
+            self.call_from_thread(self._update_status, t("indexing.locked_msg", message=str(e)))
+        
         except Exception as e:
             self.call_from_thread(self._update_status, f"Error: {str(e)}")
+        
+        finally:
+            if profiler is not None:
+                phases = self.indexer.progress.snapshot()["stage_times"] if self.indexer is not None else None
+                report_path = profiler.stop(phases)
+                if report_path is not None:
+                    self.call_from_thread(self.notify, t("indexing.profile_written", path=str(report_path)))
+    
+    def _render_frame(self) -> None:
+        """Draw buffered progress (called at FRAME_RATE on the UI thread)."""
+        with self._progress_lock:
+            progress = self._latest_progress
+            self._latest_progress = None
+            recent_files = list(self.recent_files) if self._files_dirty else None
+            self._files_dirty = False
+        
+        if recent_files is not None:
+            self._update_file_list(recent_files)
+        if progress is not None:
+            self._update_progress(progress)
+        
+        # Rates and in-flight counts change between batches; read them live
+        indexer = self.indexer
+        if indexer is not None and self.indexing_thread is not None and self.indexing_thread.is_alive():
+            self._update_speed(indexer.progress.snapshot())
+        elif progress is not None:
+            self._update_speed(progress)
     
     def _update_progress(self, progress: dict) -> None:
         """Update progress display."""
@@ -207,105 +232,113 @@ class IndexingScreen(Screen):
         self.query_one("#progress_stats", Static).update(stats_text)
         
         # Update status
-        status_text = t("indexing.processing", percent=f"{progress_percent:.1f}")
-        self._update_status(status_text)
+        if progress.get("complete"):
+            status_text = t("indexing.complete_msg")
+            error_groups = progress.get("error_groups")
+            if error_groups:
+                # Most frequent error, e.g. permission denied across a share
+                top = error_groups[0]
+                status_text += " " + t(
+                    "indexing.error_summary",
+                    count=top["count"],
+                    error=top["exception_type"],
+                    directory=top["directory"] or "...",
+                    groups=len(error_groups)
+                )
+            self._update_status(status_text)
+        elif not self.control.is_paused:
+            status_text = t("indexing.processing", percent=f"{progress_percent:.1f}")
+            self._update_status(status_text)
+    
+    def _update_speed(self, stats: dict) -> None:
+        """
+        Update throughput, ETA and per-stage timings.
+        
+        Args:
+            stats: Progress statistics (see ProgressTracker.snapshot)
+        """
+        eta = stats.get("eta_seconds")
+        speed_text = t(
+            "indexing.speed",
+            files_rate=f"{stats.get('files_per_second', 0.0):.0f}",
+            bytes_rate=self._format_size(stats.get("bytes_per_second", 0.0)),
+            eta=self._format_duration(eta) if eta is not None else "--",
+            in_flight=stats.get("in_flight", 0),
+            errors=stats.get("error_count", 0)
+        )
+        self.query_one("#progress_speed", Static).update(speed_text)
+        
+        stage_times = stats.get("stage_times", {})
+        stages_text = "  ".join(
+            f"{stage} {self._format_duration(seconds)}"
+            for stage, seconds in stage_times.items()
+        )
+        self.query_one("#progress_stages", Static).update(
+            t("indexing.stages", stages=stages_text)
+        )
     
     def _update_status(self, message: str) -> None:
         """Update status message."""
         self.query_one("#progress_status", Static).update(message)
     
-    def _update_file_list(self, file_paths: list) -> None:
-        """Update file list with recently processed files."""
-        file_table = self.query_one("#file_table", DataTable)
-        
-        # Add new files to the list (don't clear, just append)
-        for file_path in file_paths:
-            # Check if file already in table
-            file_path_str = str(file_path)[:60]
-            already_added = False
-            
-            for row_key in file_table.rows:
-                row_data = file_table.get_row(row_key)
-                if len(row_data) > 1 and row_data[1] == file_path_str:
-                    # Update status to completed
-                    file_table.update_cell(row_key, "Status", "✓")
-                    already_added = True
-                    break
-            
-            if not already_added:
-                try:
-                    file_obj = self.directory / file_path
-                    if file_obj.exists():
-                        size = file_obj.stat().st_size
-                        size_str = self._format_size(size)
-                        file_type = file_obj.suffix or "file"
-                        
-                        file_table.add_row(
-                            "✓",  # Status
-                            file_path_str,  # File path (truncated)
-                            size_str,  # Size
-                            file_type  # Type
-                        )
-                    else:
-                        file_table.add_row(
-                            "✓",
-                            file_path_str,
-                            "?",
-                            "?"
-                        )
-                except Exception:
-                    # Skip files that can't be accessed
-                    file_table.add_row(
-                        "✓",
-                        file_path_str,
-                        "?",
-                        "?"
-                    )
+    def _update_file_list(self, recent_files: list) -> None:
+        """
+        Show the most recently processed files, newest first.
         
-        # Keep only last 50 rows
-        while file_table.row_count > 50:
-            file_table.remove_row(file_table.rows[0])
+        Args:
+            recent_files: File dictionaries (path, size, mime_type) from the indexer
+        """
+        file_table = self.query_one("#file_table", DataTable)
+        file_table.clear()
         
-        # Scroll to top to show newest files
-        if file_table.row_count > 0:
-            file_table.cursor_row = 0
+        for file_info in reversed(recent_files):
+            file_table.add_row(
+                "✓",
+                str(file_info["path"])[:60],
+                self._format_size(file_info["size"]),
+                file_info.get("mime_type") or "?"
+            )
     
     def action_pause(self) -> None:
         """Pause indexing."""
-        if not self.is_paused:
-            self.is_paused = True
+        if not self.control.is_paused and not self.control.is_cancelled:
+            self.control.pause()
             self._update_status(t("indexing.paused"))
     
     def action_resume(self) -> None:
         """Resume indexing."""
-        if self.is_paused:
-            self.is_paused = False
+        if self.control.is_paused:
+            self.control.resume()
             self._update_status("Resuming...")
     
     def action_cancel(self) -> None:
-        """Cancel indexing."""
-        self.is_cancelled = True
+        """Cancel indexing (the indexing thread returns to the main screen)."""
+        if self.indexing_thread is None or not self.indexing_thread.is_alive():
+            self._return_to_main()
+            return
+        
+        self.control.cancel()
         self._update_status(t("indexing.cancelled"))
-        self.set_timer(1.0, self._return_to_main)
     
     def action_search(self) -> None:
-        """Open search dialog."""
-        # Search functionality will be implemented in Step 14
-        self._update_status("Search functionality coming soon...")
+        """Open search screen over the last completed index."""
+        from .search import SearchScreen
+        self.app.push_screen(SearchScreen(self.config_dir))
     
     def action_quit(self) -> None:
         """Quit application."""
-        self.is_cancelled = True
+        self.control.cancel()
+        # Give the indexer a moment to save its checkpoint
+        if self.indexing_thread is not None:
+            self.indexing_thread.join(timeout=self.QUIT_CHECKPOINT_TIMEOUT)
         self.app.exit()
     
     def _return_to_main(self) -> None:
         """Return to main screen."""
         self.app.pop_screen()
-        # Refresh main screen
-        if hasattr(self.app, "_update_status_bar"):
-            self.app._update_status_bar()
-        if hasattr(self.app, "_update_main_content"):
-            self.app._update_main_content()
+        # Refresh main screen (also restarts enrichment if needed)
+        if hasattr(self.app, "refresh_status"):
+            self.app.refresh_status()
     
     def _format_size(self, size: int) -> str:
         """Format file size in human-readable format."""
@@ -314,3 +347,11 @@ class IndexingScreen(Screen):
                 return f"{size:.1f} {unit}"
             size /= 1024.0
         return f"{size:.1f} PB"
+    
+    def _format_duration(self, seconds: float) -> str:
+        """Format a duration as 1h 02m, 3m 04s or 5.6s."""
+        if seconds >= 3600:
+            return f"{int(seconds // 3600)}h {int(seconds % 3600 // 60):02d}m"
+        if seconds >= 60:
+            return f"{int(seconds // 60)}m {int(seconds % 60):02d}s"
+        return f"{seconds:.1f}s"
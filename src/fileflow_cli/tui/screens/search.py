@@ -0,0 +1,171 @@
+"""Search screen for FileFlowCLI."""
+
+import time
+from typing import Any, Dict, List
+from textual.app import ComposeResult
+from textual.containers import Container, Vertical
+from textual.widgets import Static, Input, DataTable, Footer
+from textual.screen import Screen
+from textual.binding import Binding
+from textual.worker import get_current_worker
+
+from ...i18n.translations import t
+from ...storage.index_storage import IndexStorage
+from ...storage.search_index import parse_query, MIN_QUERY_LENGTH
+
+
+class SearchScreen(Screen):
+    """Screen for searching the file index as you type."""
+    
+    BINDINGS = [
+        Binding("escape", "back", "Back", priority=True),
+    ]
+    
+    CSS = """
+    #search_container {
+        padding: 1;
+    }
+    
+    #search_input {
+        margin-bottom: 1;
+    }
+    
+    #search_status {
+        color: $text-muted;
+        margin-bottom: 1;
+    }
+    
+    #search_results {
+        height: 1fr;
+        border: solid $primary;
+    }
+    """
+    
+    # Maximum number of results shown
+    RESULT_LIMIT = 100
+    
+    # Seconds of no typing before a query runs
+    SEARCH_DELAY = 0.15
+    
+    def __init__(self, config_dir):
+        """
+        Initialize search screen.
+        
+        Args:
+            config_dir: Configuration directory path
+        """
+        super().__init__()
+        self.config_dir = config_dir
+        self.index_storage = IndexStorage(config_dir)
+        self.search_index = None
+        self._search_timer = None
+    
+    def compose(self) -> ComposeResult:
+        """Create child widgets for the search screen."""
+        with Container(id="search_container"):
+            with Vertical():
+                yield Input(placeholder=t("search.placeholder"), id="search_input")
+                yield Static(id="search_status")
+                yield DataTable(id="search_results", zebra_stripes=True)
+        
+        yield Footer()
+    
+    def on_mount(self) -> None:
+        """Called when screen is mounted."""
+        self.title = t("search.title")
+        results_table = self.query_one("#search_results", DataTable)
+        results_table.add_columns("Path", "Size", "Modified")
+        results_table.cursor_type = "row"
+        
+        # Memory-mapped, so opening is cheap even for large indexes
+        self.search_index = self.index_storage.get_search_index()
+        if self.search_index is None:
+            self._update_status(t("search.no_index"))
+        else:
+            self._update_status(t("search.hint"))
+        
+        self.query_one("#search_input", Input).focus()
+    
+    def on_input_changed(self, event: Input.Changed) -> None:
+        """Re-run the query once typing pauses."""
+        if self._search_timer is not None:
+            self._search_timer.stop()
+        text = event.value
+        self._search_timer = self.set_timer(self.SEARCH_DELAY, lambda: self._start_search(text))
+    
+    def _start_search(self, text: str) -> None:
+        """
+        Start a query in a worker, replacing the one still running.
+        
+        Args:
+            text: Raw query text, may contain filters such as ext:pdf
+        """
+        if self.search_index is None:
+            return
+        
+        query = parse_query(text)
+        name = query["query"].strip()
+        if not name and len(query) == 1:
+            message = t("search.hint")
+        elif 0 < len(name) < MIN_QUERY_LENGTH:
+            # Too short to look up; would check every name
+            message = t("search.too_short", count=MIN_QUERY_LENGTH)
+        else:
+            message = None
+        if message is not None:
+            self.workers.cancel_group(self, "search")
+            self.query_one("#search_results", DataTable).clear()
+            self._update_status(message)
+            return
+        
+        self.run_worker(lambda: self._run_search(query), thread=True, group="search", exclusive=True)
+    
+    def _run_search(self, query: Dict[str, Any]) -> None:
+        """
+        Run a query (runs in a worker thread).
+        
+        Args:
+            query: Name query and filters (see parse_query)
+        """
+        started = time.perf_counter()
+        results = self.search_index.search(limit=self.RESULT_LIMIT, **query)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        if not get_current_worker().is_cancelled:
+            self.app.call_from_thread(self._show_results, results, elapsed_ms)
+    
+    def _show_results(self, results: List[Dict[str, Any]], elapsed_ms: float) -> None:
+        """
+        Show the top results of a query.
+        
+        Args:
+            results: Search results (see SearchIndex.search)
+            elapsed_ms: Search time in milliseconds
+        """
+        results_table = self.query_one("#search_results", DataTable)
+        results_table.clear()
+        for result in results:
+            results_table.add_row(
+                result["path"],
+                self._format_size(result["size"]),
+                (result["modified"] or "")[:19]
+            )
+        
+        self._update_status(
+            t("search.results", count=len(results), ms=f"{elapsed_ms:.1f}")
+        )
+    
+    def _update_status(self, message: str) -> None:
+        """Update status message."""
+        self.query_one("#search_status", Static).update(message)
+    
+    def action_back(self) -> None:
+        """Return to the previous screen."""
+        self.app.pop_screen()
+    
+    def _format_size(self, size: int) -> str:
+        """Format file size in human-readable format."""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024.0:
+                return f"{size:.1f} {unit}"
+            size /= 1024.0
+        return f"{size:.1f} PB"
@@ -0,0 +1 @@
+"""TUI widgets for FileFlowCLI."""
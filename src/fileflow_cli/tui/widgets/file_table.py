@@ -0,0 +1,302 @@
+"""Virtualized file table widget for FileFlowCLI."""
+
+from collections import OrderedDict
+from typing import Callable, Dict, Any, List, Optional
+
+from rich.segment import Segment
+from textual.binding import Binding
+from textual.geometry import Size
+from textual.message import Message
+from textual.scroll_view import ScrollView
+from textual.strip import Strip
+
+
+# Fetch function: (offset, limit) -> records
+RowFetcher = Callable[[int, int], List[Dict[str, Any]]]
+
+
+class FileTable(ScrollView, can_focus=True):
+    """
+    Scrollable table over an arbitrarily large record source.
+    
+    Only the rows on screen are rendered. Rows are fetched in fixed-size
+    pages through the fetch function and kept in a small LRU cache, so
+    opening, scrolling and jumping cost the same for any number of rows.
+    """
+    
+    BINDINGS = [
+        Binding("up", "cursor_up", "Up", show=False),
+        Binding("down", "cursor_down", "Down", show=False),
+        Binding("pageup", "page_up", "Page Up", show=False),
+        Binding("pagedown", "page_down", "Page Down", show=False),
+        Binding("home", "first_row", "First", show=False),
+        Binding("end", "last_row", "Last", show=False),
+        Binding("enter", "select_row", "Select", show=False),
+    ]
+    
+    COMPONENT_CLASSES = {
+        "file-table--cursor",
+        "file-table--odd-row",
+    }
+    
+    DEFAULT_CSS = """
+    FileTable {
+        height: 1fr;
+    }
+    
+    FileTable > .file-table--cursor {
+        background: $accent;
+        color: $text;
+    }
+    
+    FileTable > .file-table--odd-row {
+        background: $primary 10%;
+    }
+    """
+    
+    # Rows per fetched page
+    PAGE_SIZE = 128
+    
+    # Pages kept in the cache
+    CACHED_PAGES = 8
+    
+    # Rows fetched ahead of and behind the visible window
+    PREFETCH_MARGIN = 32
+    
+    class RowSelected(Message):
+        """Posted when Enter is pressed on a row."""
+        
+        def __init__(self, row: int, record: Dict[str, Any]):
+            """
+            Initialize message.
+            
+            Args:
+                row: Row position
+                record: Record at that position
+            """
+            super().__init__()
+            self.row = row
+            self.record = record
+    
+    def __init__(
+        self,
+        fetch: RowFetcher,
+        row_count: int,
+        columns: List[tuple],
+        **kwargs
+    ):
+        """
+        Initialize file table.
+        
+        Args:
+            fetch: Function returning records for (offset, limit)
+            row_count: Total number of rows
+            columns: (title, width, formatter) tuples; a width of 0 takes
+                the remaining space, formatter maps a record to cell text
+            **kwargs: Passed to ScrollView
+        """
+        super().__init__(**kwargs)
+        self.fetch = fetch
+        self.row_count = row_count
+        self.columns = columns
+        self.cursor_row = 0
+        self._pages: "OrderedDict[int, List[Dict[str, Any]]]" = OrderedDict()
+    
+    def reset(self, fetch: Optional[RowFetcher] = None, row_count: Optional[int] = None) -> None:
+        """
+        Drop cached rows, optionally switching the record source.
+        
+        Args:
+            fetch: New fetch function (default: keep current)
+            row_count: New total number of rows (default: keep current)
+        """
+        if fetch is not None:
+            self.fetch = fetch
+        if row_count is not None:
+            self.row_count = row_count
+        self._pages.clear()
+        self.cursor_row = min(self.cursor_row, max(0, self.row_count - 1))
+        self._update_virtual_size()
+        self.refresh()
+    
+    def on_mount(self) -> None:
+        """Called when widget is mounted."""
+        self._update_virtual_size()
+    
+    def on_resize(self) -> None:
+        """Keep the virtual width in step with the widget width."""
+        self._update_virtual_size()
+    
+    def _update_virtual_size(self) -> None:
+        """Set the scrollable area to one line per row."""
+        self.virtual_size = Size(self.size.width, self.row_count)
+    
+    def get_record(self, row: int) -> Optional[Dict[str, Any]]:
+        """
+        Get the record at a row position, fetching its page if needed.
+        
+        Args:
+            row: Row position
+        
+        Returns:
+            Record dictionary or None if out of range
+        """
+        if row < 0 or row >= self.row_count:
+            return None
+        
+        page = self._get_page(row // self.PAGE_SIZE)
+        index = row % self.PAGE_SIZE
+        return page[index] if index < len(page) else None
+    
+    def _get_page(self, page_number: int) -> List[Dict[str, Any]]:
+        """
+        Get a page of records from the cache or the fetch function.
+        
+        Args:
+            page_number: Page number
+        
+        Returns:
+            Records of the page
+        """
+        page = self._pages.get(page_number)
+        if page is not None:
+            self._pages.move_to_end(page_number)
+            return page
+        
+        page = self.fetch(page_number * self.PAGE_SIZE, self.PAGE_SIZE)
+        self._pages[page_number] = page
+        while len(self._pages) > self.CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return page
+    
+    def _prefetch(self, first_row: int, last_row: int) -> None:
+        """
+        Make sure pages around the visible window are cached.
+        
+        Args:
+            first_row: First visible row
+            last_row: Last visible row
+        """
+        start = max(0, first_row - self.PREFETCH_MARGIN) // self.PAGE_SIZE
+        end = min(self.row_count - 1, last_row + self.PREFETCH_MARGIN) // self.PAGE_SIZE
+        for page_number in range(start, end + 1):
+            self._get_page(page_number)
+    
+    def render_line(self, y: int) -> Strip:
+        """
+        Render one visible line.
+        
+        Args:
+            y: Line number relative to the top of the widget
+        
+        Returns:
+            Strip for the line
+        """
+        scroll_x, scroll_y = self.scroll_offset
+        width = self.size.width
+        row = scroll_y + y
+        
+        if y == 0:
+            self._prefetch(scroll_y, scroll_y + self.size.height)
+        
+        record = self.get_record(row)
+        if record is None:
+            return Strip.blank(width, self.rich_style)
+        
+        if row == self.cursor_row:
+            style = self.rich_style + self.get_component_rich_style("file-table--cursor")
+        elif row % 2:
+            style = self.rich_style + self.get_component_rich_style("file-table--odd-row")
+        else:
+            style = self.rich_style
+        
+        text = self._layout([formatter(record) for _, _, formatter in self.columns], width)
+        return Strip([Segment(text, style)], width).crop(scroll_x, scroll_x + width)
+    
+    def format_header(self, width: int) -> str:
+        """
+        Lay out the column titles.
+        
+        Args:
+            width: Available width
+        
+        Returns:
+            Header text padded to width
+        """
+        return self._layout([title for title, _, _ in self.columns], width)
+    
+    def _layout(self, values: List[Any], width: int) -> str:
+        """
+        Lay out cell values in the column widths.
+        
+        Args:
+            values: One value per column
+            width: Available width
+        
+        Returns:
+            Line text padded to width
+        """
+        fixed = sum(column_width + 1 for _, column_width, _ in self.columns if column_width)
+        flexible = max(8, width - fixed)
+        
+        cells = []
+        for (_, column_width, _), value in zip(self.columns, values):
+            cell_width = column_width or flexible
+            text = str(value)
+            if len(text) > cell_width:
+                # Keep the end of long paths, it is the informative part
+                text = "…" + text[-(cell_width - 1):]
+            cells.append(text.ljust(cell_width))
+        
+        return " ".join(cells)[:width].ljust(width)
+    
+    def move_cursor(self, row: int) -> None:
+        """
+        Move the cursor and scroll it into view.
+        
+        Args:
+            row: Target row (clamped to the table)
+        """
+        if self.row_count == 0:
+            return
+        
+        self.cursor_row = max(0, min(self.row_count - 1, row))
+        height = self.size.height
+        scroll_y = self.scroll_offset.y
+        
+        if self.cursor_row < scroll_y:
+            self.scroll_to(y=self.cursor_row, animate=False)
+        elif self.cursor_row >= scroll_y + height:
+            self.scroll_to(y=self.cursor_row - height + 1, animate=False)
+        
+        self.refresh()
+    
+    def action_cursor_up(self) -> None:
+        """Move cursor up one row."""
+        self.move_cursor(self.cursor_row - 1)
+    
+    def action_cursor_down(self) -> None:
+        """Move cursor down one row."""
+        self.move_cursor(self.cursor_row + 1)
+    
+    def action_page_up(self) -> None:
+        """Move cursor up one page."""
+        self.move_cursor(self.cursor_row - max(1, self.size.height))
+    
+    def action_page_down(self) -> None:
+        """Move cursor down one page."""
+        self.move_cursor(self.cursor_row + max(1, self.size.height))
+    
+    def action_first_row(self) -> None:
+        """Jump to the first row."""
+        self.move_cursor(0)
+    
+    def action_last_row(self) -> None:
+        """Jump to the last row."""
+        self.move_cursor(self.row_count - 1)
+    
+    def action_select_row(self) -> None:
+        """Post the record under the cursor."""
+        record = self.get_record(self.cursor_row)
+        if record is not None:
+            self.post_message(self.RowSelected(self.cursor_row, record))
@@ -3,35 +3,56 @@
 import json
 import os
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+
+from .performance_profiles import PROFILES, detect_profile
 
 
 class ConfigManager:
     """Manages application configuration."""
     
+    # Format of config.json; older files are migrated once on load
+    CONFIG_VERSION = 2
+    
     DEFAULT_CONFIG = {
+        "config_version": CONFIG_VERSION,
         "language": "en",
         "llm_provider": "openai",
         "llm_model": "gpt-5.2",
         "llm_api_key": "",
+        "performance_profile": "auto",
+        "max_file_size_for_preview": 10485760,
+        "enrichment_thread_count": 2,
+        "metrics_enabled": False
+    }
+    
+    # Values earlier versions wrote into every config.json. They are not
+    # treated as user choices, so the performance profile applies instead.
+    # Removed once, when a config.json without "config_version" is loaded.
+    LEGACY_DEFAULTS = {
         "batch_size": 100,
-        "thread_count": 4
+        "thread_count": 4,
+        "scan_thread_count": 8
     }
     
-    def __init__(self, working_directory: Optional[Path] = None):
+    def __init__(self, working_directory: Optional[Path] = None, search_parents: bool = True):
         """
         Initialize configuration manager.
         
         Args:
             working_directory: Working directory path (default: current directory)
+            search_parents: Use the .fileflow_cli directory of a parent
+                directory if the working directory has none (default: True)
         """
         if working_directory is None:
             working_directory = Path.cwd()
         
         self.working_directory = Path(working_directory).resolve()
+        self.search_parents = search_parents
         self.config_dir = self._find_or_create_config_dir()
         self.config_file = self.config_dir / "config.json"
         self.config: Dict[str, Any] = {}
+        self._profile: Optional[Tuple[str, str]] = None
         self._load_config()
     
     def _find_or_create_config_dir(self) -> Path:
@@ -41,38 +62,15 @@ class ConfigManager:
         Returns:
             Path to .fileflow_cli directory
         """
-        config_dir = self.working_directory / ".fileflow_cli"
-        
-        # Check if .fileflow_cli exists in current directory
-        if config_dir.exists():
+        config_dir = find_config_dir(self.working_directory, self.search_parents)
+        if config_dir is not None:
             return config_dir
         
-        # Check parent directories for existing .fileflow_cli
-        parent_config = self._find_parent_fileflow_cli()
-        if parent_config:
-            return parent_config
-        
         # Create new .fileflow_cli directory
+        config_dir = self.working_directory / ".fileflow_cli"
         config_dir.mkdir(exist_ok=True)
         return config_dir
     
-    def _find_parent_fileflow_cli(self) -> Optional[Path]:
-        """
-        Walk up directory tree looking for .fileflow_cli directory.
-        
-        Returns:
-            Path to .fileflow_cli if found, None otherwise
-        """
-        current = self.working_directory.parent
-        
-        while current != current.parent:  # Stop at filesystem root
-            config_dir = current / ".fileflow_cli"
-            if config_dir.exists() and config_dir.is_dir():
-                return config_dir
-            current = current.parent
-        
-        return None
-    
     def _load_config(self) -> None:
         """Load configuration from file or create default."""
         if self.config_file.exists():
@@ -80,10 +78,20 @@ class ConfigManager:
                 with open(self.config_file, "r", encoding="utf-8") as f:
                     self.config = json.load(f)
                 
+                migrate = self.config.get("config_version", 1) < self.CONFIG_VERSION
+                if migrate:
+                    for key, value in self.LEGACY_DEFAULTS.items():
+                        if self.config.get(key) == value:
+                            del self.config[key]
+                    self.config["config_version"] = self.CONFIG_VERSION
+                
                 # Merge with defaults to ensure all keys exist
                 for key, value in self.DEFAULT_CONFIG.items():
                     if key not in self.config:
                         self.config[key] = value
+                
+                if migrate:
+                    self._save_config()
             except (FileNotFoundError, json.JSONDecodeError) as e:
                 print(f"Warning: Could not load config: {e}")
                 self.config = self.DEFAULT_CONFIG.copy()
@@ -104,6 +112,9 @@ class ConfigManager:
         """
         Get configuration value.
         
+        Performance settings not set in config.json come from the active
+        performance profile.
+        
         Args:
             key: Configuration key
             default: Default value if key not found
@@ -111,7 +122,35 @@ class ConfigManager:
         Returns:
             Configuration value or default
         """
-        return self.config.get(key, default)
+        if key in self.config:
+            return self.config[key]
+        
+        settings = PROFILES[self.get_performance_profile()[0]]
+        if key in settings:
+            return settings[key]
+        
+        return default
+    
+    def get_performance_profile(self) -> Tuple[str, str]:
+        """
+        Get the active performance profile.
+        
+        "performance_profile" in config.json selects a profile by name;
+        "auto" (the default) probes the storage of the working directory
+        once.
+        
+        Returns:
+            Tuple of (profile name, reason it was chosen)
+        """
+        if self._profile is None:
+            name = self.config.get("performance_profile", "auto")
+            if name in PROFILES:
+                self._profile = (name, "set in config")
+            else:
+                if name != "auto":
+                    print(f"Warning: Unknown performance profile: {name}")
+                self._profile = detect_profile(self.working_directory)
+        return self._profile
     
     def set(self, key: str, value: Any) -> None:
         """
@@ -122,6 +161,8 @@ class ConfigManager:
             value: Configuration value
         """
         self.config[key] = value
+        if key == "performance_profile":
+            self._profile = None
         self._save_config()
     
     def get_config_dir(self) -> Path:
@@ -143,22 +184,55 @@ class ConfigManager:
         return self.config_file
 
 
+def find_config_dir(working_directory: Path, search_parents: bool = True) -> Optional[Path]:
+    """
+    Find the .fileflow_cli directory of a directory without creating it.
+    
+    Args:
+        working_directory: Directory (resolved)
+        search_parents: Also look in parent directories (default: True)
+    
+    Returns:
+        Its .fileflow_cli directory, or the nearest one of a parent
+        directory, or None if there is none
+    """
+    config_dir = working_directory / ".fileflow_cli"
+    
+    # Check if .fileflow_cli exists in current directory
+    if config_dir.exists():
+        return config_dir
+    if not search_parents:
+        return None
+    
+    # Walk up the directory tree looking for an existing .fileflow_cli
+    current = working_directory.parent
+    while current != current.parent:  # Stop at filesystem root
+        config_dir = current / ".fileflow_cli"
+        if config_dir.exists() and config_dir.is_dir():
+            return config_dir
+        current = current.parent
+    
+    return None
+
+
 # Global config manager instance
 _config_manager: Optional[ConfigManager] = None
 
 
-def init_config(working_directory: Optional[Path] = None) -> ConfigManager:
+def init_config(working_directory: Optional[Path] = None, search_parents: bool = True) -> ConfigManager:
     """
     Initialize global configuration manager.
     
     Args:
         working_directory: Working directory path (default: current directory)
+        search_parents: Use the .fileflow_cli directory of a parent
+            directory if the working directory has none (default: True)
     
     Returns:
         ConfigManager instance
     """
     global _config_manager
-    _config_manager = ConfigManager(working_directory)
+    _config_manager = ConfigManager(working_directory, search_parents)
     return _config_manager
 
 
@@ -199,3 +273,17 @@ def set_config(key: str, value: Any) -> None:
     
     _config_manager.set(key, value)
 
+
+def get_performance_profile() -> Tuple[str, str]:
+    """
+    Get the active performance profile (convenience function).
+    
+    Returns:
+        Tuple of (profile name, reason it was chosen)
+    """
+    global _config_manager
+    
+    if _config_manager is None:
+        init_config()
+    
+    return _config_manager.get_performance_profile()
@@ -1,12 +1,32 @@
 """Dynamic error handling system for FileFlowCLI."""
 
+import atexit
+import json
+import os
+import threading
 import traceback
-import sys
-from typing import Dict, Any, Optional, Type
+from collections import deque
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple, Type
 from enum import Enum
 from datetime import datetime
 
 
+# Most recent errors kept in memory with full details
+ERROR_LOG_SIZE = 200
+
+# Distinct (exception type, errno, directory) groups counted separately;
+# further directories are counted in one group per exception type and errno
+MAX_ERROR_GROUPS = 1000
+
+# On-disk error log rotation
+ERROR_LOG_MAX_BYTES = 1024 * 1024
+ERROR_LOG_BACKUPS = 3
+
+# Context keys naming the file or directory an error is about
+PATH_CONTEXT_KEYS = ("file", "file_path", "path")
+
+
 class ErrorType(Enum):
     """Error type enumeration."""
     FILE_OPERATION = "file_operation"
@@ -31,18 +51,71 @@ class IndexingError(Exception):
     pass
 
 
+class IndexLockedError(IndexingError):
+    """Another process is writing the index."""
+    
+    def __init__(self, config_dir: Path, holder: Optional[Dict[str, Any]] = None):
+        """
+        Initialize error.
+        
+        Args:
+            config_dir: Configuration directory of the locked index
+            holder: Lock holder information (pid, host, purpose, since)
+        """
+        self.config_dir = config_dir
+        self.holder = holder or {}
+        who = f"process {self.holder['pid']}" if "pid" in self.holder else "another process"
+        if self.holder.get("host"):
+            who += f" on {self.holder['host']}"
+        super().__init__(f"Index in {config_dir} is locked by {who}")
+
+
 class ConfigError(Exception):
     """Error related to configuration operations."""
     pass
 
 
 class ErrorHandler:
-    """Centralized error handling system."""
+    """
+    Centralized error handling system.
     
-    def __init__(self):
-        """Initialize error handler."""
-        self.error_log: list = []
+    Memory stays bounded however many errors occur: only the most recent
+    errors are kept (a ring buffer), all errors are counted by
+    (exception type, errno, directory), and stack traces are formatted
+    only when asked for. With a log directory, errors are also appended
+    to a rotating JSON-lines log; a stack trace is written for the first
+    error of each group only.
+    """
+    
+    def __init__(
+        self,
+        log_dir: Optional[Path] = None,
+        max_errors: int = ERROR_LOG_SIZE,
+        max_groups: int = MAX_ERROR_GROUPS,
+        log_max_bytes: int = ERROR_LOG_MAX_BYTES,
+        log_backups: int = ERROR_LOG_BACKUPS
+    ):
+        """
+        Initialize error handler.
+        
+        Args:
+            log_dir: Directory for errors.log (no on-disk log if None)
+            max_errors: Number of recent errors kept in memory
+            max_groups: Number of error groups counted separately
+            log_max_bytes: Rotate errors.log when it would grow past this size
+            log_backups: Number of rotated logs kept (errors.log.1, ...)
+        """
+        self.error_log: deque = deque(maxlen=max_errors)
+        self.error_groups: Dict[Tuple[str, Optional[int], Optional[str]], Dict[str, Any]] = {}
+        self.error_count = 0
+        self.max_groups = max_groups
         self.show_details = False
+        self.log_file = Path(log_dir) / "errors.log" if log_dir is not None else None
+        self.log_max_bytes = log_max_bytes
+        self.log_backups = log_backups
+        self._log_stream = None
+        self._log_size = 0
+        self._lock = threading.Lock()
     
     def handle_error(
         self,
@@ -70,16 +143,17 @@ class ErrorHandler:
         # Get detailed error information
         error_info = self._get_error_info(error, context, error_type)
         
-        # Store error for debugging
-        self.error_log.append(error_info)
+        with self._lock:
+            # Store error for debugging (oldest errors drop out)
+            self.error_log.append(error_info)
+            self.error_count += 1
+            first_in_group = self._count_error(error_info)
+            
+            # Log detailed error for developer
+            self._log_error_details(error_info, with_stack=first_in_group)
         
         # Generate user-friendly message
-        user_message = self._generate_user_message(error, error_type, context)
-        
-        # Log detailed error for developer
-        self._log_error_details(error_info)
-        
-        return user_message
+        return self._generate_user_message(error, error_type, context)
     
     def _detect_error_type(self, error: Exception) -> ErrorType:
         """
@@ -119,7 +193,7 @@ class ErrorHandler:
         Returns:
             Dictionary with error details
         """
-        exc_type, exc_value, exc_traceback = sys.exc_info()
+        exc_traceback = error.__traceback__
         
         # Get file and line number from traceback
         file_path = "unknown"
@@ -131,20 +205,73 @@ class ErrorHandler:
                 file_path = tb_frame.f_code.co_filename
                 line_number = exc_traceback.tb_lineno
         
-        # Get stack trace
-        stack_trace = traceback.format_exc()
-        
+        # The stack trace is formatted from the exception when it is needed
         return {
             "timestamp": datetime.now().isoformat(),
             "error_type": error_type.value,
             "exception_type": type(error).__name__,
+            "errno": getattr(error, "errno", None),
+            "directory": self._error_directory(context),
             "message": str(error),
             "file": file_path,
             "line": line_number,
-            "stack_trace": stack_trace,
+            "exception": error,
             "context": context
         }
     
+    def _error_directory(self, context: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the directory an error happened in from its context.
+        
+        Args:
+            context: Error context
+        
+        Returns:
+            Directory path or None if the context names no path
+        """
+        directory = context.get("directory")
+        if directory is not None:
+            return str(directory)
+        
+        for key in PATH_CONTEXT_KEYS:
+            path = context.get(key)
+            if path is not None:
+                return os.path.dirname(str(path))
+        return None
+    
+    def _count_error(self, error_info: Dict[str, Any]) -> bool:
+        """
+        Count an error in its (exception type, errno, directory) group.
+        
+        Args:
+            error_info: Error information dictionary
+        
+        Returns:
+            True if the error is the first of its group
+        """
+        key = (error_info["exception_type"], error_info["errno"], error_info["directory"])
+        group = self.error_groups.get(key)
+        if group is None and len(self.error_groups) >= self.max_groups:
+            # Too many directories: count the rest together
+            key = (key[0], key[1], None)
+            group = self.error_groups.get(key)
+        
+        if group is not None:
+            group["count"] += 1
+            group["last_seen"] = error_info["timestamp"]
+            return False
+        
+        self.error_groups[key] = {
+            "exception_type": key[0],
+            "errno": key[1],
+            "directory": key[2],
+            "count": 1,
+            "message": error_info["message"],
+            "first_seen": error_info["timestamp"],
+            "last_seen": error_info["timestamp"]
+        }
+        return True
+    
     def _generate_user_message(
         self,
         error: Exception,
@@ -192,34 +319,120 @@ class ErrorHandler:
         else:
             return f"An error occurred: {error_msg}"
     
-    def _log_error_details(self, error_info: Dict[str, Any]) -> None:
+    def _log_error_details(self, error_info: Dict[str, Any], with_stack: bool = False) -> None:
         """
-        Log detailed error information for developer.
+        Log detailed error information for developer (caller holds the lock).
         
         Args:
             error_info: Error information dictionary
+            with_stack: Include the formatted stack trace
         """
-        # In production, this would write to a log file
-        # For now, we'll just store it in memory
-        pass
+        if self.log_file is None:
+            return
+        
+        entry = {key: value for key, value in error_info.items() if key != "exception"}
+        if with_stack:
+            entry["stack_trace"] = self._format_stack(error_info)
+        line = json.dumps(entry, default=str) + "\n"
+        
+        try:
+            if self._log_stream is None:
+                self.log_file.parent.mkdir(parents=True, exist_ok=True)
+                self._log_stream = open(self.log_file, "a", encoding="utf-8")
+                self._log_size = self._log_stream.tell()
+            
+            if self._log_size and self._log_size + len(line) > self.log_max_bytes:
+                self._rotate_log()
+            
+            self._log_stream.write(line)
+            self._log_size += len(line)
+        except (IOError, OSError):
+            # Never fail the operation that reported the error
+            self.log_file = None
+    
+    def _rotate_log(self) -> None:
+        """Move errors.log to errors.log.1 (and older logs up by one) and reopen it."""
+        self._log_stream.close()
+        for number in range(self.log_backups - 1, 0, -1):
+            older = self.log_file.with_name(f"{self.log_file.name}.{number}")
+            if older.exists():
+                older.replace(self.log_file.with_name(f"{self.log_file.name}.{number + 1}"))
+        if self.log_backups > 0:
+            self.log_file.replace(self.log_file.with_name(f"{self.log_file.name}.1"))
+        else:
+            self.log_file.unlink()
+        
+        self._log_stream = open(self.log_file, "a", encoding="utf-8")
+        self._log_size = 0
+    
+    def flush(self) -> None:
+        """Write buffered error log lines to disk."""
+        with self._lock:
+            if self._log_stream is not None:
+                try:
+                    self._log_stream.flush()
+                except (IOError, OSError):
+                    pass
+    
+    def _format_stack(self, error_info: Dict[str, Any]) -> str:
+        """
+        Format the stack trace of an error.
+        
+        Args:
+            error_info: Error information dictionary
+        
+        Returns:
+            Formatted stack trace
+        """
+        error = error_info.get("exception")
+        if error is None:
+            return error_info.get("stack_trace", "")
+        return "".join(traceback.format_exception(type(error), error, error.__traceback__))
     
     def get_error_details(self, index: int = -1) -> Optional[Dict[str, Any]]:
         """
         Get detailed error information.
         
         Args:
-            index: Error index (-1 for latest)
+            index: Error index among the recent errors (-1 for latest)
         
         Returns:
-            Error details dictionary or None
+            Error details dictionary (with its stack trace) or None
+        """
+        with self._lock:
+            try:
+                error_info = self.error_log[index]
+            except IndexError:
+                return None
+        
+        details = {key: value for key, value in error_info.items() if key != "exception"}
+        details["stack_trace"] = self._format_stack(error_info)
+        return details
+    
+    def get_error_summary(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
         """
-        if not self.error_log:
-            return None
+        Get error counts by (exception type, errno, directory), most frequent first.
         
-        try:
-            return self.error_log[index]
-        except IndexError:
-            return None
+        Args:
+            limit: Maximum number of groups (all if None)
+        
+        Returns:
+            Group dictionaries (exception_type, errno, directory, count,
+            message of the first error, first_seen, last_seen); a directory
+            of None counts errors of directories beyond max_groups
+        """
+        with self._lock:
+            groups = [dict(group) for group in self.error_groups.values()]
+        
+        groups.sort(key=lambda group: group["count"], reverse=True)
+        return groups[:limit] if limit is not None else groups
+    
+    def clear(self) -> None:
+        """Forget recent errors and error counts (the on-disk log is kept)."""
+        with self._lock:
+            self.error_log.clear()
+            self.error_groups.clear()
+            self.error_count = 0
     
     def format_error_details(self, error_info: Dict[str, Any]) -> str:
         """
@@ -257,15 +470,49 @@ class ErrorHandler:
 _error_handler: Optional[ErrorHandler] = None
 
 
-def init_error_handler() -> ErrorHandler:
+def init_error_handler(
+    log_dir: Optional[Path] = None,
+    max_errors: int = ERROR_LOG_SIZE,
+    log_max_bytes: int = ERROR_LOG_MAX_BYTES,
+    log_backups: int = ERROR_LOG_BACKUPS
+) -> ErrorHandler:
     """
     Initialize global error handler.
     
+    Args:
+        log_dir: Directory for errors.log (no on-disk log if None)
+        max_errors: Number of recent errors kept in memory
+        log_max_bytes: Rotate errors.log when it would grow past this size
+        log_backups: Number of rotated logs kept
+    
+    Returns:
+        ErrorHandler instance
+    """
+    global _error_handler
+    
+    if _error_handler is not None:
+        _error_handler.flush()
+    _error_handler = ErrorHandler(
+        log_dir,
+        max_errors=max_errors,
+        log_max_bytes=log_max_bytes,
+        log_backups=log_backups
+    )
+    return _error_handler
+
+
+def get_error_handler() -> ErrorHandler:
+    """
+    Get global error handler.
+    
     Returns:
         ErrorHandler instance
     """
     global _error_handler
-    _error_handler = ErrorHandler()
+    
+    if _error_handler is None:
+        init_error_handler()
+    
     return _error_handler
 
 
@@ -292,3 +539,9 @@ def handle_error(
     
     return _error_handler.handle_error(error, context, error_type)
 
+
+@atexit.register
+def _flush_error_handler() -> None:
+    """Write buffered error log lines before the interpreter exits."""
+    if _error_handler is not None:
+        _error_handler.flush()
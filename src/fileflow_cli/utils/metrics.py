@@ -0,0 +1,452 @@
+"""Metrics collection and export for FileFlowCLI."""
+
+import json
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple, Iterator, List
+
+
+# Default latency buckets in seconds (100us to 10s)
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class _NullMetric:
+    """Metric that ignores everything (used while metrics are disabled)."""
+    
+    def inc(self, amount: float = 1) -> None:
+        """Ignore an increment."""
+    
+    def dec(self, amount: float = 1) -> None:
+        """Ignore a decrement."""
+    
+    def set(self, value: float) -> None:
+        """Ignore a value."""
+    
+    def observe(self, value: float) -> None:
+        """Ignore an observation."""
+    
+    def time(self) -> Any:
+        """Run the block without timing it."""
+        return _NULL_CONTEXT
+
+
+_NULL_CONTEXT = nullcontext()
+_NULL_METRIC = _NullMetric()
+
+
+class Counter:
+    """Monotonically increasing value."""
+    
+    def __init__(self):
+        """Initialize counter."""
+        self._lock = threading.Lock()
+        self.value = 0.0
+    
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increase the counter.
+        
+        Args:
+            amount: Amount to add (default: 1)
+        """
+        with self._lock:
+            self.value += amount
+
+
+class Gauge:
+    """Value that can go up and down."""
+    
+    def __init__(self):
+        """Initialize gauge."""
+        self._lock = threading.Lock()
+        self.value = 0.0
+    
+    def set(self, value: float) -> None:
+        """
+        Set the gauge.
+        
+        Args:
+            value: New value
+        """
+        self.value = value
+    
+    def inc(self, amount: float = 1) -> None:
+        """
+        Increase the gauge.
+        
+        Args:
+            amount: Amount to add (default: 1)
+        """
+        with self._lock:
+            self.value += amount
+    
+    def dec(self, amount: float = 1) -> None:
+        """
+        Decrease the gauge.
+        
+        Args:
+            amount: Amount to subtract (default: 1)
+        """
+        with self._lock:
+            self.value -= amount
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets."""
+    
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        """
+        Initialize histogram.
+        
+        Args:
+            buckets: Upper bounds of the buckets, ascending
+        """
+        self._lock = threading.Lock()
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        """
+        Record an observation.
+        
+        Args:
+            value: Observed value (seconds for latencies)
+        """
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+    
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Observe the duration of the block in seconds."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+    
+    def cumulative_counts(self) -> List[int]:
+        """
+        Get cumulative bucket counts (last entry is +Inf).
+        
+        Returns:
+            List of counts
+        """
+        with self._lock:
+            counts = list(self.counts)
+        total = 0
+        cumulative = []
+        for count in counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class MetricsRegistry:
+    """
+    Named metrics with labels, exportable as JSON or Prometheus text.
+    
+    While disabled, every lookup returns a shared no-op metric, so
+    instrumented code pays for one method call and nothing else.
+    Components look their metrics up once and keep the handles.
+    """
+    
+    def __init__(self, enabled: bool = False):
+        """
+        Initialize metrics registry.
+        
+        Args:
+            enabled: Whether metrics are recorded
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Dict[_LabelKey, Any]] = {}
+        self._types: Dict[str, str] = {}
+        self._help: Dict[str, str] = {}
+    
+    def counter(self, name: str, help_text: str = "", **labels: str) -> Any:
+        """
+        Get or create a counter.
+        
+        Args:
+            name: Metric name (e.g. "fileflow_files_indexed_total")
+            help_text: Description for the exporters
+            **labels: Label values
+        
+        Returns:
+            Counter (or a no-op metric while disabled)
+        """
+        return self._get("counter", name, help_text, labels, Counter)
+    
+    def gauge(self, name: str, help_text: str = "", **labels: str) -> Any:
+        """
+        Get or create a gauge.
+        
+        Args:
+            name: Metric name
+            help_text: Description for the exporters
+            **labels: Label values
+        
+        Returns:
+            Gauge (or a no-op metric while disabled)
+        """
+        return self._get("gauge", name, help_text, labels, Gauge)
+    
+    def histogram(
+        self,
+        name: str,
+        help_text: str = "",
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS,
+        **labels: str
+    ) -> Any:
+        """
+        Get or create a histogram.
+        
+        Args:
+            name: Metric name (e.g. "fileflow_stage_seconds")
+            help_text: Description for the exporters
+            buckets: Bucket upper bounds
+            **labels: Label values
+        
+        Returns:
+            Histogram (or a no-op metric while disabled)
+        """
+        return self._get("histogram", name, help_text, labels, lambda: Histogram(buckets))
+    
+    def _get(self, metric_type: str, name: str, help_text: str, labels: Dict[str, str], factory) -> Any:
+        """
+        Look up a metric, creating it on first use.
+        
+        Args:
+            metric_type: "counter", "gauge" or "histogram"
+            name: Metric name
+            help_text: Description
+            labels: Label values
+            factory: Creates a new metric
+        
+        Returns:
+            Metric instance
+        """
+        if not self.enabled:
+            return _NULL_METRIC
+        
+        key = tuple(sorted((label, str(value)) for label, value in labels.items()))
+        with self._lock:
+            registered = self._types.setdefault(name, metric_type)
+            if registered != metric_type:
+                raise ValueError(f"Metric {name} is already registered as a {registered}")
+            if help_text:
+                self._help.setdefault(name, help_text)
+            series = self._metrics.setdefault(name, {})
+            metric = series.get(key)
+            if metric is None:
+                metric = series[key] = factory()
+            return metric
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get all metric values.
+        
+        Returns:
+            Dictionary keyed by metric name with type, help and one entry per
+            label set
+        """
+        with self._lock:
+            items = [(name, dict(series)) for name, series in self._metrics.items()]
+        
+        snapshot: Dict[str, Any] = {}
+        for name, series in sorted(items):
+            values = []
+            for key, metric in sorted(series.items()):
+                entry: Dict[str, Any] = {"labels": dict(key)}
+                if isinstance(metric, Histogram):
+                    entry["count"] = metric.count
+                    entry["sum"] = metric.sum
+                    entry["buckets"] = dict(zip(
+                        [str(bound) for bound in metric.buckets] + ["+Inf"],
+                        metric.cumulative_counts()
+                    ))
+                else:
+                    entry["value"] = metric.value
+                values.append(entry)
+            snapshot[name] = {
+                "type": self._types[name],
+                "help": self._help.get(name, ""),
+                "values": values
+            }
+        return snapshot
+    
+    def to_prometheus(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            Exposition text
+        """
+        lines = []
+        for name, metric in self.snapshot().items():
+            if metric["help"]:
+                lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for entry in metric["values"]:
+                labels = entry["labels"]
+                if metric["type"] == "histogram":
+                    for bound, count in entry["buckets"].items():
+                        lines.append(f"{name}_bucket{_format_labels(labels, le=bound)} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(entry['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {entry['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(entry['value'])}")
+        return "\n".join(lines) + "\n"
+    
+    def write_json(self, file_path: Path) -> bool:
+        """
+        Write a JSON snapshot of all metrics.
+        
+        Args:
+            file_path: Destination file
+        
+        Returns:
+            True if written successfully, False otherwise
+        """
+        data = {"generated_at": time.time(), "metrics": self.snapshot()}
+        return _write_atomic(Path(file_path), json.dumps(data, indent=2))
+    
+    def write_prometheus(self, file_path: Path) -> bool:
+        """
+        Write metrics in Prometheus text format.
+        
+        The file is replaced atomically, as node_exporter's textfile
+        collector requires (use a .prom file name).
+        
+        Args:
+            file_path: Destination file
+        
+        Returns:
+            True if written successfully, False otherwise
+        """
+        return _write_atomic(Path(file_path), self.to_prometheus())
+
+
+def _format_labels(labels: Dict[str, str], **extra: str) -> str:
+    """
+    Format labels as {name="value",...}.
+    
+    Args:
+        labels: Label values
+        **extra: Additional labels (e.g. le for histogram buckets)
+    
+    Returns:
+        Label string, empty if there are no labels
+    """
+    merged = dict(labels, **extra)
+    if not merged:
+        return ""
+    parts = []
+    for label, value in merged.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        parts.append(f'{label}="{value}"')
+    return "{" + ",".join(parts) + "}"
+
+
+def _format_value(value: float) -> str:
+    """
+    Format a sample value.
+    
+    Args:
+        value: Sample value
+    
+    Returns:
+        Value text (integers without a decimal point)
+    """
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _write_atomic(file_path: Path, text: str) -> bool:
+    """
+    Write text to a temporary file and rename it into place.
+    
+    Args:
+        file_path: Destination file
+        text: File content
+    
+    Returns:
+        True if written successfully, False otherwise
+    """
+    try:
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = file_path.with_name(f".{file_path.name}.tmp")
+        with open(temp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        temp_path.replace(file_path)
+        return True
+    except IOError as e:
+        print(f"Error writing metrics: {e}")
+        return False
+
+
+# Global metrics registry instance
+_metrics_registry: Optional[MetricsRegistry] = None
+
+
+def init_metrics(enabled: bool = False) -> MetricsRegistry:
+    """
+    Initialize global metrics registry.
+    
+    Call before creating the components to instrument; they look up
+    their metrics when constructed.
+    
+    Args:
+        enabled: Whether metrics are recorded
+    
+    Returns:
+        MetricsRegistry instance
+    """
+    global _metrics_registry
+    _metrics_registry = MetricsRegistry(enabled)
+    return _metrics_registry
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get global metrics registry (disabled unless init_metrics enabled it).
+    
+    Returns:
+        MetricsRegistry instance
+    """
+    global _metrics_registry
+    
+    if _metrics_registry is None:
+        _metrics_registry = MetricsRegistry(enabled=False)
+    
+    return _metrics_registry
+
+
+def export_metrics(config_dir: Path, textfile_path: Optional[str] = None) -> None:
+    """
+    Write the global registry to the configured export files.
+    
+    A JSON snapshot always goes to config_dir/metrics/metrics.json; the
+    Prometheus text goes to textfile_path if set, else next to it.
+    
+    Args:
+        config_dir: Path to .fileflow_cli directory
+        textfile_path: Prometheus output file (e.g. in node_exporter's
+            textfile directory)
+    """
+    registry = get_metrics()
+    if not registry.enabled:
+        return
+    
+    metrics_dir = Path(config_dir) / "metrics"
+    registry.write_json(metrics_dir / "metrics.json")
+    registry.write_prometheus(Path(textfile_path) if textfile_path else metrics_dir / "fileflow.prom")
@@ -0,0 +1,185 @@
+"""Storage-aware performance profiles for FileFlowCLI."""
+
+import os
+from pathlib import Path
+from typing import Dict, Any, Optional, Tuple
+
+
+# Settings applied together by each profile:
+# - thread_count / scan_thread_count: worker and directory-listing threads
+# - batch_size: files per batch
+# - checkpoint_interval: batches between checkpoint saves
+# - hash_mode: "head" (first chunk + size/mtime for large files) or
+#   "full" (whole content; slower, detects in-place edits of large files)
+# - read_advice: kernel read-ahead hint for file reads: "normal",
+#   "random" (no read-ahead, good for head-only reads on disks and
+#   network mounts) or "dontneed" (drop read pages from the page cache)
+# - memory_limit_mb: caps the records held per batch (None: no cap)
+# - nice: raise the process niceness by this much while indexing
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "ssd": {
+        "thread_count": 8,
+        "scan_thread_count": 16,
+        "batch_size": 200,
+        "checkpoint_interval": 2,
+        "hash_mode": "head",
+        "read_advice": "normal",
+        "memory_limit_mb": None,
+        "nice": 0,
+    },
+    "hdd": {
+        # Seeks dominate: few concurrent readers, no read-ahead past the head
+        "thread_count": 2,
+        "scan_thread_count": 2,
+        "batch_size": 200,
+        "checkpoint_interval": 5,
+        "hash_mode": "head",
+        "read_advice": "random",
+        "memory_limit_mb": None,
+        "nice": 0,
+    },
+    "nfs": {
+        # Latency dominates: many requests in flight, rare checkpoint writes
+        "thread_count": 16,
+        "scan_thread_count": 32,
+        "batch_size": 500,
+        "checkpoint_interval": 4,
+        "hash_mode": "head",
+        "read_advice": "random",
+        "memory_limit_mb": None,
+        "nice": 0,
+    },
+    "low-memory": {
+        "thread_count": 2,
+        "scan_thread_count": 2,
+        "batch_size": 50,
+        "checkpoint_interval": 4,
+        "hash_mode": "head",
+        "read_advice": "dontneed",
+        "memory_limit_mb": 16,
+        "nice": 0,
+    },
+    "background": {
+        # Stay out of the way of interactive work
+        "thread_count": 1,
+        "scan_thread_count": 1,
+        "batch_size": 100,
+        "checkpoint_interval": 10,
+        "hash_mode": "head",
+        "read_advice": "dontneed",
+        "memory_limit_mb": 32,
+        "nice": 10,
+    },
+}
+
+# Profile used when nothing can be detected
+DEFAULT_PROFILE = "ssd"
+
+# Filesystem types of network mounts (from /proc/self/mountinfo)
+NETWORK_FILESYSTEMS = {
+    "nfs", "nfs4", "cifs", "smb3", "smbfs", "9p", "afs", "ceph", "glusterfs",
+    "lustre", "davfs", "fuse.sshfs", "fuse.glusterfs", "fuse.rclone", "fuse.s3fs",
+}
+
+# Machines with less memory than this get the low-memory profile
+LOW_MEMORY_BYTES = 2 * 1024 * 1024 * 1024
+
+
+def _mount_fstype(path: Path) -> Optional[str]:
+    """
+    Get the filesystem type of the mount containing a path (Linux).
+    
+    Args:
+        path: Resolved path
+    
+    Returns:
+        Filesystem type (e.g. "ext4", "nfs4") or None if unknown
+    """
+    best_mount, best_type = "", None
+    target = str(path)
+    try:
+        with open("/proc/self/mountinfo", "r", encoding="utf-8") as f:
+            for line in f:
+                # <id> <parent> <maj:min> <root> <mount point> <options> ... - <type> <source> ...
+                left, _, right = line.partition(" - ")
+                fields = left.split()
+                if len(fields) < 5 or not right:
+                    continue
+                mount_point = fields[4].replace("\\040", " ")
+                inside = target == mount_point or target.startswith(mount_point.rstrip("/") + "/")
+                if inside and len(mount_point) >= len(best_mount):
+                    best_mount, best_type = mount_point, right.split()[0]
+    except (IOError, OSError):
+        return None
+    return best_type
+
+
+def _is_rotational(path: Path) -> Optional[bool]:
+    """
+    Check whether a path lives on a rotational disk (Linux).
+    
+    Args:
+        path: Resolved path
+    
+    Returns:
+        True for spinning disks, False for SSDs, None if unknown
+    """
+    try:
+        device = os.stat(path).st_dev
+    except OSError:
+        return None
+    
+    block = Path(f"/sys/dev/block/{os.major(device)}:{os.minor(device)}")
+    # Partitions keep the queue settings in their parent device
+    for candidate in (block / "queue" / "rotational", block / ".." / "queue" / "rotational"):
+        try:
+            return candidate.read_text().strip() == "1"
+        except (IOError, OSError):
+            continue
+    return None
+
+
+def _total_memory() -> Optional[int]:
+    """
+    Get the total physical memory.
+    
+    Returns:
+        Bytes of memory or None if unknown
+    """
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def detect_profile(path: Path) -> Tuple[str, str]:
+    """
+    Choose a performance profile for indexing a directory.
+    
+    Network filesystems get "nfs", small machines "low-memory",
+    spinning disks "hdd" and everything else "ssd". The "background"
+    profile is never detected; select it in the config.
+    
+    Args:
+        path: Directory to index
+    
+    Returns:
+        Tuple of (profile name, reason)
+    """
+    path = Path(path).resolve()
+    
+    fstype = _mount_fstype(path)
+    if fstype in NETWORK_FILESYSTEMS:
+        return "nfs", f"network filesystem ({fstype})"
+    
+    memory = _total_memory()
+    if memory is not None and memory < LOW_MEMORY_BYTES:
+        return "low-memory", f"{memory // (1024 * 1024)} MB of memory"
+    
+    rotational = _is_rotational(path)
+    if rotational:
+        return "hdd", "rotational disk"
+    if rotational is False:
+        return "ssd", "non-rotational disk"
+    
+    return DEFAULT_PROFILE, "storage type unknown"
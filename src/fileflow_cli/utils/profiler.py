@@ -0,0 +1,281 @@
+"""Profiling of indexing runs for FileFlowCLI."""
+
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, Optional, List
+
+
+PROFILE_MODES = ("sampling", "cprofile")
+
+# Before Python 3.12 a cProfile profiler sees only the thread that enabled
+# it. Since 3.12 it is built on sys.monitoring, which allows one active
+# profiler per interpreter, and that profiler sees every thread.
+_PROFILER_PER_THREAD = sys.version_info < (3, 12)
+
+
+class RunProfiler:
+    """
+    Profiles one indexing run and writes a report.
+    
+    Two CPU modes are available:
+    - "sampling": a background thread samples the stacks of the profiled
+      threads every few milliseconds. Low overhead, covers worker threads.
+    - "cprofile": deterministic cProfile of the calling thread and every
+      thread started during the run. Exact call counts, higher overhead.
+    
+    Memory is traced with tracemalloc in both modes. Only threads started
+    after start() (plus the calling thread) are profiled, so an idle UI
+    loop does not show up in the report (except in "cprofile" mode on
+    Python 3.12 and later, where one profiler covers all threads).
+    """
+    
+    def __init__(
+        self,
+        config_dir: Path,
+        mode: str = "sampling",
+        trace_memory: bool = True,
+        sample_interval: float = 0.005,
+        top: int = 30
+    ):
+        """
+        Initialize run profiler.
+        
+        Args:
+            config_dir: Path to .fileflow_cli directory
+            mode: "sampling" or "cprofile" (default: sampling)
+            trace_memory: Record allocation sites with tracemalloc (default: True)
+            sample_interval: Seconds between stack samples (default: 5ms)
+            top: Number of functions and allocation sites reported (default: 30)
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        
+        self.profiles_dir = Path(config_dir) / "profiles"
+        self.mode = mode
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.top = top
+        
+        self._started = 0.0
+        self._owner = 0
+        self._excluded_threads: set = set()
+        self._stop_event = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._samples = 0
+        self._self_counts: Counter = Counter()
+        self._total_counts: Counter = Counter()
+        self._profiles: List[cProfile.Profile] = []
+        self._profiles_lock = threading.Lock()
+    
+    def start(self) -> None:
+        """Start profiling (call from the thread that drives the run)."""
+        self._started = time.perf_counter()
+        self._owner = threading.get_ident()
+        self._excluded_threads = {
+            thread.ident for thread in threading.enumerate()
+            if thread.ident != self._owner
+        }
+        
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        
+        if self.mode == "cprofile":
+            profile = cProfile.Profile()
+            self._profiles.append(profile)
+            if _PROFILER_PER_THREAD:
+                # New threads enable their own profiler on their first event
+                threading.setprofile(self._start_thread_profile)
+            profile.enable()
+        else:
+            self._stop_event.clear()
+            self._sampler = threading.Thread(target=self._sample_loop, daemon=True)
+            self._sampler.start()
+    
+    def stop(self, phases: Optional[Dict[str, float]] = None, label: str = "index") -> Optional[Path]:
+        """
+        Stop profiling and write the report.
+        
+        Args:
+            phases: Seconds per phase (e.g. ProgressTracker stage_times)
+            label: Run name used in the report file name
+        
+        Returns:
+            Path to the report, or None if it could not be written
+        """
+        wall_time = time.perf_counter() - self._started
+        
+        if self.mode == "cprofile":
+            if _PROFILER_PER_THREAD:
+                threading.setprofile(None)
+            self._profiles[0].disable()
+        elif self._sampler is not None:
+            self._stop_event.set()
+            self._sampler.join()
+            self._sampler = None
+        
+        allocations: List[Any] = []
+        peak_memory = None
+        if self.trace_memory and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            allocations = snapshot.statistics("lineno")[:self.top]
+            _, peak_memory = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+        
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        report = self._format_report(label, wall_time, phases or {}, allocations, peak_memory)
+        
+        try:
+            self.profiles_dir.mkdir(parents=True, exist_ok=True)
+            report_path = self.profiles_dir / f"{label}-{timestamp}.txt"
+            report_path.write_text(report, encoding="utf-8")
+            if self.mode == "cprofile":
+                # Raw stats for snakeviz, gprof2dot or pstats
+                self._merged_stats().dump_stats(str(self.profiles_dir / f"{label}-{timestamp}.pstats"))
+            return report_path
+        except IOError as e:
+            print(f"Error writing profile report: {e}")
+            return None
+    
+    def _start_thread_profile(self, frame: Any, event: str, arg: Any) -> None:
+        """
+        Profile hook for new threads: replace itself with a cProfile profiler.
+        
+        Args:
+            frame: Current frame
+            event: Profile event
+            arg: Event argument
+        """
+        profile = cProfile.Profile()
+        with self._profiles_lock:
+            self._profiles.append(profile)
+        profile.enable()
+    
+    def _merged_stats(self) -> pstats.Stats:
+        """
+        Merge the cProfile data of all profiled threads.
+        
+        Returns:
+            Combined statistics
+        """
+        with self._profiles_lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.disable()
+        
+        stats = pstats.Stats(profiles[0], stream=io.StringIO())
+        for profile in profiles[1:]:
+            try:
+                stats.add(profile)
+            except TypeError:
+                # Thread profiler that never recorded a call
+                continue
+        return stats
+    
+    def _sample_loop(self) -> None:
+        """Sampler thread: record the stacks of profiled threads."""
+        sampler = threading.get_ident()
+        while not self._stop_event.wait(self.sample_interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == sampler or ident in self._excluded_threads:
+                    continue
+                self._samples += 1
+                seen = set()
+                leaf = True
+                while frame is not None:
+                    code = frame.f_code
+                    key = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if leaf:
+                        self._self_counts[key] += 1
+                        leaf = False
+                    if key not in seen:
+                        # Count recursive functions once per sample
+                        self._total_counts[key] += 1
+                        seen.add(key)
+                    frame = frame.f_back
+    
+    def _format_report(
+        self,
+        label: str,
+        wall_time: float,
+        phases: Dict[str, float],
+        allocations: List[Any],
+        peak_memory: Optional[int]
+    ) -> str:
+        """
+        Build the text report.
+        
+        Args:
+            label: Run name
+            wall_time: Wall-clock seconds of the run
+            phases: Seconds per phase
+            allocations: tracemalloc statistics
+            peak_memory: Peak traced memory in bytes
+        
+        Returns:
+            Report text
+        """
+        lines = [
+            f"FileFlowCLI profile: {label}",
+            f"Date: {datetime.now().isoformat(timespec='seconds')}",
+            f"Mode: {self.mode}",
+            f"Wall time: {wall_time:.3f}s",
+        ]
+        if peak_memory is not None:
+            lines.append(f"Peak traced memory: {peak_memory / 1024 / 1024:.1f} MB")
+        
+        if phases:
+            lines += ["", "Per-phase timings (worker phases are summed over threads):"]
+            for phase, seconds in phases.items():
+                share = seconds / wall_time * 100 if wall_time > 0 else 0.0
+                lines.append(f"  {phase:<12} {seconds:10.3f}s  {share:6.1f}%")
+        
+        lines += ["", f"Top {self.top} functions:"]
+        if self.mode == "cprofile":
+            stream = io.StringIO()
+            stats = self._merged_stats()
+            stats.stream = stream
+            stats.sort_stats("cumulative").print_stats(self.top)
+            lines.append(stream.getvalue().rstrip())
+        else:
+            lines.append(f"  {self._samples} samples every {self.sample_interval * 1000:.0f} ms")
+            lines += self._format_samples("Self time (function on top of the stack)", self._self_counts)
+            lines += self._format_samples("Total time (function anywhere on the stack)", self._total_counts)
+        
+        if allocations:
+            lines += ["", f"Top {len(allocations)} allocation sites (live at end of run):"]
+            for statistic in allocations:
+                frame = statistic.traceback[0]
+                lines.append(
+                    f"  {statistic.size / 1024:10.1f} KB  {statistic.count:8d} blocks  "
+                    f"{frame.filename}:{frame.lineno}"
+                )
+        
+        return "\n".join(lines) + "\n"
+    
+    def _format_samples(self, title: str, counts: Counter) -> List[str]:
+        """
+        Format sample counts as a ranked table.
+        
+        Args:
+            title: Table title
+            counts: Sample counts keyed by (file, line, function)
+        
+        Returns:
+            Report lines
+        """
+        lines = ["", f"  {title}:"]
+        total = max(1, self._samples)
+        for (filename, lineno, name), count in counts.most_common(self.top):
+            lines.append(f"  {count / total * 100:6.1f}%  {count:8d}  {name} ({filename}:{lineno})")
+        return lines